@@ -1,10 +1,15 @@
 """Django admin registrations for the Academics app.
 
-Registers Faculty, Career, Subject, FinalExam, and Grade with basic list and search configuration.
+Registers Faculty, Career, Subject, Correlative, FinalExam, Grade, and StudentAcademicSummary with basic list and search configuration,
+plus set-based actions on Grade: a status check, and clearing manual statuses after a confirmation page.
 """
 
-from django.contrib import admin
-from .models import Faculty, Career, Subject, FinalExam, Grade
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+
+from .models import Faculty, Career, Subject, Correlative, FinalExam, Grade, StudentAcademicSummary
+from .services import clear_grade_status_overrides, recompute_grade_statuses
 
 
 @admin.register(Faculty)
@@ -24,19 +29,64 @@ class CareerAdmin(admin.ModelAdmin):
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
     """Admin for Subject: curriculum fields and quick search."""
-    list_display = ("code", "name", "career", "year", "period", "category", "semanal_hours")
+    list_display = ("code", "name", "career", "year", "period", "category", "semanal_hours", "capacity", "seats_taken")
     search_fields = ("code", "name", "career__name")
 
 
+@admin.register(Correlative)
+class CorrelativeAdmin(admin.ModelAdmin):
+    """Admin for Correlative: prerequisites of each subject."""
+    list_display = ("subject", "required_subject", "requirement")
+    list_filter = ("requirement", "subject__career")
+    search_fields = ("subject__code", "subject__name", "required_subject__code", "required_subject__name")
+
+
 @admin.register(FinalExam)
 class FinalExamAdmin(admin.ModelAdmin):
     """Admin for FinalExam: scheduling fields and subject lookup."""
-    list_display = ("subject", "date", "call_number", "location", "duration")
+    list_display = ("subject", "date", "call_number", "location", "duration", "capacity", "seats_taken")
     search_fields = ("subject__name", "subject__code", "location")
 
 
 @admin.register(Grade)
 class GradeAdmin(admin.ModelAdmin):
     """Admin for Grade: student, subject, status and grades overview."""
-    list_display = ("student", "subject", "status", "promotion_grade", "final_grade")
+    list_display = ("student", "subject", "status", "status_override", "promotion_grade", "final_grade")
+    list_filter = ("status", "subject__career")
     search_fields = ("student__user__username", "subject__name", "subject__code")
+    actions = ["recompute_status", "clear_status_override"]
+
+    @admin.action(description="Recalcular estado según la nota final")
+    def recompute_status(self, request, queryset):
+        """Check the selected grades against their final grades with one query; nothing is written."""
+        report = recompute_grade_statuses(queryset)
+        message = f"El estado de {report.checked} notas se calcula a partir de la nota final; no hubo cambios."
+        if report.overridden:
+            message += (f" {report.overridden} notas tienen un estado manual distinto; "
+                        "use \"Quitar estado manual\" para descartarlo.")
+        self.message_user(request, message, messages.SUCCESS)
+
+    @admin.action(description="Quitar estado manual (requiere confirmación)")
+    def clear_status_override(self, request, queryset):
+        """Clear the manual status of the selected grades with one UPDATE, after a confirmation page."""
+        overridden = queryset.filter(status_override__isnull=False)
+        if request.POST.get("post") == "yes":
+            changed = clear_grade_status_overrides(overridden)
+            self.message_user(request, f"Se quitó el estado manual de {changed} notas.", messages.SUCCESS)
+            return None
+        return TemplateResponse(request, "admin/academics/grade/clear_status_override.html", {
+            **self.admin_site.each_context(request),
+            "title": "Quitar estado manual",
+            "opts": self.model._meta,
+            "queryset": queryset,
+            "overridden_count": overridden.count(),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        })
+
+
+@admin.register(StudentAcademicSummary)
+class StudentAcademicSummaryAdmin(admin.ModelAdmin):
+    """Admin for StudentAcademicSummary: read-only totals maintained from grades."""
+    list_display = ("student", "promoted_count", "regular_count", "free_count", "average_final_grade", "last_grade_change")
+    search_fields = ("student__student_id", "student__user__username")
+    readonly_fields = list_display
@@ -0,0 +1,185 @@
+"""Precomputed correlative (prerequisite) index for eligibility checks.
+
+Includes:
+- CorrelativeIndex: transitive prerequisites of a career's subjects as bitsets.
+- correlative_index / invalidate_correlative_index: cached per-career index.
+- correlative_grades: the (subject, status) pairs of a student that count for correlatives.
+- missing_correlatives: prerequisites a student still lacks for a subject or its final.
+
+Rules:
+    - To inscribe in a subject, every prerequisite must be REGULAR or PROMOTED,
+      and every PROMOTED prerequisite must be PROMOTED. Requirements are
+      transitive: the prerequisites of a prerequisite count as well.
+    - To sit a subject's final exam, every (transitive) prerequisite must be PROMOTED.
+    - The REGULAR grade created by a subject inscription does not count until a
+      professor records a grade or a status on it (Grade.is_inscription_placeholder):
+      being inscribed in a prerequisite is not having it regular.
+
+Notes:
+    - The index is built from one query and cached until a Correlative or
+      Subject of the career changes (academics.signals). Checks then only test
+      bits of the student's grade set, without recursive queries.
+"""
+
+from django.core.cache import cache
+
+from academics.models import Correlative, Grade
+
+
+class CorrelativeIndex:
+    """
+    Transitive prerequisites of the subjects of one career.
+
+    Every subject that is required somewhere gets a bit; each subject maps to the
+    bitmask of the subjects it needs regular and of those it needs promoted.
+
+    Attributes:
+        codes (list[str]): Subject code of each bit position.
+        regular_masks (dict[str, int]): Subject code -> prerequisites needed at least regular.
+        promoted_masks (dict[str, int]): Subject code -> prerequisites needed promoted.
+    """
+
+    def __init__(self, edges):
+        """
+        Args:
+            edges (Iterable[tuple[str, str, str]]): (subject, required_subject, requirement) rows.
+        """
+        self.codes = []
+        self._bits = {}
+        self.regular_masks = {}
+        self.promoted_masks = {}
+        direct = {}
+        for subject, required, requirement in edges:
+            direct.setdefault(subject, []).append((required, requirement))
+            self._bit(required)
+        for code in direct:
+            self._close(code, direct, set())
+
+    def _bit(self, code):
+        if code not in self._bits:
+            self._bits[code] = 1 << len(self.codes)
+            self.codes.append(code)
+        return self._bits[code]
+
+    def _close(self, code, direct, visiting):
+        """Compute (regular, promoted) masks of `code` depth-first, memoized."""
+        if code in self.regular_masks:
+            return self.regular_masks[code], self.promoted_masks[code]
+        if code not in direct or code in visiting:  # no prerequisites, or a cycle in bad data
+            return 0, 0
+        visiting.add(code)
+        regular = promoted = 0
+        for required, requirement in direct[code]:
+            bit = self._bits[required]
+            required_regular, required_promoted = self._close(required, direct, visiting)
+            regular |= bit | required_regular
+            promoted |= required_promoted
+            if requirement == Correlative.Requirement.PROMOTED:
+                promoted |= bit
+        visiting.discard(code)
+        self.regular_masks[code], self.promoted_masks[code] = regular, promoted
+        return regular, promoted
+
+    def _decode(self, mask):
+        return [code for i, code in enumerate(self.codes) if mask >> i & 1]
+
+    def has_requirements(self, code):
+        """Return True if subject `code` has any prerequisite."""
+        return bool(self.regular_masks.get(code))
+
+    def prerequisites(self, code):
+        """Return the codes of every (transitive) prerequisite of subject `code`."""
+        return self._decode(self.regular_masks.get(code, 0))
+
+    def standing(self, grades):
+        """
+        Encode a student's grades as bitmasks.
+
+        Args:
+            grades (Iterable[tuple[str, str]]): (subject_id, status) pairs.
+
+        Returns:
+            tuple[int, int]: Masks of subjects at least regular and of subjects promoted.
+        """
+        regular = promoted = 0
+        for subject_id, status in grades:
+            bit = self._bits.get(subject_id, 0)
+            if status == Grade.StatusSubject.PROMOTED:
+                regular |= bit
+                promoted |= bit
+            elif status == Grade.StatusSubject.REGULAR:
+                regular |= bit
+        return regular, promoted
+
+    def missing(self, code, standing, for_final=False):
+        """
+        Return the prerequisites of subject `code` the student does not meet.
+
+        Args:
+            code (str): Subject code.
+            standing (tuple[int, int]): Result of standing().
+            for_final (bool): Check the final exam rule instead of the inscription rule.
+
+        Returns:
+            list[str]: Codes of the unmet prerequisites; empty when eligible.
+        """
+        regular, promoted = standing
+        needs_regular = self.regular_masks.get(code, 0)
+        needs_promoted = self.promoted_masks.get(code, 0)
+        if for_final:
+            lacking = needs_regular & ~promoted
+        else:
+            lacking = (needs_regular & ~regular) | (needs_promoted & ~promoted)
+        return self._decode(lacking)
+
+
+def _index_key(career_id):
+    return f"correlatives:career:{career_id}"
+
+
+def correlative_index(career_id):
+    """Return the CorrelativeIndex of a career, building and caching it when missing."""
+    key = _index_key(career_id)
+    index = cache.get(key)
+    if index is None:
+        index = CorrelativeIndex(
+            Correlative.objects.filter(subject__career_id=career_id)
+            .values_list("subject_id", "required_subject_id", "requirement")
+        )
+        cache.set(key, index, timeout=None)
+    return index
+
+
+def invalidate_correlative_index(career_ids):
+    """Drop the cached indexes of the given careers."""
+    cache.delete_many([_index_key(career_id) for career_id in set(career_ids)])
+
+
+def correlative_grades(student):
+    """Return the (subject_id, status) pairs of `student`'s grades, without inscription placeholders."""
+    return (
+        Grade.objects.filter(student=student)
+        .exclude(Grade.inscription_placeholder_q())
+        .values_list("subject_id", "status")
+    )
+
+
+def missing_correlatives(student, subject, for_final=False):
+    """
+    Return the prerequisites of `subject` that `student` does not meet.
+
+    Grades are only read when the subject has prerequisites.
+
+    Args:
+        student (users.Student): Student to check.
+        subject (Subject): Subject to inscribe in, or whose final exam to sit.
+        for_final (bool): Apply the final exam rule.
+
+    Returns:
+        list[str]: Codes of the unmet prerequisites; empty when eligible.
+    """
+    index = correlative_index(subject.career_id)
+    if not index.has_requirements(subject.pk):
+        return []
+    standing = index.standing(correlative_grades(student))
+    return index.missing(subject.pk, standing, for_final=for_final)
@@ -7,6 +7,7 @@ Provides forms to create and edit:
 - Subject: courses belonging to a career.
 - FinalExam: final exam sessions for a subject.
 - Grade: student grades and academic status.
+- GradeGridFormSet: every grade of a subject edited at once.
 
 Example:
     Typical usage in a view:
@@ -66,12 +67,17 @@ class SubjectForm(forms.ModelForm):
     - Leverages model validators for year/category/period fields.
 
     Fields:
-    - name, code, career, year, category, period, semanal_hours, description
+    - name, code, career, year, category, period, semanal_hours, description, capacity
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Career.__str__ shows the faculty name; join it instead of one query per option.
+        self.fields['career'].queryset = Career.objects.select_related('faculty')
+
     class Meta:
         model = Subject
-        fields = ['name', 'code', 'career', 'year', 'category', 'period', 'semanal_hours', 'description']
+        fields = ['name', 'code', 'career', 'year', 'category', 'period', 'semanal_hours', 'description', 'capacity']
 
 
 class FinalExamForm(forms.ModelForm):
@@ -82,26 +88,101 @@ class FinalExamForm(forms.ModelForm):
     - Schedule exam calls for a subject with date/time/location metadata.
 
     Fields:
-    - subject, date, location, duration, call_number, notes
+    - subject, date, location, duration, call_number, notes, capacity
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Subject.__str__ shows the career name; join it instead of one query per option.
+        self.fields['subject'].queryset = Subject.objects.select_related('career')
+
     class Meta:
         model = FinalExam
-        fields = ['subject', 'date', 'location', 'duration', 'call_number', 'notes']
+        fields = ['subject', 'date', 'location', 'duration', 'call_number', 'notes', 'capacity']
+
+
+class FollowFinalGradeMixin:
+    """
+    Let a new final grade decide the status.
+
+    When the final grade changes and the manual status (status_override) was not
+    changed in the same form, the manual status is cleared so the database derives
+    the status from the final grade, e.g. the regular status given at inscription.
+    """
 
+    def clean(self):
+        cleaned = super().clean()
+        if 'final_grade' in self.changed_data and 'status_override' not in self.changed_data:
+            cleaned['status_override'] = None
+        return cleaned
 
-class GradeForm(forms.ModelForm):
+
+class GradeForm(FollowFinalGradeMixin, forms.ModelForm):
     """
     ModelForm to create or update a Grade.
 
     Notes:
     - Captures promotion/regular status and final grade values.
-    - Status transition rules should be enforced in the model.
+    - The status is derived from the final grade by the database; status_override
+      replaces it while set (empty means "follow the final grade"). A new final
+      grade clears it unless it is changed too (FollowFinalGradeMixin).
+
+    Fields:
+    - promotion_grade, status_override, final_grade, notes
+    """
+
+    class Meta:
+        model = Grade
+        fields = ['promotion_grade', 'status_override', 'final_grade', 'notes']
+        labels = {'status_override': 'Estado manual'}
+        help_texts = {'status_override': 'Dejar vacío para calcularlo a partir de la nota final.'}
+
+
+class GradeGridForm(FollowFinalGradeMixin, forms.ModelForm):
+    """
+    One row of the grade grid.
 
     Fields:
-    - promotion_grade, status, final_grade, notes
+    - promotion_grade, final_grade, status_override
     """
 
     class Meta:
         model = Grade
-        fields = ['promotion_grade', 'status', 'final_grade', 'notes']
+        fields = ['promotion_grade', 'final_grade', 'status_override']
+        widgets = {
+            'promotion_grade': forms.NumberInput(attrs={'class': 'form-control form-control-sm', 'step': '0.01'}),
+            'final_grade': forms.NumberInput(attrs={'class': 'form-control form-control-sm', 'step': '0.01'}),
+            'status_override': forms.Select(attrs={'class': 'form-select form-select-sm'}),
+        }
+
+
+class BaseGradeGridFormSet(forms.BaseModelFormSet):
+    """
+    Model formset over the grades of one subject.
+
+    Notes:
+    - Rows are matched to the preloaded queryset by primary key; the pk field is
+      a plain hidden integer, so validation does not run one SELECT per row.
+    - Rows whose pk is not in the queryset are rejected.
+    """
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_name = self.model._meta.pk.name
+        form.fields[pk_name] = forms.IntegerField(
+            widget=forms.HiddenInput, required=False, initial=form.fields[pk_name].initial
+        )
+
+    def clean(self):
+        super().clean()
+        if any(form.instance._state.adding for form in self.forms):
+            raise forms.ValidationError('La planilla contiene filas que no pertenecen a esta materia.')
+
+    def changed_grades(self):
+        """Return the edited Grade instances (rows whose form has changed)."""
+        return [form.instance for form in self.forms if form.has_changed()]
+
+
+GradeGridFormSet = forms.modelformset_factory(
+    Grade, form=GradeGridForm, formset=BaseGradeGridFormSet, extra=0, can_delete=False
+)
@@ -0,0 +1,239 @@
+"""Import of a subject's grades from a professor's spreadsheet.
+
+Includes:
+- GradeImport: stream-parse (student_id, promotion_grade, final_grade) CSV rows
+  of one subject, validate them against the subject's inscriptions, and either
+  preview the resulting changes or apply them in chunks.
+- GradeChange / GradeRowError: one changed grade and one rejected row.
+- stage_upload / staged_path / discard_staged: keep an upload on disk between
+  the preview and the confirmation.
+
+Notes:
+    - Rows are read one at a time; only the subject's current grades (one query)
+      and the current chunk are kept in memory, never the whole file.
+    - Grade values use a dot or a comma as decimal separator and must be between
+      0 and 10; an empty cell clears the value. A new final grade clears the
+      manual status, so the database derives the status from it; otherwise the
+      manual status (e.g. regular from inscription) is kept.
+    - Applying re-reads the staged file and diffs it against the grades as they
+      are at that moment; rows that no longer differ are not written again.
+"""
+
+import csv
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import Grade
+from academics.signals import grades_bulk_changed
+from inscriptions.models import SubjectInscription
+
+GRADE_IMPORT_CHUNK_SIZE = 1000
+HEADER = ("student_id", "promotion_grade", "final_grade")
+MAX_GRADE = Decimal("10")
+
+
+class GradeChange(NamedTuple):
+    """A grade that the import changes: CSV line, student, and old/new values."""
+    line: int
+    student_id: str
+    old_promotion_grade: Decimal | None
+    old_final_grade: Decimal | None
+    old_status: str
+    promotion_grade: Decimal | None
+    final_grade: Decimal | None
+    status: str
+
+
+class GradeRowError(NamedTuple):
+    """A rejected CSV row: 1-based line number, student_id as written, and the reason."""
+    line: int
+    student_id: str
+    error: str
+
+
+def _parse_grade(value):
+    """Return the Decimal in `value` (None when empty); raise ValueError when invalid."""
+    if not value:
+        return None
+    try:
+        grade = Decimal(value.replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"Nota inválida: {value!r}.") from None
+    if not grade.is_finite() or not 0 <= grade <= MAX_GRADE or grade.as_tuple().exponent < -2:
+        raise ValueError(f"Nota fuera de rango: {value!r}.")
+    return grade
+
+
+class GradeImport:
+    """
+    Grades of one subject, as changed by a CSV file.
+
+    Attributes:
+        subject (Subject): Subject being graded.
+        chunk_size (int): Grades written per transaction by apply().
+    """
+
+    def __init__(self, subject, chunk_size=GRADE_IMPORT_CHUNK_SIZE):
+        self.subject = subject
+        self.chunk_size = chunk_size
+
+    def _load(self):
+        """Return {student_id: Grade} for the students inscribed in the subject."""
+        inscribed = SubjectInscription.objects.filter(subject=self.subject).values("student_id")
+        return {
+            grade.student_id: grade
+            for grade in Grade.objects.filter(subject=self.subject, student_id__in=inscribed).only(
+                "pk", "student_id", "subject_id", "promotion_grade", "final_grade", "status", "status_override"
+            )
+        }
+
+    def rows(self, lines, grades=None):
+        """
+        Yield a GradeChange or GradeRowError per CSV row; unchanged rows yield nothing.
+
+        Args:
+            lines (Iterable[str]): CSV text lines (an open text file works).
+            grades (dict | None): Preloaded grades by student_id; loaded when omitted.
+        """
+        if grades is None:
+            grades = self._load()
+        seen = set()
+        for line, row in enumerate(csv.reader(lines), start=1):
+            values = [value.strip() for value in row]
+            if not any(values):
+                continue
+            if line == 1 and tuple(value.lower() for value in values) == HEADER:
+                continue
+            student_id = values[0]
+            if len(values) != 3:
+                yield GradeRowError(line, student_id, "Se esperaban 3 columnas.")
+                continue
+            grade = grades.get(student_id)
+            if grade is None:
+                yield GradeRowError(line, student_id, "El estudiante no está inscripto en la materia.")
+                continue
+            if student_id in seen:
+                yield GradeRowError(line, student_id, "Fila repetida en el archivo.")
+                continue
+            seen.add(student_id)
+            try:
+                promotion_grade, final_grade = _parse_grade(values[1]), _parse_grade(values[2])
+            except ValueError as exc:
+                yield GradeRowError(line, student_id, str(exc))
+                continue
+            # A new final grade replaces the manual status (e.g. regular from inscription).
+            if final_grade != grade.final_grade:
+                status = Grade(final_grade=final_grade).derived_status()
+            else:
+                status = grade.status_override or Grade(final_grade=final_grade).derived_status()
+            if (promotion_grade, final_grade, status) != (grade.promotion_grade, grade.final_grade, grade.status):
+                yield GradeChange(
+                    line, student_id, grade.promotion_grade, grade.final_grade, grade.status,
+                    promotion_grade, final_grade, status,
+                )
+
+    def preview(self, lines, limit=200, error_limit=200):
+        """
+        Diff the file against the current grades without writing anything.
+
+        Args:
+            lines (Iterable[str]): CSV text lines.
+            limit (int): Changes kept for display; the rest are only counted.
+            error_limit (int): Rejected rows kept for display; the rest are only counted.
+
+        Returns:
+            dict: changes (first `limit` GradeChange), change_count, errors (first
+            `error_limit` GradeRowError), and error_count.
+        """
+        changes, errors, count, error_count = [], [], 0, 0
+        for item in self.rows(lines):
+            if isinstance(item, GradeRowError):
+                error_count += 1
+                if len(errors) < error_limit:
+                    errors.append(item)
+                continue
+            count += 1
+            if len(changes) < limit:
+                changes.append(item)
+        return {"changes": changes, "change_count": count, "errors": errors, "error_count": error_count}
+
+    def apply(self, lines):
+        """
+        Write the changes of the file with one bulk_update per chunk.
+
+        Rejected rows are skipped.
+
+        Args:
+            lines (Iterable[str]): CSV text lines.
+
+        Returns:
+            int: Number of grades updated.
+        """
+        grades = self._load()
+        chunk, updated = [], 0
+        for item in self.rows(lines, grades):
+            if isinstance(item, GradeChange):
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    updated += self._write(chunk, grades)
+                    chunk = []
+        if chunk:
+            updated += self._write(chunk, grades)
+        return updated
+
+    def _write(self, changes, grades):
+        now = timezone.now()
+        objs = []
+        for change in changes:
+            grade = grades[change.student_id]
+            if change.final_grade != grade.final_grade:
+                grade.status_override = None
+            grade.promotion_grade, grade.final_grade = change.promotion_grade, change.final_grade
+            grade.last_updated = now
+            objs.append(grade)
+        with transaction.atomic():
+            Grade.objects.bulk_update(objs, ["promotion_grade", "final_grade", "status_override", "last_updated"])
+        grades_bulk_changed.send(sender=Grade, student_ids=[grade.student_id for grade in objs])
+        return len(objs)
+
+
+def staged_path(token):
+    """Return the path of the staged upload `token` (a hex uuid from stage_upload())."""
+    uuid.UUID(hex=token)  # rejects anything that is not a token, e.g. "../"
+    return settings.GRADE_IMPORT_STAGING_DIR / f"{token}.csv"
+
+
+def stage_upload(upload, max_age=86400):
+    """
+    Copy an uploaded file to the staging directory chunk by chunk.
+
+    Staged files older than `max_age` seconds (abandoned previews) are removed.
+
+    Args:
+        upload (UploadedFile): The CSV upload.
+
+    Returns:
+        str: Token identifying the staged file.
+    """
+    directory = settings.GRADE_IMPORT_STAGING_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    cutoff = time.time() - max_age
+    for old in directory.glob("*.csv"):
+        if old.stat().st_mtime < cutoff:
+            old.unlink(missing_ok=True)
+    token = uuid.uuid4().hex
+    with open(staged_path(token), "wb") as fh:
+        for chunk in upload.chunks():
+            fh.write(chunk)
+    return token
+
+
+def discard_staged(token):
+    """Delete the staged upload `token`, if it still exists."""
+    staged_path(token).unlink(missing_ok=True)
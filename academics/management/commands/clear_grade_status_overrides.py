@@ -0,0 +1,33 @@
+"""Clear manual grade statuses so they follow the final grades, with one set-based UPDATE.
+
+This erases the statuses professors set by hand (including the REGULAR status
+given at inscription); without --yes it only reports how many would be cleared.
+
+Usage:
+    python manage.py clear_grade_status_overrides --subject MAT101
+    python manage.py clear_grade_status_overrides --career ING --yes
+"""
+
+from django.core.management.base import BaseCommand
+
+from academics.management.commands.recompute_grade_statuses import add_filter_arguments, filtered_grades
+from academics.services import clear_grade_status_overrides
+
+
+class Command(BaseCommand):
+    help = "Clear manual grade statuses (status_override) so they follow the final grades. Requires --yes."
+
+    def add_arguments(self, parser):
+        add_filter_arguments(parser)
+        parser.add_argument("--yes", action="store_true", help="Clear them; without it nothing is written.")
+
+    def handle(self, *args, **options):
+        grades = filtered_grades(options)
+        if not options["yes"]:
+            count = grades.filter(status_override__isnull=False).count()
+            self.stdout.write(self.style.WARNING(
+                f"{count} grades have a manual status. Nothing was changed; run again with --yes to clear them."
+            ))
+            return
+        changed = clear_grade_status_overrides(grades)
+        self.stdout.write(self.style.SUCCESS(f"Cleared the manual status of {changed} grades."))
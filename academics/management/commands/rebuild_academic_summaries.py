@@ -0,0 +1,17 @@
+"""Recompute every StudentAcademicSummary from the grades table.
+
+Usage:
+    python manage.py rebuild_academic_summaries
+"""
+
+from django.core.management.base import BaseCommand
+
+from academics.models import StudentAcademicSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute all student academic summaries with one set-based statement."
+
+    def handle(self, *args, **options):
+        written = StudentAcademicSummary.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} academic summaries."))
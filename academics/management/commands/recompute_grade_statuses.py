@@ -0,0 +1,48 @@
+"""Check that grade statuses follow the final grades, with one aggregate query.
+
+Grade.status is computed by the database, so nothing needs rewriting; the
+command reports the grades kept apart from the rule by a manual status. It
+never changes them (see clear_grade_status_overrides).
+
+Usage:
+    python manage.py recompute_grade_statuses
+    python manage.py recompute_grade_statuses --career ING --subject MAT101 --subject FIS101
+"""
+
+from django.core.management.base import BaseCommand
+
+from academics.models import Grade
+from academics.services import recompute_grade_statuses
+
+
+def filtered_grades(options):
+    """Grades narrowed by the --career/--subject options (shared with clear_grade_status_overrides)."""
+    grades = Grade.objects.all()
+    if options["career"]:
+        grades = grades.filter(subject__career_id__in=options["career"])
+    if options["subject"]:
+        grades = grades.filter(subject_id__in=options["subject"])
+    return grades
+
+
+def add_filter_arguments(parser):
+    parser.add_argument("--career", action="append", default=[], help="Only grades of this career code (repeatable).")
+    parser.add_argument("--subject", action="append", default=[], help="Only grades of this subject code (repeatable).")
+
+
+class Command(BaseCommand):
+    help = "Report grade statuses (promoted/regular/free) that differ from the final grades; writes nothing."
+
+    def add_arguments(self, parser):
+        add_filter_arguments(parser)
+
+    def handle(self, *args, **options):
+        report = recompute_grade_statuses(filtered_grades(options))
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {report.checked} grades: statuses are computed from the final grade, none needed updating."
+        ))
+        if report.overridden:
+            self.stdout.write(
+                f"{report.overridden} grades keep a manual status that differs from their final grade; "
+                "clear_grade_status_overrides --yes would reset them."
+            )
@@ -2,15 +2,22 @@
 
 Defines core academic entities and their relationships:
 - Faculty -> Career -> Subject hierarchy.
+- Correlative prerequisites between Subjects of a Career.
 - FinalExam sessions per Subject.
 - Grade linking a Student to a Subject with status and grades.
+- StudentAcademicSummary: per-student grade totals maintained from Grade changes.
 
 Notes:
     - String representations (__str__) are optimized for admin readability.
     - Uniqueness of (student, subject) is enforced at the Grade model level.
 """
 
-from django.db import models
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.db.models import Avg, Case, Count, Max, Q, Value, When
+from django.db.models.functions import Coalesce
 
 
 class Faculty(models.Model):
@@ -78,6 +85,9 @@ class Subject(models.Model):
         period (str): One of Period choices.
         semanal_hours (int): Weekly contact hours.
         description (str | None): Optional description.
+        capacity (int | None): Seat limit; None means unlimited.
+        seats_taken (int): Current inscriptions, maintained by inscriptions.services
+            and inscriptions.signals.
     """
 
     class Category(models.TextChoices):
@@ -99,10 +109,74 @@ class Subject(models.Model):
     period = models.CharField(max_length=10, choices=Period.choices)
     semanal_hours = models.PositiveIntegerField()
     description = models.TextField(blank=True, null=True)
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text='Leave empty for unlimited seats.')
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Admin subject list filtered by career and year, paged by code (main.pagination).
+            models.Index(fields=['career', 'year', 'code'], name='subject_career_year_code_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.code}) - {self.career.name}"
 
+    @property
+    def seats_left(self):
+        """Free seats, or None when the subject has no seat limit."""
+        return None if self.capacity is None else max(self.capacity - self.seats_taken, 0)
+
+
+class Correlative(models.Model):
+    """
+    Prerequisite of a Subject in its study plan.
+
+    Attributes:
+        subject (Subject): Subject that has the prerequisite (FK).
+        required_subject (Subject): Subject that must be passed first (FK).
+        requirement (str): One of Requirement choices: REGULAR (regular or promoted
+            status is enough) or PROMOTED.
+
+    Notes:
+        - Both subjects must belong to the same career and the graph must stay
+          acyclic; clean() checks both.
+        - Eligibility is evaluated against academics.correlatives.CorrelativeIndex,
+          the per-career transitive closure of these rows.
+    """
+
+    class Requirement(models.TextChoices):
+        """Status the student needs in the required subject."""
+        REGULAR = 'regular', 'Regular'
+        PROMOTED = 'promoted', 'Promoted'
+
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='correlatives')
+    required_subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='required_by')
+    requirement = models.CharField(max_length=10, choices=Requirement.choices, default=Requirement.REGULAR)
+
+    class Meta:
+        unique_together = ('subject', 'required_subject')
+        constraints = [
+            models.CheckConstraint(
+                condition=~models.Q(subject=models.F('required_subject')), name='correlative_not_self'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject_id} requires {self.required_subject_id} ({self.requirement})"
+
+    def clean(self):
+        """Reject prerequisites from another career and cycles in the study plan."""
+        from academics.correlatives import correlative_index
+
+        if not (self.subject_id and self.required_subject_id):
+            return
+        if self.subject_id == self.required_subject_id:
+            raise ValidationError('A subject cannot require itself.')
+        if self.subject.career_id != self.required_subject.career_id:
+            raise ValidationError('Both subjects must belong to the same career.')
+        if self.subject_id in correlative_index(self.subject.career_id).prerequisites(self.required_subject_id):
+            raise ValidationError(f'{self.required_subject_id} already requires {self.subject_id}.')
+
 
 class FinalExam(models.Model):
     """
@@ -115,6 +189,9 @@ class FinalExam(models.Model):
         duration (timedelta): Expected duration.
         call_number (int): Call identifier/ordinal within the period.
         notes (str | None): Optional remarks for logistics or scope.
+        capacity (int | None): Seat limit; None means unlimited.
+        seats_taken (int): Current inscriptions, maintained by inscriptions.services
+            and inscriptions.signals.
     """
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='final_exams')
     date = models.DateField()
@@ -122,10 +199,25 @@ class FinalExam(models.Model):
     duration = models.DurationField()
     call_number = models.PositiveSmallIntegerField()
     notes = models.TextField(blank=True, null=True)
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text='Leave empty for unlimited seats.')
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Upcoming finals of a set of subjects: WHERE subject_id IN (...) AND date BETWEEN ...
+            models.Index(fields=['subject', 'date'], name='finalexam_subject_date_idx'),
+            # Admin final list paged by (date, id) (main.pagination).
+            models.Index(fields=['date', 'id'], name='finalexam_date_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.subject.name} Final Exam on {self.date.strftime('%Y-%m-%d')}"
 
+    @property
+    def seats_left(self):
+        """Free seats, or None when the final exam has no seat limit."""
+        return None if self.capacity is None else max(self.capacity - self.seats_taken, 0)
+
 
 class Grade(models.Model):
     """
@@ -137,14 +229,21 @@ class Grade(models.Model):
         student (users.Student): Student owning this record (FK).
         subject (Subject): Subject graded (FK).
         promotion_grade (Decimal | None): Continuous assessment/commission grade.
-        status (str): One of StatusSubject choices (FREE, REGULAR, PROMOTED).
+        status (str): One of StatusSubject choices (FREE, REGULAR, PROMOTED), computed by the database.
+        status_override (str | None): Status set by hand; replaces the derived one while set.
         final_grade (Decimal | None): Final exam grade, if applicable.
         last_updated (datetime): Auto-updated timestamp on save.
         notes (str | None): Optional comments.
 
     Notes:
         - Uniqueness of (student, subject) is enforced via Meta.unique_together.
-        - Status transitions are maintained by update_status().
+        - status is a stored generated column: status_override when set, otherwise
+          derived from final_grade (see derived_status()). Every write path, including
+          QuerySet.update() and bulk_create()/bulk_update(), gets it right in the same
+          statement; it cannot be assigned.
+        - Grades created by a subject inscription start with status_override set to
+          INSCRIPTION_STATUS (regular). Until a grade or another status is recorded on
+          them (is_inscription_placeholder), they do not satisfy correlatives.
     """
 
     class StatusSubject(models.TextChoices):
@@ -153,10 +252,28 @@ class Grade(models.Model):
         REGULAR = 'regular', 'Regular'
         PROMOTED = 'promoted', 'Promoted'
 
+    # Manual status of the grade created with a subject inscription: the student
+    # is regular until a final grade (entered through the grade form, grid or
+    # CSV import) replaces it with the derived status.
+    INSCRIPTION_STATUS = StatusSubject.REGULAR
+
     student = models.ForeignKey('users.Student', on_delete=models.CASCADE, related_name='grades')
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='grades')
     promotion_grade = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
-    status = models.CharField(max_length=10, choices=StatusSubject.choices, default=StatusSubject.REGULAR)
+    status_override = models.CharField(max_length=10, choices=StatusSubject.choices, blank=True, null=True)
+    status = models.GeneratedField(
+        expression=Coalesce(
+            'status_override',
+            Case(
+                When(final_grade__gte=6, then=Value(StatusSubject.PROMOTED)),
+                When(final_grade__isnull=False, then=Value(StatusSubject.REGULAR)),
+                default=Value(StatusSubject.FREE),
+            ),
+        ),
+        output_field=models.CharField(max_length=10, choices=StatusSubject.choices),
+        choices=StatusSubject.choices,
+        db_persist=True,
+    )
     final_grade = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     last_updated = models.DateTimeField(auto_now=True)
     notes = models.TextField(blank=True, null=True)
@@ -167,9 +284,14 @@ class Grade(models.Model):
     def __str__(self):
         return f"{self.student.user.username} - {self.subject.name} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        """Save the grade and mirror the status the database computed, without reading it back."""
+        super().save(*args, **kwargs)
+        self.status = self.status_override or self.derived_status()
+
     def update_status(self):
         """
-        Update and persist the status based on current final_grade.
+        Drop any manual status override and persist, so the status follows final_grade.
 
         Logic:
             - If final_grade is not None and >= 6.0 -> PROMOTED.
@@ -178,15 +300,149 @@ class Grade(models.Model):
 
         Side Effects:
             Saves the instance (self.save()).
-
-        Raises:
-            TypeError: If final_grade is not a number when provided.
         """
+        self.status_override = None
+        self.save()
+
+    def derived_status(self):
+        """Return the status implied by final_grade alone, ignoring status_override."""
         if self.final_grade is not None:
             if self.final_grade >= 6.0:
-                self.status = self.StatusSubject.PROMOTED
-            else:
-                self.status = self.StatusSubject.REGULAR
-        else:
-            self.status = self.StatusSubject.FREE
-        self.save()
+                return self.StatusSubject.PROMOTED
+            return self.StatusSubject.REGULAR
+        return self.StatusSubject.FREE
+
+    @classmethod
+    def derived_status_expression(cls):
+        """Return derived_status() as the SQL CASE expression the status column is generated from."""
+        _, derived = cls._meta.get_field("status").expression.get_source_expressions()
+        return derived.copy()
+
+    @property
+    def is_inscription_placeholder(self):
+        """True while the grade is still as the subject inscription created it."""
+        return (
+            self.status_override == self.INSCRIPTION_STATUS
+            and self.promotion_grade is None
+            and self.final_grade is None
+        )
+
+    @classmethod
+    def inscription_placeholder_q(cls):
+        """Return is_inscription_placeholder as a Q filter."""
+        return Q(status_override=cls.INSCRIPTION_STATUS, promotion_grade__isnull=True, final_grade__isnull=True)
+
+
+class StudentAcademicSummary(models.Model):
+    """
+    Denormalized grade totals of one Student.
+
+    Kept up to date by academics.signals whenever a Grade is saved or deleted
+    (including through Grade.update_status), so readers fetch one row instead of
+    aggregating every grade.
+
+    Attributes:
+        student (users.Student): Summarized student (primary key).
+        promoted_count (int): Grades in PROMOTED status.
+        regular_count (int): Grades in REGULAR status.
+        free_count (int): Grades in FREE status.
+        average_final_grade (Decimal | None): Mean of the non-null final grades.
+        last_grade_change (datetime | None): Latest Grade.last_updated.
+
+    Notes:
+        - QuerySet.update()/bulk_create() on Grade bypass the signals; call
+          refresh() for the touched students or rebuild() afterwards.
+    """
+    student = models.OneToOneField(
+        'users.Student', on_delete=models.CASCADE, primary_key=True, related_name='academic_summary'
+    )
+    promoted_count = models.PositiveIntegerField(default=0)
+    regular_count = models.PositiveIntegerField(default=0)
+    free_count = models.PositiveIntegerField(default=0)
+    average_final_grade = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+    last_grade_change = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.student_id}: {self.promoted_count} promoted, {self.regular_count} regular"
+
+    @classmethod
+    def refresh(cls, student_ids):
+        """
+        Recompute the summaries of the given students from their grades.
+
+        Runs one aggregate over the students' grades and one upsert, regardless
+        of how many students are passed.
+
+        Args:
+            student_ids (Iterable[str]): Student primary keys.
+        """
+        student_ids = set(student_ids)
+        if not student_ids:
+            return
+        totals = {
+            row["student_id"]: row
+            for row in Grade.objects.filter(student_id__in=student_ids)
+            .values("student_id")
+            .annotate(
+                promoted=Count("pk", filter=Q(status=Grade.StatusSubject.PROMOTED)),
+                regular=Count("pk", filter=Q(status=Grade.StatusSubject.REGULAR)),
+                free=Count("pk", filter=Q(status=Grade.StatusSubject.FREE)),
+                average=Avg("final_grade"),
+                last_change=Max("last_updated"),
+            )
+        }
+        summaries = []
+        for student_id in student_ids:
+            row = totals.get(student_id, {})
+            average = row.get("average")
+            summaries.append(cls(
+                student_id=student_id,
+                promoted_count=row.get("promoted", 0),
+                regular_count=row.get("regular", 0),
+                free_count=row.get("free", 0),
+                average_final_grade=None if average is None else Decimal(average).quantize(Decimal("0.01")),
+                last_grade_change=row.get("last_change"),
+            ))
+        cls.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=["student"],
+            update_fields=["promoted_count", "regular_count", "free_count", "average_final_grade", "last_grade_change"],
+        )
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every summary with a single INSERT ... SELECT ... ON CONFLICT statement.
+
+        Every student gets a row, including students without grades.
+
+        Returns:
+            int: Number of summaries written.
+        """
+        from users.models import Student
+
+        qn = connection.ops.quote_name
+        summary, grade, student = cls._meta.db_table, Grade._meta.db_table, Student._meta.db_table
+        student_pk = Student._meta.pk.column
+        columns = ["promoted_count", "regular_count", "free_count", "average_final_grade", "last_grade_change"]
+        sql = f"""
+            INSERT INTO {qn(summary)} ({qn("student_id")}, {", ".join(qn(c) for c in columns)})
+            SELECT s.{qn(student_pk)},
+                   COUNT(CASE WHEN g.{qn("status")} = %s THEN 1 END),
+                   COUNT(CASE WHEN g.{qn("status")} = %s THEN 1 END),
+                   COUNT(CASE WHEN g.{qn("status")} = %s THEN 1 END),
+                   AVG(g.{qn("final_grade")}),
+                   MAX(g.{qn("last_updated")})
+            FROM {qn(student)} s
+            LEFT JOIN {qn(grade)} g ON g.{qn("student_id")} = s.{qn(student_pk)}
+            WHERE 1 = 1
+            GROUP BY s.{qn(student_pk)}
+            ON CONFLICT ({qn("student_id")}) DO UPDATE SET
+                {", ".join(f"{qn(c)} = EXCLUDED.{qn(c)}" for c in columns)}
+        """
+        # WHERE 1 = 1 keeps SQLite from parsing ON CONFLICT as part of the join.
+        params = [Grade.StatusSubject.PROMOTED, Grade.StatusSubject.REGULAR, Grade.StatusSubject.FREE]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
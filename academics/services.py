@@ -0,0 +1,74 @@
+"""Set-based maintenance of grades.
+
+Includes:
+- recompute_grade_statuses: check the statuses of any queryset of grades against
+  their final grades, with one aggregate query; nothing is written.
+- clear_grade_status_overrides: drop the manual status of any queryset of grades
+  with a single UPDATE statement, so their status follows the final grade.
+
+Notes:
+    - Grade.status is a database-generated column (status_override, or the rule
+      of Grade.derived_status()), so statuses never go stale after rule changes
+      or data imports; recompute_grade_statuses only reports the grades whose
+      manual status differs from the rule.
+    - Clearing manual statuses erases what professors set by hand; the
+      management command and the GradeAdmin action ask for confirmation first.
+    - QuerySet.update() bypasses post_save; grades_bulk_changed is sent for the
+      students whose grades changed, in chunks of REFRESH_CHUNK_SIZE.
+"""
+
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from academics.models import Grade
+from academics.signals import grades_bulk_changed
+
+REFRESH_CHUNK_SIZE = 5000
+
+
+class GradeStatusReport(NamedTuple):
+    """Result of recompute_grade_statuses()."""
+    checked: int
+    overridden: int  # grades whose manual status differs from their final grade
+
+
+def recompute_grade_statuses(queryset=None):
+    """
+    Check the status of every grade in `queryset` against its final grade, without writing.
+
+    Args:
+        queryset (QuerySet[Grade] | None): Grades to check; all grades when omitted.
+
+    Returns:
+        GradeStatusReport: Grades checked, and those kept apart from the rule by a manual status.
+    """
+    if queryset is None:
+        queryset = Grade.objects.all()
+    overridden = Q(status_override__isnull=False) & ~Q(status_override=Grade.derived_status_expression())
+    totals = queryset.order_by().aggregate(checked=Count("pk"), overridden=Count("pk", filter=overridden))
+    return GradeStatusReport(totals["checked"], totals["overridden"])
+
+
+def clear_grade_status_overrides(queryset=None):
+    """
+    Clear the manual status of every grade in `queryset`, so the status follows the final grade.
+
+    Args:
+        queryset (QuerySet[Grade] | None): Grades to reset; all grades when omitted.
+
+    Returns:
+        int: Number of grades that had a manual status.
+    """
+    if queryset is None:
+        queryset = Grade.objects.all()
+    overridden = queryset.filter(status_override__isnull=False)
+    with transaction.atomic():
+        student_ids = list(overridden.order_by().values_list("student_id", flat=True).distinct())
+        changed = overridden.update(status_override=None, last_updated=timezone.now()) if student_ids else 0
+    for start in range(0, len(student_ids), REFRESH_CHUNK_SIZE):
+        grades_bulk_changed.send(sender=Grade, student_ids=student_ids[start:start + REFRESH_CHUNK_SIZE])
+    return changed
+
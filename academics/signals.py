@@ -0,0 +1,64 @@
+"""Signals and receivers maintaining StudentAcademicSummary and the correlative index.
+
+Includes:
+- grades_bulk_changed: sent (sender=Grade, student_ids=[...]) by code that writes
+  grades without post_save (raw SQL, bulk_create, QuerySet.update).
+- Correlative and Subject changes drop the cached CorrelativeIndex of the career.
+
+Notes:
+    - Connected in AcademicsConfig.ready().
+    - Grade.update_status() saves the grade, so it is covered by post_save.
+    - Grades deleted because their student (or user) is being deleted are skipped:
+      the summary goes away with the student.
+"""
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from academics.correlatives import invalidate_correlative_index
+from academics.models import Correlative, Grade, StudentAcademicSummary, Subject
+from users.models import CustomUser, Student
+
+
+grades_bulk_changed = Signal()
+
+
+def _deletes_student(origin):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, (Student, CustomUser))
+
+
+@receiver(post_save, sender=Grade)
+def refresh_student_summary(sender, instance, **kwargs):
+    """Recompute the summary of the student owning `instance`."""
+    StudentAcademicSummary.refresh([instance.student_id])
+
+
+@receiver(post_delete, sender=Grade)
+def refresh_student_summary_on_delete(sender, instance, origin=None, **kwargs):
+    """Recompute the summary after a grade is removed, unless its student is going too."""
+    if origin is not None and _deletes_student(origin):
+        return
+    StudentAcademicSummary.refresh([instance.student_id])
+
+
+@receiver(grades_bulk_changed, sender=Grade)
+def refresh_student_summaries(sender, student_ids, **kwargs):
+    """Recompute the summaries of students whose grades were written in bulk."""
+    StudentAcademicSummary.refresh(student_ids)
+
+
+@receiver([post_save, post_delete], sender=Correlative)
+def expire_correlative_index(sender, instance, **kwargs):
+    """Drop the cached index of the career `instance` belongs to."""
+    invalidate_correlative_index(
+        Subject.objects.filter(pk__in=[instance.subject_id, instance.required_subject_id])
+        .values_list("career_id", flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Subject)
+def expire_subject_correlative_index(sender, instance, **kwargs):
+    """Drop the cached index of the subject's career (the subject may have moved or gone)."""
+    invalidate_correlative_index([instance.career_id])
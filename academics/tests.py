@@ -1,5 +1,19 @@
-from django.test import TestCase
-from academics.models import Faculty, Career, Subject, FinalExam, Grade
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, models
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.state import ModelState, ProjectState
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from academics.correlatives import CorrelativeIndex, correlative_index, missing_correlatives
+from academics.importers import GradeChange, GradeImport, GradeRowError
+from academics.upgrades import generated_status_operations
+from academics.services import GradeStatusReport, clear_grade_status_overrides, recompute_grade_statuses
+from academics.models import Faculty, Career, Correlative, Subject, FinalExam, Grade, StudentAcademicSummary
+from inscriptions.models import SubjectInscription
 from users.models import CustomUser, Student
 import datetime
 
@@ -82,6 +96,95 @@ class SubjectModelTest(TestCase):
         self.assertEqual(str(subject), 'Matemática (MAT101) - Ingeniería')
 
 
+class CorrelativeTest(TestCase):
+    def setUp(self):
+        SubjectModelTest.setUp(self)
+        self.am1, self.am2, self.am3, self.fis = (
+            Subject.objects.create(
+                name=code, code=code, career=self.career, year=1,
+                category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=6
+            )
+            for code in ('AM1', 'AM2', 'AM3', 'FIS')
+        )
+        Correlative.objects.create(subject=self.am2, required_subject=self.am1)
+        Correlative.objects.create(
+            subject=self.am3, required_subject=self.am2, requirement=Correlative.Requirement.PROMOTED
+        )
+        Correlative.objects.create(subject=self.am3, required_subject=self.fis)
+
+    def test_index_closure(self):
+        index = correlative_index(self.career.code)
+        self.assertEqual(sorted(index.prerequisites('AM3')), ['AM1', 'AM2', 'FIS'])
+        self.assertFalse(index.has_requirements('AM1'))
+
+        regular, promoted = Grade.StatusSubject.REGULAR, Grade.StatusSubject.PROMOTED
+        standing = index.standing([('AM1', regular), ('AM2', regular), ('FIS', promoted)])
+        self.assertEqual(index.missing('AM2', standing), [])
+        self.assertEqual(index.missing('AM3', standing), ['AM2'])
+        self.assertEqual(index.missing('AM2', standing, for_final=True), ['AM1'])
+        # The transitive prerequisite AM1 is required too.
+        standing = index.standing([('AM2', promoted), ('FIS', regular)])
+        self.assertEqual(index.missing('AM3', standing), ['AM1'])
+        self.assertEqual(sorted(index.missing('AM3', index.standing([]))), ['AM1', 'AM2', 'FIS'])
+
+    def test_index_cache_follows_changes(self):
+        correlative_index(self.career.code)
+        with self.assertNumQueries(0):
+            correlative_index(self.career.code)
+        Correlative.objects.filter(subject=self.am2).delete()  # QuerySet.delete() sends post_delete
+        self.assertEqual(sorted(correlative_index(self.career.code).prerequisites('AM3')), ['AM2', 'FIS'])
+
+    def test_missing_correlatives_for_student(self):
+        self.student = Student.objects.create(
+            student_id='S1',
+            user=CustomUser.objects.create_user(
+                username='student1', password='testpass', role=CustomUser.Role.STUDENT, dni='12345678'
+            ),
+            career=self.career,
+            enrollment_date='2022-01-01'
+        )
+        self.assertEqual(missing_correlatives(self.student, self.am2), ['AM1'])
+        Grade.objects.create(student=self.student, subject=self.am1, final_grade=Decimal('5'))  # regular
+        self.assertEqual(missing_correlatives(self.student, self.am2), [])
+        with self.assertNumQueries(0):  # no prerequisites, no grade query
+            self.assertEqual(missing_correlatives(self.student, self.am1), [])
+
+    def test_inscription_placeholder_is_not_regular(self):
+        student = Student.objects.create(
+            student_id='S1',
+            user=CustomUser.objects.create_user(
+                username='student1', password='testpass', role=CustomUser.Role.STUDENT, dni='12345678'
+            ),
+            career=self.career,
+            enrollment_date='2022-01-01'
+        )
+        # As created by the AM1 inscription: regular, with nothing recorded yet.
+        grade = Grade.objects.create(student=student, subject=self.am1, status_override=Grade.INSCRIPTION_STATUS)
+        self.assertTrue(grade.is_inscription_placeholder)
+        self.assertEqual(missing_correlatives(student, self.am2), ['AM1'])
+        grade.promotion_grade = Decimal('7')  # regularity recorded by the professor
+        grade.save()
+        self.assertEqual(missing_correlatives(student, self.am2), [])
+
+    def test_clean_rejects_cycles_and_other_careers(self):
+        with self.assertRaises(ValidationError):
+            Correlative(subject=self.am1, required_subject=self.am3).full_clean()
+        other = Career.objects.create(
+            name='Medicina', code='MED', faculty=self.faculty, director='Director', duration_years=6
+        )
+        anatomy = Subject.objects.create(
+            name='Anatomía', code='ANA', career=other, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=6
+        )
+        with self.assertRaises(ValidationError):
+            Correlative(subject=anatomy, required_subject=self.am1).full_clean()
+        Correlative(subject=self.fis, required_subject=self.am1).full_clean()
+
+    def test_index_survives_cycles_in_data(self):
+        index = CorrelativeIndex([('A', 'B', 'regular'), ('B', 'A', 'regular')])
+        self.assertEqual(index.missing('A', index.standing([('B', 'regular')])), ['A'])
+
+
 class FinalExamModelTest(TestCase):
     def setUp(self):
         self.faculty = Faculty.objects.create(
@@ -170,7 +273,7 @@ class GradeModelTest(TestCase):
             student=self.student,
             subject=self.subject,
             promotion_grade=8.5,
-            status=Grade.StatusSubject.REGULAR,
+            status_override=Grade.StatusSubject.REGULAR,
             final_grade=7.0,
             notes='Buen desempeño'
         )
@@ -192,3 +295,228 @@ class GradeModelTest(TestCase):
         grade.final_grade = 5.0
         grade.update_status()
         self.assertEqual(grade.status, Grade.StatusSubject.REGULAR)
+
+    def test_status_is_generated_by_the_database(self):
+        grade = Grade.objects.create(student=self.student, subject=self.subject)
+        self.assertEqual(grade.status, Grade.StatusSubject.FREE)
+        # Bulk writes bypass save() and still get the derived status.
+        Grade.objects.filter(pk=grade.pk).update(final_grade=Decimal('6'))
+        grade.refresh_from_db()
+        self.assertEqual(grade.status, Grade.StatusSubject.PROMOTED)
+        # A manual status wins until it is cleared.
+        grade.status_override = Grade.StatusSubject.FREE
+        with self.assertNumQueries(3):  # one UPDATE and the summary refresh (2), no read back
+            grade.save()
+        self.assertEqual(grade.status, Grade.StatusSubject.FREE)
+        self.assertEqual(Grade.objects.get(pk=grade.pk).status, Grade.StatusSubject.FREE)
+        grade.update_status()
+        self.assertEqual(Grade.objects.get(pk=grade.pk).status, Grade.StatusSubject.PROMOTED)
+
+
+class GeneratedStatusUpgradeTest(TransactionTestCase):
+    """generated_status_operations() on a table shaped like Grade before the generated column."""
+
+    def setUp(self):
+        self.state = ProjectState()
+        self.state.add_model(ModelState("academics", "grade", [
+            ("id", models.AutoField(primary_key=True)),
+            ("final_grade", models.DecimalField(max_digits=5, decimal_places=2, null=True)),
+            ("status", models.CharField(max_length=10, default="regular")),
+        ], options={"db_table": "upgradetest_grade"}))  # beside the real academics_grade table
+        with connection.schema_editor() as editor:
+            editor.create_model(self.state.apps.get_model("academics", "grade"))
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            editor.delete_model(self.state.apps.get_model("academics", "grade"))
+
+    def test_manual_statuses_survive(self):
+        OldGrade = self.state.apps.get_model("academics", "grade")
+        rows = [(None, "regular"), (Decimal("8"), "promoted"), (Decimal("8"), "free"), (None, "free")]
+        OldGrade.objects.bulk_create([OldGrade(final_grade=f, status=s) for f, s in rows])
+
+        for operation in generated_status_operations():
+            new_state = self.state.clone()
+            operation.state_forwards("academics", new_state)
+            with connection.schema_editor() as editor:
+                operation.database_forwards("academics", editor, self.state, new_state)
+            self.state = new_state
+
+        NewGrade = self.state.apps.get_model("academics", "grade")
+        self.assertEqual(list(NewGrade.objects.order_by("id").values_list("status", "status_override")), [
+            ("regular", "regular"), ("promoted", None), ("free", "free"), ("free", None),
+        ])
+        # The operations end at the current model, so makemigrations has nothing left to alter.
+        autodetector = MigrationAutodetector(self.state, self.state)
+        for name in ("status_override", "status"):
+            self.assertEqual(autodetector.deep_deconstruct(NewGrade._meta.get_field(name))[1:],
+                             autodetector.deep_deconstruct(Grade._meta.get_field(name))[1:])
+
+
+class RecomputeGradeStatusesTest(TestCase):
+    def setUp(self):
+        GradeModelTest.setUp(self)
+        self.other = Subject.objects.create(
+            name='Física', code='FIS101', career=self.career, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=6
+        )
+        self.grades = [
+            Grade.objects.create(student=self.student, subject=self.subject, final_grade=Decimal('6')),
+            Grade.objects.create(student=self.student, subject=self.other, final_grade=Decimal('5.99')),
+        ]
+        # Manual statuses left over, e.g. from a data import.
+        Grade.objects.update(status_override=Grade.StatusSubject.FREE)
+
+    def test_recompute_only_reports(self):
+        Grade.objects.filter(subject=self.other).update(status_override=None)
+        with self.assertNumQueries(1):
+            report = recompute_grade_statuses()
+        self.assertEqual(report, GradeStatusReport(checked=2, overridden=1))  # MAT101: FREE by hand, final 6
+        self.assertEqual(Grade.objects.filter(status_override__isnull=False).count(), 1)
+        # A manual status equal to the derived one is not reported.
+        Grade.objects.filter(subject=self.subject).update(status_override=Grade.StatusSubject.PROMOTED)
+        self.assertEqual(recompute_grade_statuses().overridden, 0)
+
+    def test_recompute_command_writes_nothing(self):
+        out = StringIO()
+        call_command('recompute_grade_statuses', '--subject', 'FIS101', stdout=out)
+        self.assertIn('Checked 1 grades', out.getvalue())
+        self.assertIn('1 grades keep a manual status', out.getvalue())
+        self.assertEqual(Grade.objects.filter(status=Grade.StatusSubject.FREE).count(), 2)
+
+    def test_clear_overrides_with_one_update(self):
+        with self.assertNumQueries(6):  # savepoint, changed students, UPDATE, release, summary refresh (2)
+            changed = clear_grade_status_overrides()
+        self.assertEqual(changed, 2)
+        for grade in self.grades:
+            grade.refresh_from_db()
+            self.assertEqual(grade.status, grade.derived_status())
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).promoted_count, 1)
+        self.assertEqual(clear_grade_status_overrides(), 0)
+
+    def test_clear_command_requires_yes(self):
+        out = StringIO()
+        call_command('clear_grade_status_overrides', '--subject', 'FIS101', stdout=out)
+        self.assertIn('Nothing was changed', out.getvalue())
+        self.assertEqual(Grade.objects.filter(status_override__isnull=False).count(), 2)
+        call_command('clear_grade_status_overrides', '--subject', 'FIS101', '--yes', stdout=out)
+        self.assertIn('Cleared the manual status of 1 grades.', out.getvalue())
+        statuses = dict(Grade.objects.values_list('subject_id', 'status'))
+        self.assertEqual(statuses, {'MAT101': Grade.StatusSubject.FREE, 'FIS101': Grade.StatusSubject.REGULAR})
+
+    def test_admin_clear_action_asks_for_confirmation(self):
+        admin = CustomUser.objects.create_superuser(username='root', password='x', email='r@example.com', dni='1')
+        self.client.force_login(admin)
+        url = reverse('admin:academics_grade_changelist')
+        data = {'action': 'clear_status_override', '_selected_action': [g.pk for g in self.grades]}
+        resp = self.client.post(url, data)
+        self.assertContains(resp, '2 de las 2 notas seleccionadas tienen un estado manual')
+        self.assertEqual(Grade.objects.filter(status_override__isnull=False).count(), 2)
+        resp = self.client.post(url, {**data, 'post': 'yes'})
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(Grade.objects.filter(status_override__isnull=False).exists())
+
+
+class GradeImportTest(TestCase):
+    def setUp(self):
+        GradeModelTest.setUp(self)
+        SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        user = CustomUser.objects.create_user(
+            username='student2', password='testpass', role=CustomUser.Role.STUDENT, dni='22345678'
+        )
+        self.other = Student.objects.create(
+            student_id='S2', user=user, career=self.career, enrollment_date='2022-01-01'
+        )
+        SubjectInscription.objects.create(student=self.other, subject=self.subject)
+        Grade.objects.filter(student=self.other).update(final_grade=Decimal('5'))
+        self.csv = [
+            'student_id,promotion_grade,final_grade\n',
+            'S1,"8,5",7\n',
+            'S2,,5\n',        # unchanged
+            'S3,8,8\n',       # not inscribed
+            'S1,1,1\n',       # repeated
+            'S2,4,11\n',      # out of range
+            'S2,4\n',         # malformed
+        ]
+
+    def test_preview_does_not_write(self):
+        preview = GradeImport(self.subject).preview(self.csv)
+        self.assertEqual(preview['change_count'], 1)
+        self.assertEqual(preview['changes'], [GradeChange(
+            2, 'S1', None, None, Grade.StatusSubject.REGULAR, Decimal('8.5'), Decimal('7'), Grade.StatusSubject.PROMOTED,
+        )])
+        self.assertEqual([(e.line, e.student_id) for e in preview['errors']],
+                         [(4, 'S3'), (5, 'S1'), (6, 'S2'), (7, 'S2')])
+        self.assertTrue(all(isinstance(e, GradeRowError) for e in preview['errors']))
+        self.assertEqual(preview['error_count'], 4)
+        self.assertIsNone(Grade.objects.get(student=self.student).final_grade)
+
+    def test_preview_keeps_only_the_first_errors(self):
+        preview = GradeImport(self.subject).preview(self.csv, error_limit=2)
+        self.assertEqual([e.line for e in preview['errors']], [4, 5])
+        self.assertEqual(preview['error_count'], 4)
+
+    def test_apply_writes_changes_in_chunks(self):
+        self.assertEqual(GradeImport(self.subject, chunk_size=1).apply(self.csv), 1)
+        grade = Grade.objects.get(student=self.student)
+        self.assertEqual((grade.promotion_grade, grade.final_grade, grade.status),
+                         (Decimal('8.5'), Decimal('7'), Grade.StatusSubject.PROMOTED))
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).promoted_count, 1)
+        # Applying the same file again changes nothing.
+        self.assertEqual(GradeImport(self.subject).apply(self.csv), 0)
+
+
+class StudentAcademicSummaryTest(TestCase):
+    def setUp(self):
+        GradeModelTest.setUp(self)
+        self.other_subject = Subject.objects.create(
+            name='Física',
+            code='FIS101',
+            career=self.career,
+            year=1,
+            category=Subject.Category.OBLIGATORY,
+            period=Subject.Period.FIRST,
+            semanal_hours=4
+        )
+
+    def summary(self):
+        return StudentAcademicSummary.objects.get(student=self.student)
+
+    def test_summary_follows_grade_changes(self):
+        grade = Grade.objects.create(student=self.student, subject=self.subject, final_grade=Decimal('8'))
+        grade.update_status()
+        Grade.objects.create(student=self.student, subject=self.other_subject, final_grade=Decimal('5'))
+        summary = self.summary()
+        self.assertEqual((summary.promoted_count, summary.regular_count, summary.free_count), (1, 1, 0))
+        self.assertEqual(summary.average_final_grade, Decimal('6.50'))
+        self.assertEqual(summary.last_grade_change, Grade.objects.latest('last_updated').last_updated)
+
+        grade.final_grade = None
+        grade.update_status()
+        summary = self.summary()
+        self.assertEqual((summary.promoted_count, summary.free_count), (0, 1))
+        self.assertEqual(summary.average_final_grade, Decimal('5.00'))
+
+        grade.delete()
+        self.assertEqual(self.summary().free_count, 0)
+
+    def test_student_deletion_removes_summary(self):
+        Grade.objects.create(student=self.student, subject=self.subject)
+        self.user.delete()
+        self.assertFalse(StudentAcademicSummary.objects.exists())
+
+    def test_rebuild_command_repairs_bulk_updates(self):
+        Grade.objects.create(student=self.student, subject=self.subject, final_grade=Decimal('9'))
+        Grade.objects.filter(student=self.student).update(status_override=Grade.StatusSubject.PROMOTED)  # no signals
+        StudentAcademicSummary.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_academic_summaries', stdout=out)
+        self.assertIn('Rebuilt 1', out.getvalue())
+        summary = self.summary()
+        self.assertEqual((summary.promoted_count, summary.regular_count), (1, 0))
+        self.assertEqual(summary.average_final_grade, Decimal('9.00'))
+
+        # A second rebuild updates the existing rows in place.
+        Grade.objects.filter(student=self.student).update(status_override=Grade.StatusSubject.FREE)
+        StudentAcademicSummary.rebuild()
+        self.assertEqual((self.summary().promoted_count, self.summary().free_count), (0, 1))
@@ -0,0 +1,75 @@
+"""Migration operations for databases created before Grade.status was generated.
+
+Includes:
+- generated_status_operations: the operations turning the stored Grade.status
+  column into the generated one without losing manual statuses.
+- copy_manual_statuses: RunPython step moving stored statuses that the final
+  grade does not explain into status_override.
+
+Notes:
+    - Migrations are generated locally (makemigrations), so these operations are
+      pasted into an empty academics migration created before the others; see
+      README, "Upgrading an existing database".
+    - Django cannot alter a column into a GeneratedField. The old column is removed
+      and the generated one added, after its manual values were copied.
+    - Field definitions are written out here, not taken from academics.models, so
+      the migration keeps describing this step when the model changes later.
+"""
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce
+
+STATUS_CHOICES = [("free", "Free"), ("regular", "Regular"), ("promoted", "Promoted")]
+
+
+def _derived_status():
+    """The status rule on final_grade, as of this migration."""
+    return Case(
+        When(final_grade__gte=6, then=Value("promoted")),
+        When(final_grade__isnull=False, then=Value("regular")),
+        default=Value("free"),
+    )
+
+
+def copy_manual_statuses(apps, schema_editor):
+    """
+    Move every stored status that the final grade does not explain into status_override.
+
+    Runs after status_override is added and before the old status column is
+    removed. Grades still carrying the old REGULAR default without a final grade
+    keep REGULAR this way, as grades created by an inscription do now.
+    """
+    Grade = apps.get_model("academics", "Grade")
+    Grade.objects.using(schema_editor.connection.alias).exclude(status=_derived_status()).update(
+        status_override=F("status")
+    )
+
+
+def generated_status_operations():
+    """
+    Return the operations replacing the stored Grade.status with the generated column.
+
+    Returns:
+        list[Operation]: AddField(status_override), RunPython(copy_manual_statuses),
+        RemoveField(status), AddField(status as a GeneratedField).
+    """
+    return [
+        migrations.AddField(
+            model_name="grade",
+            name="status_override",
+            field=models.CharField(blank=True, choices=STATUS_CHOICES, max_length=10, null=True),
+        ),
+        migrations.RunPython(copy_manual_statuses, migrations.RunPython.noop),
+        migrations.RemoveField(model_name="grade", name="status"),
+        migrations.AddField(
+            model_name="grade",
+            name="status",
+            field=models.GeneratedField(
+                expression=Coalesce("status_override", _derived_status()),
+                output_field=models.CharField(choices=STATUS_CHOICES, max_length=10),
+                choices=STATUS_CHOICES,
+                db_persist=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,6 @@
+"""Standalone performance benchmarks.
+
+Run each module from the project root, e.g.:
+
+    python -m benchmarks.certificate_template
+"""
@@ -0,0 +1,119 @@
+"""Shared helpers for the benchmarks.
+
+Includes:
+- setup_django: configure Django from DJANGO_SETTINGS_MODULE (default main.settings).
+- benchmark_database: context manager creating a throwaway test database.
+- seed_students: bulk-create a career with students (no password hashing).
+- summarize: latency percentiles for a list of samples in seconds.
+
+Notes:
+    The benchmark database is created like the test runner does (``test_<NAME>``),
+    so configured production data is never touched.
+"""
+
+import os
+import statistics
+import tempfile
+from contextlib import contextmanager
+from datetime import date
+
+
+def setup_django():
+    """Configure Django for a standalone script."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Create a test database for the duration of the block and destroy it afterwards.
+
+    SQLite databases are file-backed so that worker processes can share them.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    tmpdir = None
+    if connection.vendor == "sqlite":
+        tmpdir = tempfile.TemporaryDirectory()
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(tmpdir.name, "bench.sqlite3")
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+def seed_students(count, career_code="BENCH", prefix="bench"):
+    """
+    Create a faculty, a career and `count` students with unusable passwords.
+
+    Returns:
+        tuple[Career, list[Student]]: The career and the created students.
+    """
+    from django.contrib.auth.hashers import make_password
+
+    from academics.models import Career, Faculty
+    from users.models import CustomUser, Student
+
+    faculty, _ = Faculty.objects.get_or_create(
+        code=f"F{career_code}"[:10],
+        defaults=dict(
+            name="Facultad Benchmark", address="-", phone="-", email="bench@example.com",
+            website="https://example.com", dean="-", established_date=date(1950, 1, 1),
+        ),
+    )
+    career, _ = Career.objects.get_or_create(
+        code=career_code,
+        defaults=dict(name="Carrera Benchmark", faculty=faculty, director="-", duration_years=5),
+    )
+    unusable = make_password(None)
+    users = CustomUser.objects.bulk_create(
+        CustomUser(
+            username=f"{prefix}{i}", first_name=f"Nombre{i}", last_name=f"Apellido{i}",
+            password=unusable, role=CustomUser.Role.STUDENT, dni=f"{prefix}{i}"[-20:],
+        )
+        for i in range(count)
+    )
+    if users and users[0].pk is None:
+        users = list(CustomUser.objects.filter(username__startswith=prefix).order_by("id"))
+    students = Student.objects.bulk_create(
+        Student(student_id=f"{prefix}-{i}"[-20:], user=user, career=career, enrollment_date=date(2020, 3, 1))
+        for i, user in enumerate(users)
+    )
+    return career, students
+
+
+def summarize(samples):
+    """Return count, mean, p50, p95 and p99 (milliseconds) for `samples` in seconds."""
+    if not samples:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(s * 1000 for s in samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+    }
+
+
+def print_table(rows):
+    """Print `(label, summary)` rows produced by summarize()."""
+    print(f"{'':24} {'n':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, stats in rows:
+        print(
+            f"{label:24} {stats['count']:6d} {stats['mean']:9.2f} {stats['p50']:9.2f} "
+            f"{stats['p95']:9.2f} {stats['p99']:9.2f}"
+        )
@@ -0,0 +1,67 @@
+"""Benchmark: admin user list latency at increasing depth.
+
+Seeds `--users` students and requests /admin/users/ page by page through the
+keyset cursors, reporting the latency of the first pages and of the deepest
+ones. An OFFSET query of the same depth is timed for comparison.
+
+Usage:
+    python -m benchmarks.admin_user_list [--users 40000] [--page-size 50]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks._harness import benchmark_database, print_table, seed_students, setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=40000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["ADMIN_LIST_PAGE_SIZE"] = str(args.page_size)
+    setup_django()
+    from datetime import date
+
+    from django.test import Client
+    from django.urls import reverse
+
+    from users.models import Administrator, CustomUser
+
+    with benchmark_database():
+        seed_students(args.users, career_code="ADM", prefix="adm")
+        admin = CustomUser.objects.create_user(username="adm-admin", password="x", role=CustomUser.Role.ADMIN,
+                                               dni="adm-admin")
+        Administrator.objects.create(administrator_id="ADM-A", user=admin, position="-", hire_date=date(2020, 1, 1))
+        client = Client()
+        client.force_login(admin)
+        url = reverse("users:user-list")
+
+        samples, cursor = [], None
+        while True:
+            start = time.perf_counter()
+            resp = client.get(url, {"cursor": cursor} if cursor else {})
+            samples.append(time.perf_counter() - start)
+            cursor = resp.context["page"].next_cursor
+            if cursor is None:
+                break
+
+        depth = (len(samples) - 1) * args.page_size
+        offset = []
+        for _ in range(20):
+            start = time.perf_counter()
+            list(CustomUser.objects.order_by("id")[depth:depth + args.page_size])
+            offset.append(time.perf_counter() - start)
+
+        print(f"{len(samples)} pages of {args.page_size} users")
+        print_table([
+            ("first 20 pages", summarize(samples[:20])),
+            ("last 20 pages", summarize(samples[-20:])),
+            (f"OFFSET {depth} query", summarize(offset)),
+        ])
+
+
+if __name__ == "__main__":
+    main()
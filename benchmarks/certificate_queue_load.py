@@ -0,0 +1,167 @@
+"""Load test: student dashboard latency while certificates are being generated.
+
+Runs three phases of `--duration` seconds each, with `--dashboard-clients` threads
+loading the student dashboard in a loop:
+
+- baseline: nothing else running.
+- inline:   `--certificate-clients` threads download certificates through the
+            synchronous view, rendering inside the request cycle.
+- queued:   the same clients enqueue a job and poll its status every
+            `--poll-interval` seconds until done, like the dashboard script does;
+            `--workers` processes running the certificate worker loop render them.
+
+Every request renders a new document (the content-addressed store is bypassed),
+so the inline phase shows the worst case. Dashboard p95 should stay close to the
+baseline in the queued phase.
+
+Usage:
+    python -m benchmarks.certificate_queue_load [--duration 10] [--workers 2]
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import tempfile
+import threading
+import time
+
+from benchmarks._harness import benchmark_database, print_table, seed_students, setup_django, summarize
+
+
+def _worker_process(stop_event, niceness):
+    import os
+
+    from users.certificate_jobs import work
+
+    os.nice(niceness)
+    work(poll_interval=0.05, stop=stop_event.is_set)
+
+
+def _bypass_certificate_store():
+    """Make every CertificateStore.fetch() render, so phases measure real render cost."""
+    from users.certificates import CertificateStore
+
+    original_fetch = CertificateStore.fetch
+
+    def always_render(self, template_path, context, key=None):
+        key = key or self.key_for(template_path, context)
+        self.path_for(key).unlink(missing_ok=True)
+        return original_fetch(self, template_path, context, key=key)
+
+    CertificateStore.fetch = always_render
+
+
+def _run_phase(duration, dashboard_clients, certificate_clients, certificate_request):
+    """Run dashboard and certificate client threads; return dashboard and certificate samples."""
+    from django.test import Client
+    from django.urls import reverse
+
+    stop = threading.Event()
+    dashboard_samples, certificate_samples = [], []
+    dashboard_url = reverse("users:student-dashboard")
+
+    def dashboard_loop(client):
+        while not stop.is_set():
+            start = time.perf_counter()
+            resp = client.get(dashboard_url)
+            dashboard_samples.append(time.perf_counter() - start)
+            assert resp.status_code == 200, resp.status_code
+
+    def certificate_loop(clients):
+        for client in itertools.cycle(clients):
+            if stop.is_set():
+                return
+            start = time.perf_counter()
+            certificate_request(client)
+            certificate_samples.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=dashboard_loop, args=(client,)) for client in dashboard_clients]
+    threads += [threading.Thread(target=certificate_loop, args=(clients,)) for clients in certificate_clients]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return dashboard_samples, certificate_samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase.")
+    parser.add_argument("--dashboard-clients", type=int, default=4)
+    parser.add_argument("--certificate-clients", type=int, default=4)
+    parser.add_argument("--students", type=int, default=200, help="Students requesting certificates.")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes in the queued phase.")
+    parser.add_argument("--nice", type=int, default=10, help="Worker niceness, as certificate_worker --nice.")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Status polling interval (s).")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connections
+    from django.test import Client
+    from django.urls import reverse
+
+    from users.models import CertificateJob
+
+    _bypass_certificate_store()
+    with benchmark_database(), tempfile.TemporaryDirectory() as store_dir:
+        settings.CERTIFICATE_STORE_DIR = store_dir
+        _, students = seed_students(args.students + args.dashboard_clients)
+        dashboard_students, certificate_students = students[: args.dashboard_clients], students[args.dashboard_clients:]
+
+        def logged_in(student):
+            client = Client()
+            client.force_login(student.user)
+            return client
+
+        dashboard_clients = [logged_in(s) for s in dashboard_students]
+        certificate_clients = [
+            [logged_in(s) for s in certificate_students[i :: args.certificate_clients]]
+            for i in range(args.certificate_clients)
+        ]
+
+        inline_url = reverse("users:student-regular-certificate")
+        enqueue_url = reverse("users:certificate-job-create")
+
+        def download_inline(client):
+            resp = client.get(inline_url)
+            b"".join(resp.streaming_content)
+
+        def enqueue_and_wait(client):
+            job = client.post(enqueue_url).json()
+            while job["status"] not in (CertificateJob.Status.DONE, CertificateJob.Status.FAILED):
+                time.sleep(args.poll_interval)
+                job = client.get(job["status_url"]).json()
+
+        rows = []
+        samples, _ = _run_phase(args.duration, dashboard_clients, [], None)
+        rows.append(("dashboard / baseline", summarize(samples)))
+
+        samples, renders = _run_phase(args.duration, dashboard_clients, certificate_clients, download_inline)
+        rows.append(("dashboard / inline", summarize(samples)))
+        rows.append(("certificate / inline", summarize(renders)))
+
+        connections.close_all()
+        stop_workers = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(target=_worker_process, args=(stop_workers, args.nice)) for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        samples, queued = _run_phase(args.duration, dashboard_clients, certificate_clients, enqueue_and_wait)
+        stop_workers.set()
+        for worker in workers:
+            worker.join()
+        rows.append(("dashboard / queued", summarize(samples)))
+        rows.append(("certificate / queued", summarize(queued)))
+
+        done = CertificateJob.objects.filter(status=CertificateJob.Status.DONE).count()
+        print_table(rows)
+        print(f"inline renders: {len(renders) / args.duration:.1f}/s, "
+              f"queued renders: {done / args.duration:.1f}/s with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark cold vs warm rendering of the regular student certificate.
+
+Cold: a new DocxTemplate is built from disk and parsed on every render (the
+behavior before users.certificates.template_cache existed).
+Warm: renders go through the process-wide template cache.
+
+Usage:
+    python -m benchmarks.certificate_template [--iterations 200]
+"""
+
+import argparse
+import statistics
+import time
+from io import BytesIO
+from pathlib import Path
+
+from docxtpl import DocxTemplate
+
+from users.certificates import CertificateTemplateCache
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "regular_certificate.docx"
+
+CONTEXT = {
+    "full_name": "Ana Pérez",
+    "first_name": "Ana",
+    "last_name": "Pérez",
+    "dni": "30111222",
+    "student_id": "S-1001",
+    "career_name": "Ingeniería en Sistemas",
+    "career_code": "ISI",
+    "faculty_name": "Facultad Regional",
+    "enrollment_date": "01/03/2020",
+    "today_date": "01/07/2024",
+    "today_day": "01",
+    "today_month": "07",
+    "today_year": "2024",
+}
+
+
+def render_cold():
+    doc = DocxTemplate(str(TEMPLATE_PATH))
+    doc.render(CONTEXT)
+    doc.save(BytesIO())
+
+
+def make_render_warm():
+    cache = CertificateTemplateCache()
+    # First lookup parses and compiles the template; it is excluded from timings.
+    cache.get(TEMPLATE_PATH).render(CONTEXT, BytesIO())
+
+    def render_warm():
+        cache.get(TEMPLATE_PATH).render(CONTEXT, BytesIO())
+
+    return render_warm
+
+
+def measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cold = measure(render_cold, args.iterations)
+    warm = measure(make_render_warm(), args.iterations)
+    print(f"{'':6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for label, stats in (("cold", cold), ("warm", warm)):
+        print(f"{label:6} {stats['mean']:9.2f} {stats['p50']:9.2f} {stats['p95']:9.2f}")
+    print(f"speedup (mean): {cold['mean'] / warm['mean']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Load test: term-start enrollment import from a legacy CSV export.
+
+Seeds `--students` students and `--subjects` subjects, writes a CSV with
+`--rows` (student_id, subject_code) pairs plus a few invalid rows, and times
+`manage.py import_enrollments` on it. Reports rows per second and checks that
+every valid row produced one inscription and one grade.
+
+Usage:
+    python -m benchmarks.enrollment_import [--rows 100000] [--students 20000] [--subjects 40]
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import tempfile
+import time
+
+from benchmarks._harness import benchmark_database, seed_students, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--subjects", type=int, default=40)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    from academics.models import Grade, Subject
+    from inscriptions.models import SubjectInscription
+
+    with benchmark_database(), tempfile.TemporaryDirectory() as scratch:
+        career, students = seed_students(args.students, career_code="IMP", prefix="imp")
+        subjects = Subject.objects.bulk_create(
+            Subject(
+                name=f"Materia {i}", code=f"IMP{i:03}", career=career, year=1 + i % 5,
+                category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=4,
+            )
+            for i in range(args.subjects)
+        )
+        pairs = itertools.islice(itertools.product(students, subjects), args.rows)
+        path = os.path.join(scratch, "enrollments.csv")
+        with open(path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["student_id", "subject_code"])
+            writer.writerows((student.pk, subject.pk) for student, subject in pairs)
+            writer.writerows([["nobody", subjects[0].pk], [students[0].pk, "NOPE"], ["only-one-column"]])
+
+        start = time.perf_counter()
+        call_command("import_enrollments", path, report=os.path.join(scratch, "errors.csv"))
+        wall = time.perf_counter() - start
+
+        expected = min(args.rows, args.students * args.subjects)
+        inscriptions = SubjectInscription.objects.count()
+        grades = Grade.objects.count()
+        print(f"{expected} rows in {wall:.1f}s ({expected / wall:.0f} rows/s)")
+        print(f"inscriptions: {inscriptions}/{expected}, grades: {grades}/{expected}")
+        assert inscriptions == grades == expected
+
+
+if __name__ == "__main__":
+    main()
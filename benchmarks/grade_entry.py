@@ -0,0 +1,76 @@
+"""Benchmark: grading a whole subject row by row vs. with the grade grid.
+
+Seeds `--students` students inscribed in one subject and a professor assigned to
+it. Grades everyone once through `grade_edit` (one POST per student) and once
+through `grade_grid` (a single POST), and reports wall time and queries.
+
+Usage:
+    python -m benchmarks.grade_entry [--students 300]
+"""
+
+import argparse
+import time
+
+from benchmarks._harness import benchmark_database, seed_students, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_django()
+    from datetime import date
+
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from academics.models import Grade, Subject
+    from inscriptions.models import SubjectInscription
+    from users.models import CustomUser, Professor
+
+    with benchmark_database():
+        career, students = seed_students(args.students, career_code="GRD", prefix="grd")
+        subject = Subject.objects.create(
+            name="Física I", code="FIS1", career=career, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=6,
+        )
+        SubjectInscription.objects.bulk_create(SubjectInscription(student=s, subject=subject) for s in students)
+        Grade.objects.bulk_create(Grade(student=s, subject=subject) for s in students)
+        user = CustomUser.objects.create_user(username="grd-prof", password="x", role=CustomUser.Role.PROFESSOR, dni="grd-prof")
+        Professor.objects.create(professor_id="GRD-P", user=user, degree="-", hire_date=date(2010, 1, 1),
+                                 category=Professor.Category.TITULAR)
+        user.professor.subjects.add(subject)
+        client = Client()
+        client.force_login(user)
+        grades = list(Grade.objects.filter(subject=subject).order_by("pk"))
+
+        results = []
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for grade in grades:
+                client.post(reverse("users:grade-edit", args=[grade.pk]),
+                            {"final_grade": "7", "status_override": "", "promotion_grade": "", "notes": ""})
+            results.append(("grade_edit x N", time.perf_counter() - start, len(queries)))
+
+        url = reverse("users:grade-grid", args=[subject.code])
+        forms = client.get(url).context["formset"].forms
+        data = {"form-TOTAL_FORMS": str(len(forms)), "form-INITIAL_FORMS": str(len(forms))}
+        for i, form in enumerate(forms):
+            data.update({f"form-{i}-id": form.instance.pk, f"form-{i}-promotion_grade": "",
+                         f"form-{i}-final_grade": "5", f"form-{i}-status_override": ""})
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            client.post(url, data)
+            results.append(("grade_grid", time.perf_counter() - start, len(queries)))
+
+        print(f"{'method':<16}{'seconds':>10}{'queries':>10}")
+        for label, seconds, count in results:
+            print(f"{label:<16}{seconds:>10.2f}{count:>10}")
+        assert not Grade.objects.filter(subject=subject).exclude(final_grade=5).exists()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: resetting manual grade statuses row by row vs. with one UPDATE.
+
+Seeds `--students` students of one career, `--subjects` subjects, and one grade
+per (student, subject) pair with a random final grade, written in bulk; a
+`--overridden` share of them also gets a manual status (status_override).
+Both methods do the same work, dropping the manual status so the generated
+column follows the final grade: Grade.update_status() (one save per row) is
+timed on a `--sample` of the overridden grades and extrapolated to all of them,
+then clear_grade_status_overrides() resets the rest in one statement.
+
+Usage:
+    python -m benchmarks.grade_status_recompute [--students 20000] [--subjects 50] [--overridden 0.3] [--sample 2000]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._harness import benchmark_database, seed_students, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--subjects", type=int, default=50)
+    parser.add_argument("--overridden", type=float, default=0.3, help="Share of grades with a manual status.")
+    parser.add_argument("--sample", type=int, default=2000, help="Grades reset row by row.")
+    args = parser.parse_args()
+
+    setup_django()
+    from decimal import Decimal
+
+    from academics.models import Grade, Subject
+    from academics.services import clear_grade_status_overrides
+
+    rng = random.Random(0)
+    statuses = list(Grade.StatusSubject.values)
+    with benchmark_database():
+        career, students = seed_students(args.students, career_code="STS", prefix="sts")
+        subjects = Subject.objects.bulk_create(
+            Subject(name=f"Materia {i}", code=f"STS{i}", career=career, year=1 + i % 5,
+                    category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=4)
+            for i in range(args.subjects)
+        )
+        start = time.perf_counter()
+        for subject in subjects:
+            Grade.objects.bulk_create(
+                (Grade(student=student, subject=subject,
+                       final_grade=None if rng.random() < 0.2 else Decimal(rng.randint(100, 1000)) / 100,
+                       status_override=rng.choice(statuses) if rng.random() < args.overridden else None)
+                 for student in students),
+                batch_size=5000,
+            )
+        overridden = Grade.objects.filter(status_override__isnull=False)
+        total = overridden.count()
+        print(f"seeded {Grade.objects.count()} grades, {total} with a manual status, "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        sample = list(overridden.order_by("pk")[:args.sample])
+        start = time.perf_counter()
+        for grade in sample:
+            grade.update_status()
+        per_row = (time.perf_counter() - start) / len(sample)
+
+        start = time.perf_counter()
+        changed = clear_grade_status_overrides()
+        set_based = time.perf_counter() - start
+
+        print(f"{'method':<34}{'grades':>10}{'seconds':>12}")
+        print(f"{'update_status() x N (est.)':<34}{total:>10}{per_row * total:>12.1f}")
+        print(f"{'clear_grade_status_overrides()':<34}{changed:>10}{set_based:>12.1f}")
+        assert not Grade.objects.exclude(status=Grade.derived_status_expression()).exists()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Load test: many students racing for the last seats of a subject.
+
+Seeds `--clients` students and a subject with `--capacity` seats. All clients are
+released at once (threading.Barrier) and POST to the subject inscription endpoint
+a single time. Reports latency, accepted/refused inscriptions per second, and
+checks that the subject was not oversubscribed.
+
+Usage:
+    python -m benchmarks.seat_contention [--clients 500] [--capacity 40]
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._harness import benchmark_database, print_table, seed_students, setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500, help="Concurrent students.")
+    parser.add_argument("--capacity", type=int, default=40, help="Seats of the subject.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.messages import get_messages
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from academics.models import Subject
+    from inscriptions.models import SubjectInscription
+
+    with benchmark_database():
+        career, students = seed_students(args.clients, career_code="LAB", prefix="lab")
+        subject = Subject.objects.create(
+            name="Laboratorio de Química", code="LABQ", career=career, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=4,
+            capacity=args.capacity,
+        )
+        url = reverse("users:subject-inscribe", args=[subject.code])
+        clients = []
+        for student in students:
+            client = Client()
+            client.force_login(student.user)
+            clients.append(client)
+
+        barrier = threading.Barrier(args.clients)
+        accepted, refused, errors = [], [], []
+        lock = threading.Lock()
+
+        def race(client):
+            barrier.wait()
+            start = time.perf_counter()
+            try:
+                resp = client.post(url)
+                levels = {m.level_tag for m in get_messages(resp.wsgi_request)}
+                outcome = accepted if resp.status_code == 302 and "success" in levels else refused
+            except Exception as exc:
+                outcome = errors
+                print(f"  {exc.__class__.__name__}: {exc}")
+            elapsed = time.perf_counter() - start
+            with lock:
+                outcome.append(elapsed)
+
+        connection.close()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            list(pool.map(race, clients))
+        wall = time.perf_counter() - start
+
+        print_table([("accepted", summarize(accepted)), ("refused (full)", summarize(refused))])
+        print(f"{len(accepted) + len(refused)} requests in {wall:.2f}s "
+              f"({(len(accepted) + len(refused)) / wall:.0f}/s), {len(errors)} errors")
+        subject.refresh_from_db()
+        inscribed = SubjectInscription.objects.filter(subject=subject).count()
+        print(f"seats_taken={subject.seats_taken} inscriptions={inscribed} capacity={subject.capacity} "
+              f"-> {'OK' if subject.seats_taken == inscribed <= subject.capacity else 'OVERSUBSCRIBED'}")
+
+
+if __name__ == "__main__":
+    main()
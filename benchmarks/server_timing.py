@@ -0,0 +1,61 @@
+"""Benchmark: overhead of ServerTimingMiddleware on the student dashboard.
+
+Requests the (warm) student dashboard `--requests` times with the middleware
+off, with the Server-Timing header only, and with 1% and 100% of the requests
+logged. Log lines go to an in-memory handler.
+
+Usage:
+    python -m benchmarks.server_timing [--requests 500]
+"""
+
+import argparse
+import io
+import logging
+import time
+
+from benchmarks._harness import benchmark_database, print_table, seed_students, setup_django, summarize
+
+MODES = {
+    "off": dict(SERVER_TIMING_HEADER=False, SERVER_TIMING_SAMPLE_RATE=0),
+    "header": dict(SERVER_TIMING_HEADER=True, SERVER_TIMING_SAMPLE_RATE=0),
+    "1% sampled": dict(SERVER_TIMING_HEADER=False, SERVER_TIMING_SAMPLE_RATE=0.01),
+    "100% sampled": dict(SERVER_TIMING_HEADER=False, SERVER_TIMING_SAMPLE_RATE=1),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    handler = logging.StreamHandler(io.StringIO())
+    timing_logger = logging.getLogger("main.timing")
+    timing_logger.addHandler(handler)
+    timing_logger.setLevel(logging.INFO)
+
+    with benchmark_database():
+        _, students = seed_students(1, career_code="TIM", prefix="tim")
+        url = reverse("users:student-dashboard")
+        rows = []
+        for label, options in MODES.items():
+            with override_settings(**options):
+                client = Client()  # loads the middleware chain with these settings
+                client.force_login(students[0].user)
+                client.get(url)
+                samples = []
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    client.get(url)
+                    samples.append(time.perf_counter() - start)
+            rows.append((label, summarize(samples)))
+
+        print(f"{args.requests} requests per mode")
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
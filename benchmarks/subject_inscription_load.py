@@ -0,0 +1,104 @@
+"""Load test: registration-day subject inscriptions.
+
+Seeds `--students` students and one subject, then `--concurrency` threads POST to
+the subject inscription endpoint. Every student submits the form `--clicks` times
+at once, to mimic double clicks and retries racing each other.
+
+Reports request latency, requests shed by the admission middleware (503 with
+Retry-After), failed requests (other responses or exceptions, e.g. IntegrityError),
+and checks that at most one inscription and one grade exist per student afterwards.
+Set INSCRIPTION_MAX_IN_FLIGHT / INSCRIPTION_QUEUE_TIMEOUT in the environment to try
+other admission settings.
+
+Usage:
+    python -m benchmarks.subject_inscription_load [--students 2000] [--concurrency 16] [--clicks 2]
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._harness import benchmark_database, print_table, seed_students, setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client threads.")
+    parser.add_argument("--clicks", type=int, default=2, help="Simultaneous submissions per student.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from academics.models import Grade, Subject
+    from inscriptions.models import SubjectInscription
+
+    with benchmark_database():
+        career, students = seed_students(args.students, career_code="INSC", prefix="insc")
+        subject = Subject.objects.create(
+            name="Análisis Matemático I", code="AM1", career=career, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=8,
+        )
+        url = reverse("users:subject-inscribe", args=[subject.code])
+
+        # All clients share one handler (one middleware stack), like the threads of
+        # a single worker process.
+        handler = Client().handler
+        clients = []
+        for student in students:
+            client = Client()
+            client.handler = handler
+            client.force_login(student.user)
+            clients.append(client)
+        clients[0].get(reverse("users:student-dashboard"))  # load the middleware chain once
+
+        samples, shed, failures = [], [], []
+        lock = threading.Lock()
+
+        def submit(client):
+            start = time.perf_counter()
+            error = None
+            try:
+                resp = client.post(url)
+                if resp.status_code not in (302, 503):
+                    error = f"HTTP {resp.status_code}"
+            except Exception as exc:  # IntegrityError and friends count as failures
+                error = f"{exc.__class__.__name__}: {exc}"
+            elapsed = time.perf_counter() - start
+            with lock:
+                if error:
+                    failures.append(error)
+                elif resp.status_code == 503:
+                    shed.append(elapsed)
+                else:
+                    samples.append(elapsed)
+
+        def student_session(client):
+            # The same student's clicks race each other on separate threads.
+            with ThreadPoolExecutor(max_workers=args.clicks) as clicks:
+                for _ in range(args.clicks):
+                    clicks.submit(submit, client)
+
+        connection.close()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency // args.clicks)) as pool:
+            list(pool.map(student_session, clients))
+        wall = time.perf_counter() - start
+
+        print_table([("subject-inscribe POST", summarize(samples)), ("waiting room (503)", summarize(shed))])
+        total = len(samples) + len(shed) + len(failures)
+        print(f"{total / wall:.0f} requests/s over {wall:.1f}s; {len(shed)} shed, {len(failures)} failed")
+        for error in sorted(set(failures))[:5]:
+            print(f"  {error}")
+        inscriptions = SubjectInscription.objects.filter(subject=subject).count()
+        grades = Grade.objects.filter(subject=subject).count()
+        print(f"inscriptions: {inscriptions}/{args.students}, grades: {grades}/{args.students}")
+        assert inscriptions == grades <= args.students
+
+
+if __name__ == "__main__":
+    main()
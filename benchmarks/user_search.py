@@ -0,0 +1,74 @@
+"""Benchmark: admin user search latency.
+
+Seeds `--users` students and times /admin/users/?q=... for exact, prefix,
+multi-word, broad and missing search texts, first page of ranked results.
+The same texts are also run as a plain icontains filter over the five fields
+(a full scan on SQLite) for comparison.
+
+Usage:
+    python -m benchmarks.user_search [--users 100000] [--repeat 30]
+"""
+
+import argparse
+import time
+
+from benchmarks._harness import benchmark_database, print_table, seed_students, setup_django, summarize
+
+TEXTS = {
+    "exact username": "usr54321",
+    "dni prefix": "usr7654",
+    "last name": "Apellido31337",
+    "two words": "nombre4242 apellido4242",
+    "broad (11k rows)": "apellido1",
+    "no match": "zzz",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+    from datetime import date
+
+    from django.db.models import Q
+    from django.test import Client
+    from django.urls import reverse
+
+    from users.models import Administrator, CustomUser
+    from users.search import SEARCH_FIELDS
+
+    with benchmark_database():
+        seed_students(args.users, career_code="USR", prefix="usr")
+        admin = CustomUser.objects.create_user(username="adm-search", password="x", role=CustomUser.Role.ADMIN,
+                                               dni="adm-search")
+        Administrator.objects.create(administrator_id="ADM-S", user=admin, position="-", hire_date=date(2020, 1, 1))
+        client = Client()
+        client.force_login(admin)
+        url = reverse("users:user-list")
+
+        rows = []
+        for label, text in TEXTS.items():
+            views, scans = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                resp = client.get(url, {"q": text})
+                views.append(time.perf_counter() - start)
+            found = len(resp.context["page"])
+            scan = Q()
+            for field in SEARCH_FIELDS:
+                scan |= Q(**{f"{field}__icontains": text})
+            for _ in range(min(args.repeat, 5)):
+                start = time.perf_counter()
+                list(CustomUser.objects.filter(scan).order_by("id")[:50])
+                scans.append(time.perf_counter() - start)
+            rows += [(f"{label} ({found})", summarize(views)), ("  icontains scan", summarize(scans))]
+
+        print(f"{args.users} users, first page of results (rows shown in parentheses)")
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
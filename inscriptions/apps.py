@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InscriptionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inscriptions'
+
+    def ready(self):
+        from inscriptions import signals  # noqa: F401  (keeps seat counters in sync)
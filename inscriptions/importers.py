@@ -0,0 +1,194 @@
+"""Bulk import of subject enrollments from the legacy system.
+
+Includes:
+- import_enrollments: stream-parse (student_id, subject_code) CSV rows, validate
+  them against preloaded key sets, and write SubjectInscription and Grade rows in
+  chunked bulk inserts.
+- RowError / EnrollmentImportResult: per-row error report and totals.
+- write_error_report: dump the row errors as CSV.
+- decodes_as_utf8: check a whole file's encoding chunk by chunk before importing it.
+
+Notes:
+    - The file is read row by row; only the current chunk is kept in memory,
+      besides the student and subject key sets.
+    - Each chunk is written in its own transaction: a chunk that fails never
+      leaves inscriptions without their grade.
+    - Staff imports do not enforce subject capacity; seats_taken of the touched
+      subjects is recounted from the inscriptions after each chunk.
+    - Rows already present in the database are ignored (ON CONFLICT DO NOTHING),
+      so a file can be imported again safely. On PostgreSQL and SQLite the created
+      count is the number of rows the INSERT ... RETURNING reports, so inscriptions
+      made meanwhile by students are not counted as imported.
+    - A decoding error in the middle of the file would stop the import with the
+      earlier chunks committed; callers check decodes_as_utf8() first.
+"""
+
+import codecs
+import csv
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from academics.models import Grade, Subject
+from academics.signals import grades_bulk_changed
+from inscriptions.models import SubjectInscription
+from inscriptions.services import recount_subject_seats
+from inscriptions.signals import inscriptions_bulk_changed
+from users.models import Student
+
+IMPORT_CHUNK_SIZE = 5000
+HEADER = ("student_id", "subject_code")
+
+
+class RowError(NamedTuple):
+    """A rejected CSV row: 1-based line number, raw values and the reason."""
+    line: int
+    student_id: str
+    subject_code: str
+    error: str
+
+
+@dataclass
+class EnrollmentImportResult:
+    """Totals of an import_enrollments() run."""
+    rows: int = 0
+    created: int = 0
+    duplicates: int = 0
+    errors: list = field(default_factory=list)
+
+
+def _insert_inscriptions(pairs):
+    """
+    Insert the (student_id, subject_code) pairs that are not inscribed yet.
+
+    Returns:
+        int: Number of inscriptions this call inserted.
+    """
+    if connection.vendor not in ("postgresql", "sqlite"):
+        existing = set(
+            SubjectInscription.objects.filter(
+                student_id__in={s for s, _ in pairs}, subject_id__in={c for _, c in pairs}
+            ).values_list("student_id", "subject_id")
+        )
+        new = [pair for pair in pairs if pair not in existing]
+        SubjectInscription.objects.bulk_create(
+            [SubjectInscription(student_id=s, subject_id=c) for s, c in new], ignore_conflicts=True
+        )
+        return len(new)
+
+    qn = connection.ops.quote_name
+    opts = SubjectInscription._meta
+    fields = [opts.get_field(name) for name in ("student", "subject", "inscription_date")]
+    today = fields[2].get_db_prep_save(timezone.localdate(), connection)
+    columns = ", ".join(qn(f.column) for f in fields)
+    batch_size = connection.ops.bulk_batch_size(fields, pairs)
+    inserted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {qn(opts.db_table)} ({columns}) VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({qn(fields[0].column)}, {qn(fields[1].column)}) DO NOTHING RETURNING 1",
+                [value for student_id, code in batch for value in (student_id, code, today)],
+            )
+            inserted += len(cursor.fetchall())
+    return inserted
+
+
+def _write_chunk(pairs, result):
+    """Insert one chunk of (student_id, subject_code) pairs and update seats and caches."""
+    subject_codes = {code for _, code in pairs}
+    student_ids = {student_id for student_id, _ in pairs}
+    with transaction.atomic():
+        created = _insert_inscriptions(pairs)
+        Grade.objects.bulk_create(
+            [Grade(student_id=s, subject_id=c, status_override=Grade.INSCRIPTION_STATUS) for s, c in pairs],
+            ignore_conflicts=True,
+        )
+        recount_subject_seats(subject_codes)
+    result.created += created
+    result.duplicates += len(pairs) - created
+    inscriptions_bulk_changed.send(sender=SubjectInscription, student_ids=student_ids)
+    grades_bulk_changed.send(sender=Grade, student_ids=student_ids)
+
+
+def import_enrollments(lines, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import subject enrollments from CSV text.
+
+    Each row holds a student_id and a subject_code; an optional header row with
+    those names is skipped. A row is rejected when it is malformed, references an
+    unknown student or subject, the subject belongs to another career, or it
+    repeats an earlier row of the same file.
+
+    Args:
+        lines (Iterable[str]): CSV text lines (an open text file works).
+        chunk_size (int): Valid rows written per transaction.
+
+    Returns:
+        EnrollmentImportResult: Row count, created inscriptions, rows already in the
+        database, and the rejected rows.
+    """
+    students = dict(Student.objects.values_list("student_id", "career_id"))
+    subjects = dict(Subject.objects.values_list("code", "career_id"))
+    result = EnrollmentImportResult()
+    seen = set()
+    chunk = []
+
+    for line, row in enumerate(csv.reader(lines), start=1):
+        values = [value.strip() for value in row]
+        if not any(values):
+            continue
+        if line == 1 and tuple(value.lower() for value in values) == HEADER:
+            continue
+        result.rows += 1
+        if len(values) != 2:
+            result.errors.append(RowError(line, *(values + ["", ""])[:2], "Se esperaban 2 columnas."))
+            continue
+        student_id, subject_code = values
+        if student_id not in students:
+            error = "Estudiante inexistente."
+        elif subject_code not in subjects:
+            error = "Materia inexistente."
+        elif subjects[subject_code] != students[student_id]:
+            error = "La materia no pertenece a la carrera del estudiante."
+        elif (student_id, subject_code) in seen:
+            error = "Fila repetida en el archivo."
+        else:
+            seen.add((student_id, subject_code))
+            chunk.append((student_id, subject_code))
+            if len(chunk) >= chunk_size:
+                _write_chunk(chunk, result)
+                chunk = []
+            continue
+        result.errors.append(RowError(line, student_id, subject_code, error))
+
+    if chunk:
+        _write_chunk(chunk, result)
+    return result
+
+
+def write_error_report(errors, fh):
+    """Write `errors` (RowError) as CSV with a header row to the text file `fh`."""
+    writer = csv.writer(fh)
+    writer.writerow(RowError._fields)
+    writer.writerows(errors)
+
+
+def decodes_as_utf8(chunks):
+    """
+    Return whether the byte `chunks` of a file decode as UTF-8 (with or without BOM).
+
+    Args:
+        chunks (Iterable[bytes]): The whole file, in order (e.g. UploadedFile.chunks()).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        for chunk in chunks:
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
@@ -0,0 +1,51 @@
+"""Import subject enrollments from a CSV file of (student_id, subject_code) rows.
+
+Usage:
+    python manage.py import_enrollments enrollments.csv
+    python manage.py import_enrollments enrollments.csv --report errors.csv --chunk-size 10000
+"""
+
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inscriptions.importers import IMPORT_CHUNK_SIZE, decodes_as_utf8, import_enrollments, write_error_report
+
+
+class Command(BaseCommand):
+    help = "Create subject inscriptions and grades in bulk from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with student_id,subject_code rows (header optional).")
+        parser.add_argument("--report", help="Write the rejected rows to this CSV file.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help=f"Rows written per transaction (default: {IMPORT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            # Check the whole file first: a bad byte near the end must not leave earlier chunks imported.
+            with open(options["path"], "rb") as fh:
+                if not decodes_as_utf8(iter(partial(fh.read, 1024 * 1024), b"")):
+                    raise CommandError(f"{options['path']} is not UTF-8 encoded; nothing was imported.")
+            with open(options["path"], encoding="utf-8-sig", newline="") as fh:
+                result = import_enrollments(fh, chunk_size=options["chunk_size"])
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}") from exc
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8", newline="") as fh:
+                write_error_report(result.errors, fh)
+        else:
+            for error in result.errors[:20]:
+                self.stderr.write(f"line {error.line}: {error.student_id},{error.subject_code}: {error.error}")
+            if len(result.errors) > 20:
+                self.stderr.write(f"... {len(result.errors) - 20} more; use --report to get them all.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {result.rows} rows: {result.created} inscriptions created, "
+            f"{result.duplicates} already present, {len(result.errors)} rejected."
+        ))
@@ -0,0 +1,17 @@
+"""Create the Grade records missing for existing subject inscriptions.
+
+Usage:
+    python manage.py reconcile_grades
+"""
+
+from django.core.management.base import BaseCommand
+
+from inscriptions.services import reconcile_grades
+
+
+class Command(BaseCommand):
+    help = "Insert a Grade row for every subject inscription that lacks one, in a single statement."
+
+    def handle(self, *args, **options):
+        created = reconcile_grades()
+        self.stdout.write(self.style.SUCCESS(f"Created {created} missing grades."))
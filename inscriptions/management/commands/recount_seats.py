@@ -0,0 +1,18 @@
+"""Recount the seats taken in every subject and final exam from their inscriptions.
+
+Usage:
+    python manage.py recount_seats
+"""
+
+from django.core.management.base import BaseCommand
+
+from inscriptions.services import recount_final_exam_seats, recount_subject_seats
+
+
+class Command(BaseCommand):
+    help = "Set Subject.seats_taken and FinalExam.seats_taken to their inscription counts, one UPDATE per table."
+
+    def handle(self, *args, **options):
+        subjects = recount_subject_seats()
+        finals = recount_final_exam_seats()
+        self.stdout.write(self.style.SUCCESS(f"Corrected the seats of {subjects} subjects and {finals} final exams."))
@@ -0,0 +1,204 @@
+"""Admission control for the inscription endpoints.
+
+Includes:
+- FairGate: per-process FIFO gate capping concurrent in-flight requests.
+- CacheTokenBucket: cluster-wide admission rate shared through the Django cache.
+- InscriptionAdmissionMiddleware: applies both to the POSTs of the configured URL
+  names made by authenticated students, and answers excess requests with a
+  waiting-room page (503 + Retry-After).
+- admission_stats: snapshot of the current process' gate, for monitoring.
+
+Notes:
+    - Install after AuthenticationMiddleware (and MessageMiddleware). Only
+      authenticated students take a slot or a token: anonymous or forged POSTs
+      go straight to the view, which redirects them to the login page, so they
+      cannot fill the queue or drain the shared rate limit for real students.
+      A shed request costs the session and user lookups, nothing more.
+    - Waiting requests are admitted strictly in arrival order; a request that does
+      not get a slot within settings.INSCRIPTION_QUEUE_TIMEOUT seconds, or finds
+      settings.INSCRIPTION_MAX_QUEUE requests already waiting, is sent to the
+      waiting room instead of queueing in front of the database.
+    - The token bucket refills settings.INSCRIPTION_RATE_LIMIT tokens per second
+      for all workers sharing the cache (use Redis/Memcached in production; the
+      default local-memory cache is per process). 0 disables it.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+from django.urls import Resolver404, resolve
+
+from users.models import CustomUser
+
+_active_gate = None
+
+
+class FairGate:
+    """
+    FIFO admission gate with a fixed number of slots.
+
+    Attributes:
+        limit (int): Maximum concurrent holders.
+        in_flight (int): Current holders.
+        admitted (int): Requests admitted so far.
+        rejected (int): Requests turned away (queue full or timed out).
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiting = deque()
+        self._cond = threading.Condition()
+
+    @property
+    def queue_depth(self):
+        """Requests currently waiting for a slot."""
+        return len(self._waiting)
+
+    def acquire(self, timeout, max_waiting):
+        """
+        Wait for a slot in arrival order.
+
+        Args:
+            timeout (float): Seconds to wait at most.
+            max_waiting (int): Refuse immediately when this many requests already wait.
+
+        Returns:
+            bool: True if a slot was taken; the caller must release() it.
+        """
+        with self._cond:
+            if self.in_flight < self.limit and not self._waiting:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if len(self._waiting) >= max_waiting:
+                self.rejected += 1
+                return False
+            ticket = object()
+            self._waiting.append(ticket)
+            deadline = time.monotonic() + timeout
+            while not (self._waiting[0] is ticket and self.in_flight < self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self.rejected += 1
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(remaining)
+            self._waiting.popleft()
+            self.in_flight += 1
+            self.admitted += 1
+            self._cond.notify_all()
+            return True
+
+    def release(self):
+        """Give a slot back and wake the next waiter."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def reject(self):
+        """Count a request turned away after it was admitted (e.g. by the rate limit)."""
+        with self._cond:
+            self.rejected += 1
+
+
+class CacheTokenBucket:
+    """
+    Shared token bucket refilled `rate` tokens per second.
+
+    Tokens are counted per one-second window with atomic cache.incr(), so every
+    process using the same cache draws from the same bucket.
+    """
+
+    def __init__(self, rate, key_prefix="inscriptions:admission"):
+        self.rate = rate
+        self.key_prefix = key_prefix
+
+    def take(self):
+        """Take a token; return False when this second's tokens are used up."""
+        if not self.rate:
+            return True
+        key = f"{self.key_prefix}:{int(time.time())}"
+        cache.add(key, 0, timeout=5)
+        try:
+            used = cache.incr(key)
+        except ValueError:  # evicted between add() and incr()
+            cache.add(key, 1, timeout=5)
+            used = 1
+        return used <= self.rate
+
+
+def admission_stats():
+    """
+    Return the admission counters of the current process.
+
+    Returns:
+        dict: in_flight, queue_depth, limit, admitted and rejected; empty when the
+        middleware is not installed.
+    """
+    gate = _active_gate
+    if gate is None:
+        return {}
+    return {
+        "in_flight": gate.in_flight,
+        "queue_depth": gate.queue_depth,
+        "limit": gate.limit,
+        "admitted": gate.admitted,
+        "rejected": gate.rejected,
+    }
+
+
+class InscriptionAdmissionMiddleware:
+    """Cap concurrent inscription POSTs per worker and their rate across workers."""
+
+    def __init__(self, get_response):
+        global _active_gate
+        self.get_response = get_response
+        self.url_names = set(settings.INSCRIPTION_ADMISSION_URL_NAMES)
+        self.queue_timeout = settings.INSCRIPTION_QUEUE_TIMEOUT
+        self.max_queue = settings.INSCRIPTION_MAX_QUEUE
+        self.gate = _active_gate = FairGate(settings.INSCRIPTION_MAX_IN_FLIGHT)
+        self.bucket = CacheTokenBucket(settings.INSCRIPTION_RATE_LIMIT)
+
+    def __call__(self, request):
+        if request.method != "POST" or not self._is_inscription(request) or not self._is_student(request):
+            return self.get_response(request)
+        if not self.gate.acquire(self.queue_timeout, self.max_queue):
+            return self._waiting_room(request)
+        try:
+            if not self.bucket.take():
+                self.gate.reject()
+                return self._waiting_room(request)
+            response = self.get_response(request)
+        finally:
+            self.gate.release()
+        response["X-Queue-Depth"] = str(self.gate.queue_depth)
+        return response
+
+    @staticmethod
+    def _is_student(request):
+        user = request.user
+        return user.is_authenticated and user.role == CustomUser.Role.STUDENT
+
+    def _is_inscription(self, request):
+        try:
+            return resolve(request.path_info).view_name in self.url_names
+        except Resolver404:
+            return False
+
+    def _waiting_room(self, request):
+        depth = self.gate.queue_depth
+        # Roughly the time needed to drain the current queue, at least one second.
+        retry_after = max(1, math.ceil((depth + 1) / (self.bucket.rate or self.gate.limit or 1)))
+        response = render(request, "inscriptions/waiting_room.html", {"retry_after": retry_after}, status=503)
+        response["Retry-After"] = str(retry_after)
+        response["X-Queue-Depth"] = str(depth)
+        return response
@@ -0,0 +1,393 @@
+"""Write-side services for the Inscriptions app.
+
+Includes:
+- inscribe_subject: enroll a student in a subject and create the matching Grade
+  atomically, reporting which rows were new.
+- inscribe_subjects: enroll a student in several subjects at once, with one
+  bulk insert per table.
+- inscribe_final_exam: enroll a student in a final exam.
+- reconcile_grades: create the Grade rows missing for existing subject inscriptions.
+- recount_subject_seats / recount_final_exam_seats: set seats_taken from the
+  inscriptions, one UPDATE per table.
+- NoSeatsAvailable: raised when the subject or exam is full.
+
+Notes:
+    - PostgreSQL runs the conflict-ignoring inserts and the seat increment in one
+      statement (one round trip). SQLite runs them as separate statements in one
+      transaction. Other backends fall back to get_or_create() under a row lock.
+    - Seats are taken with a conditional UPDATE (seats_taken < capacity) only when
+      the inscription is new; a failed seat rolls the whole inscription back.
+    - Raw inserts bypass post_save; inscriptions_bulk_changed and
+      academics.signals.grades_bulk_changed are sent instead, so caches and
+      summaries stay in sync.
+    - inscribe_subjects() locks the student row, so concurrent batches of the same
+      student run one after the other; seats of several subjects are taken with a
+      single UPDATE ... RETURNING.
+"""
+
+from typing import NamedTuple
+
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from academics.models import FinalExam, Grade, Subject
+from academics.signals import grades_bulk_changed
+from inscriptions.models import FinalExamInscription, SubjectInscription
+from inscriptions.signals import inscriptions_bulk_changed
+
+
+class NoSeatsAvailable(Exception):
+    """Raised when a Subject or FinalExam has no free seats for a new inscription."""
+
+    def __init__(self, target):
+        super().__init__(f"No seats left in {target}")
+        self.target = target
+
+
+class SubjectInscriptionResult(NamedTuple):
+    """Outcome of inscribe_subject(): whether each row was created by this call."""
+    inscription_created: bool
+    grade_created: bool
+
+
+class BatchInscriptionResult(NamedTuple):
+    """Outcome of inscribe_subjects(): subject codes by what happened to them."""
+    created: list
+    already_inscribed: list
+    full: list
+
+
+def _insert_ignore(model, values):
+    """
+    Build an INSERT ... ON CONFLICT (student, subject|final_exam) DO NOTHING RETURNING pk statement.
+
+    Args:
+        model (type[Model]): SubjectInscription, FinalExamInscription or Grade.
+        values (dict[str, object]): Field name -> Python value.
+
+    Returns:
+        tuple[str, list]: SQL and parameters.
+    """
+    qn = connection.ops.quote_name
+    opts = model._meta
+    fields = [opts.get_field(name) for name in values]
+    columns = ", ".join(qn(f.column) for f in fields)
+    params = [f.get_db_prep_save(values[f.name], connection) for f in fields]
+    target = "subject" if model is not FinalExamInscription else "final_exam"
+    conflict = ", ".join(qn(opts.get_field(name).column) for name in ("student", target))
+    sql = (
+        f"INSERT INTO {qn(opts.db_table)} ({columns}) VALUES ({', '.join(['%s'] * len(fields))}) "
+        f"ON CONFLICT ({conflict}) DO NOTHING RETURNING {qn(opts.pk.column)}"
+    )
+    return sql, params
+
+
+def _seat_sql(target):
+    """
+    Build the conditional seat increment used inside the PostgreSQL CTE.
+
+    The UPDATE only runs when the inscription insert (CTE `ins`) returned a row and
+    the target still has a free seat; the row lock it takes is held until commit.
+    """
+    qn = connection.ops.quote_name
+    opts = target._meta
+    taken, capacity = qn("seats_taken"), qn("capacity")
+    sql = (
+        f"UPDATE {qn(opts.db_table)} SET {taken} = {taken} + 1 "
+        f"WHERE {qn(opts.pk.column)} = %s AND ({capacity} IS NULL OR {taken} < {capacity}) "
+        f"AND EXISTS (SELECT 1 FROM ins) RETURNING 1"
+    )
+    return sql, [target.pk]
+
+
+def _take_seat(target):
+    """Take one seat of `target` with an atomic conditional UPDATE; return False when full."""
+    return type(target).objects.filter(pk=target.pk).filter(
+        Q(capacity__isnull=True) | Q(seats_taken__lt=F("capacity"))
+    ).update(seats_taken=F("seats_taken") + 1) == 1
+
+
+def _take_seats(model, pks):
+    """
+    Take one seat of each `model` row in `pks` that still has one.
+
+    Args:
+        model (type[Model]): Subject or FinalExam.
+        pks (list): Primary keys, each taking at most one seat.
+
+    Returns:
+        set: Primary keys whose seat was taken.
+    """
+    if not pks:
+        return set()
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return {pk for pk in sorted(pks) if _take_seat(model(pk=pk))}
+    qn = connection.ops.quote_name
+    table, pk_column = qn(model._meta.db_table), qn(model._meta.pk.column)
+    taken, capacity = qn("seats_taken"), qn("capacity")
+    placeholders = ", ".join(["%s"] * len(pks))
+    rows = f"{pk_column} IN ({placeholders})"
+    if connection.vendor == "postgresql":
+        # Lock the rows in key order so overlapping batches cannot deadlock.
+        rows = f"{pk_column} IN (SELECT {pk_column} FROM {table} WHERE {rows} ORDER BY {pk_column} FOR UPDATE)"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {taken} = {taken} + 1 "
+            f"WHERE {rows} AND ({capacity} IS NULL OR {taken} < {capacity}) RETURNING {pk_column}",
+            list(pks),
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _inscribe(target, inscription_values, grade_values=None):
+    """
+    Insert an inscription (and optionally a Grade) and take a seat of `target`.
+
+    Args:
+        target (Subject | FinalExam): Object whose seats are taken.
+        inscription_values (dict): Values of the SubjectInscription/FinalExamInscription row.
+        grade_values (dict | None): Values of the Grade row, if one must exist.
+
+    Returns:
+        tuple[bool, bool]: Whether the inscription and the grade were created.
+
+    Raises:
+        NoSeatsAvailable: If the inscription is new and `target` is full; nothing is written.
+    """
+    inscription_model = SubjectInscription if isinstance(target, Subject) else FinalExamInscription
+    inscription_sql, inscription_params = _insert_ignore(inscription_model, inscription_values)
+    grade_sql, grade_params = _insert_ignore(Grade, grade_values) if grade_values else (None, [])
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            seat_sql, seat_params = _seat_sql(target)
+            ctes = [f"ins AS ({inscription_sql})", f"seat AS ({seat_sql})"]
+            if grade_sql:
+                ctes.append(f"grade AS ({grade_sql})")
+            cursor.execute(
+                f"WITH {', '.join(ctes)} SELECT EXISTS (SELECT 1 FROM ins), EXISTS (SELECT 1 FROM seat), "
+                + ("EXISTS (SELECT 1 FROM grade)" if grade_sql else "FALSE"),
+                inscription_params + seat_params + grade_params,
+            )
+            inscription_created, seat_taken, grade_created = cursor.fetchone()
+        else:
+            cursor.execute(inscription_sql, inscription_params)
+            inscription_created = cursor.fetchone() is not None
+            seat_taken = inscription_created and _take_seat(target)
+            grade_created = False
+            if grade_sql and (seat_taken or not inscription_created):
+                cursor.execute(grade_sql, grade_params)
+                grade_created = cursor.fetchone() is not None
+        if inscription_created and not seat_taken:
+            raise NoSeatsAvailable(target)  # rolls back the inscription (and grade)
+
+    if inscription_created:
+        inscriptions_bulk_changed.send(sender=inscription_model, student_ids=[inscription_values["student"]])
+    if grade_created:
+        grades_bulk_changed.send(sender=Grade, student_ids=[grade_values["student"]])
+    return bool(inscription_created), bool(grade_created)
+
+
+def _inscribe_with_orm(target, lookup, create_grade):
+    """get_or_create() fallback for backends without INSERT ... ON CONFLICT ... RETURNING."""
+    inscription_model = SubjectInscription if isinstance(target, Subject) else FinalExamInscription
+    with transaction.atomic():
+        locked = type(target).objects.select_for_update().get(pk=target.pk)
+        exists = inscription_model.objects.filter(**lookup).exists()
+        if not exists and locked.seats_left == 0:
+            raise NoSeatsAvailable(target)
+        grade_created = False
+        if create_grade:
+            _, grade_created = Grade.objects.get_or_create(
+                student_id=lookup["student"].pk, subject=target,
+                defaults={"status_override": Grade.INSCRIPTION_STATUS},
+            )
+        # post_save (inscriptions.signals) takes the seat.
+        _, inscription_created = inscription_model.objects.get_or_create(**lookup)
+    return inscription_created, grade_created
+
+
+def inscribe_subject(student, subject):
+    """
+    Inscribe `student` in `subject`, take a seat, and make sure the Grade record exists.
+
+    Safe under concurrent calls for the same student and subject (double clicks,
+    retries): conflicting inserts are ignored instead of raising IntegrityError.
+    Concurrent students racing for the last seats never oversubscribe the subject.
+
+    Args:
+        student (users.Student): Student to inscribe.
+        subject (academics.Subject): Target subject.
+
+    Returns:
+        SubjectInscriptionResult: Which of the two rows were created by this call.
+
+    Raises:
+        NoSeatsAvailable: If the student is not inscribed yet and the subject is full.
+    """
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return SubjectInscriptionResult(
+            *_inscribe_with_orm(subject, {"student": student, "subject": subject}, create_grade=True)
+        )
+    return SubjectInscriptionResult(*_inscribe(
+        subject,
+        {"student": student.pk, "subject": subject.pk, "inscription_date": timezone.localdate()},
+        {"student": student.pk, "subject": subject.pk, "status_override": Grade.INSCRIPTION_STATUS,
+         "last_updated": timezone.now()},
+    ))
+
+
+def inscribe_subjects(student, subjects):
+    """
+    Inscribe `student` in several subjects and create their Grade records.
+
+    Subjects the student is already inscribed in are left alone; full subjects
+    are skipped without affecting the others. Inscriptions and grades are written
+    with one bulk_create(ignore_conflicts=True) per table.
+
+    Args:
+        student (users.Student): Student to inscribe.
+        subjects (Iterable[academics.Subject]): Subjects chosen by the student,
+            already validated to belong to the student's career.
+
+    Returns:
+        BatchInscriptionResult: Created, already inscribed and full subject codes.
+    """
+    codes = sorted({subject.pk for subject in subjects})
+    with transaction.atomic():
+        # Serializes batches of the same student (double submissions).
+        list(type(student).objects.select_for_update().filter(pk=student.pk).values_list("pk", flat=True))
+        existing = set(
+            SubjectInscription.objects.filter(student=student, subject_id__in=codes)
+            .values_list("subject_id", flat=True)
+        )
+        seated = _take_seats(Subject, [code for code in codes if code not in existing])
+        created = [code for code in codes if code in seated]
+        SubjectInscription.objects.bulk_create(
+            [SubjectInscription(student=student, subject_id=code) for code in created], ignore_conflicts=True
+        )
+        Grade.objects.bulk_create(
+            [Grade(student=student, subject_id=code, status_override=Grade.INSCRIPTION_STATUS) for code in created],
+            ignore_conflicts=True,
+        )
+
+    if created:
+        inscriptions_bulk_changed.send(sender=SubjectInscription, student_ids=[student.pk])
+        grades_bulk_changed.send(sender=Grade, student_ids=[student.pk])
+    return BatchInscriptionResult(
+        created=created,
+        already_inscribed=[code for code in codes if code in existing],
+        full=[code for code in codes if code not in existing and code not in seated],
+    )
+
+
+def inscribe_final_exam(student, final_exam):
+    """
+    Inscribe `student` in `final_exam` and take a seat.
+
+    Eligibility (REGULAR status) is checked by the caller.
+
+    Args:
+        student (users.Student): Student to inscribe.
+        final_exam (academics.FinalExam): Target final exam.
+
+    Returns:
+        bool: True if the inscription was created by this call.
+
+    Raises:
+        NoSeatsAvailable: If the student is not inscribed yet and the exam is full.
+    """
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return _inscribe_with_orm(final_exam, {"student": student, "final_exam": final_exam}, create_grade=False)[0]
+    created, _ = _inscribe(
+        final_exam,
+        {"student": student.pk, "final_exam": final_exam.pk, "inscription_date": timezone.localdate()},
+    )
+    return created
+
+
+def reconcile_grades():
+    """
+    Create the Grade record of every subject inscription that lacks one.
+
+    Runs one INSERT ... SELECT ... WHERE NOT EXISTS on PostgreSQL and SQLite
+    (RETURNING the affected students); other backends select the missing pairs
+    and bulk insert them.
+
+    Returns:
+        int: Number of grades created.
+    """
+    with transaction.atomic():
+        if connection.vendor in ("postgresql", "sqlite"):
+            qn = connection.ops.quote_name
+            grade, inscription = Grade._meta, SubjectInscription._meta
+            student, subject = qn("student_id"), qn("subject_id")
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {qn(grade.db_table)} ({student}, {subject}, {qn('status_override')}, "
+                    f"{qn('last_updated')}) "
+                    f"SELECT i.{student}, i.{subject}, %s, %s FROM {qn(inscription.db_table)} i "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM {qn(grade.db_table)} g "
+                    f"WHERE g.{student} = i.{student} AND g.{subject} = i.{subject}) "
+                    f"RETURNING {student}",
+                    [
+                        Grade.INSCRIPTION_STATUS,
+                        Grade._meta.get_field("last_updated").get_db_prep_save(timezone.now(), connection),
+                    ],
+                )
+                student_ids = [row[0] for row in cursor.fetchall()]
+        else:
+            pairs = list(
+                SubjectInscription.objects.filter(~Exists(
+                    Grade.objects.filter(student_id=OuterRef("student_id"), subject_id=OuterRef("subject_id"))
+                )).values_list("student_id", "subject_id")
+            )
+            Grade.objects.bulk_create(
+                [Grade(student_id=s, subject_id=c, status_override=Grade.INSCRIPTION_STATUS) for s, c in pairs],
+                ignore_conflicts=True,
+            )
+            student_ids = [s for s, _ in pairs]
+    if student_ids:
+        grades_bulk_changed.send(sender=Grade, student_ids=student_ids)
+    return len(student_ids)
+
+
+def _inscription_count(model, field):
+    """Number of `model` inscriptions pointing at the outer row through `field`, 0 when none."""
+    counted = model.objects.filter(**{field: OuterRef("pk")}).values(field).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted), 0)
+
+
+def recount_subject_seats(codes=None):
+    """
+    Set Subject.seats_taken to the number of inscriptions, with one UPDATE.
+
+    Only rows whose counter is wrong are written, e.g. after upgrading a database
+    whose inscriptions predate the counter, or after loading inscriptions with raw SQL.
+
+    Args:
+        codes (Iterable[str] | None): Subjects to recount; all when omitted.
+
+    Returns:
+        int: Number of subjects corrected.
+    """
+    subjects = Subject.objects.all() if codes is None else Subject.objects.filter(pk__in=codes)
+    taken = _inscription_count(SubjectInscription, "subject_id")
+    return subjects.exclude(seats_taken=taken).update(seats_taken=taken)
+
+
+def recount_final_exam_seats(ids=None):
+    """
+    Set FinalExam.seats_taken to the number of inscriptions, with one UPDATE.
+
+    Args:
+        ids (Iterable[int] | None): Final exams to recount; all when omitted.
+
+    Returns:
+        int: Number of final exams corrected.
+    """
+    finals = FinalExam.objects.all() if ids is None else FinalExam.objects.filter(pk__in=ids)
+    taken = _inscription_count(FinalExamInscription, "final_exam_id")
+    return finals.exclude(seats_taken=taken).update(seats_taken=taken)
@@ -0,0 +1,63 @@
+"""Signals and receivers of the Inscriptions app.
+
+Includes:
+- inscriptions_bulk_changed: sent (sender=SubjectInscription or FinalExamInscription,
+  student_ids=[...]) by code that writes inscriptions without post_save.
+- Seat counters: inscriptions created or deleted through the ORM (admin, shell,
+  get_or_create fallback) adjust Subject/FinalExam.seats_taken.
+- Grade records: a subject inscription created through the ORM gets its Grade
+  row right away, so reads never have to backfill it.
+
+Notes:
+    - Receivers are connected in InscriptionsConfig.ready().
+    - ORM creates are counted without checking capacity, so staff can place a
+      student over the limit; students go through inscriptions.services, which
+      takes seats conditionally.
+    - Bulk and raw inserts (inscriptions.services, inscriptions.importers) write the
+      Grade rows themselves; reconcile_grades repairs any remaining drift.
+"""
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from academics.models import FinalExam, Grade, Subject
+from inscriptions.models import FinalExamInscription, SubjectInscription
+
+inscriptions_bulk_changed = Signal()
+
+
+@receiver(post_save, sender=SubjectInscription)
+def take_subject_seat(sender, instance, created, **kwargs):
+    """Count a new subject inscription against the subject's seats."""
+    if created:
+        Subject.objects.filter(pk=instance.subject_id).update(seats_taken=F("seats_taken") + 1)
+
+
+@receiver(post_save, sender=SubjectInscription)
+def create_subject_grade(sender, instance, created, raw=False, **kwargs):
+    """Make sure a new subject inscription has its Grade record."""
+    if created and not raw:
+        Grade.objects.get_or_create(
+            student_id=instance.student_id, subject_id=instance.subject_id,
+            defaults={"status_override": Grade.INSCRIPTION_STATUS},
+        )
+
+
+@receiver(post_delete, sender=SubjectInscription)
+def release_subject_seat(sender, instance, **kwargs):
+    """Give the seat of a removed subject inscription back."""
+    Subject.objects.filter(pk=instance.subject_id, seats_taken__gt=0).update(seats_taken=F("seats_taken") - 1)
+
+
+@receiver(post_save, sender=FinalExamInscription)
+def take_final_exam_seat(sender, instance, created, **kwargs):
+    """Count a new final exam inscription against the exam's seats."""
+    if created:
+        FinalExam.objects.filter(pk=instance.final_exam_id).update(seats_taken=F("seats_taken") + 1)
+
+
+@receiver(post_delete, sender=FinalExamInscription)
+def release_final_exam_seat(sender, instance, **kwargs):
+    """Give the seat of a removed final exam inscription back."""
+    FinalExam.objects.filter(pk=instance.final_exam_id, seats_taken__gt=0).update(seats_taken=F("seats_taken") - 1)
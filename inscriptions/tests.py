@@ -1,8 +1,27 @@
-from django.test import TestCase
+import io
+import tempfile
+import threading
+import time
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from inscriptions.importers import import_enrollments
+from inscriptions.middleware import FairGate, admission_stats
 from inscriptions.models import SubjectInscription, FinalExamInscription
+from inscriptions.services import (
+    NoSeatsAvailable,
+    inscribe_final_exam,
+    inscribe_subject,
+    inscribe_subjects,
+    reconcile_grades,
+    recount_final_exam_seats,
+    recount_subject_seats,
+)
 from users.models import CustomUser, Student
-from academics.models import Subject, FinalExam, Career, Faculty
+from academics.models import Subject, FinalExam, Career, Faculty, Grade, StudentAcademicSummary
 import datetime
+import unittest.mock
 
 
 class SubjectInscriptionModelTest(TestCase):
@@ -53,6 +72,236 @@ class SubjectInscriptionModelTest(TestCase):
         self.assertIn('student1', str(inscription))
 
 
+class InscribeSubjectServiceTest(TestCase):
+    def setUp(self):
+        SubjectInscriptionModelTest.setUp(self)
+
+    def test_inscribe_creates_both_rows_once(self):
+        result = inscribe_subject(self.student, self.subject)
+        self.assertEqual(result, (True, True))
+        inscription = SubjectInscription.objects.get(student=self.student, subject=self.subject)
+        self.assertEqual(inscription.inscription_date, datetime.date.today())
+        grade = Grade.objects.get(student=self.student, subject=self.subject)
+        self.assertEqual(grade.status, Grade.StatusSubject.REGULAR)
+        self.assertIsNotNone(grade.last_updated)
+        # Raw inserts still keep the summary current (grades_bulk_changed).
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).regular_count, 1)
+
+        self.assertEqual(inscribe_subject(self.student, self.subject), (False, False))
+        self.assertEqual(SubjectInscription.objects.count(), 1)
+        self.assertEqual(Grade.objects.count(), 1)
+
+    def test_inscribe_keeps_existing_grade(self):
+        Grade.objects.create(student=self.student, subject=self.subject, final_grade=8)
+        self.assertEqual(inscribe_subject(self.student, self.subject), (True, False))
+        self.assertEqual(Grade.objects.get().final_grade, 8)
+
+
+class InscribeSubjectsServiceTest(TestCase):
+    def setUp(self):
+        SubjectInscriptionModelTest.setUp(self)
+        self.others = [
+            Subject.objects.create(
+                name=f'Materia {i}', code=f'MAT20{i}', career=self.career, year=2,
+                category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=4,
+            )
+            for i in range(3)
+        ]
+
+    def test_batch_inscribes_all_with_constant_queries(self):
+        inscribe_subject(self.student, self.subject)
+        self.others[2].capacity = 0
+        self.others[2].save()
+        # lock, existing, seats, 2 bulk inserts (+ savepoint) and the summary refresh.
+        with self.assertNumQueries(9):
+            result = inscribe_subjects(self.student, [self.subject, *self.others])
+        self.assertEqual(result.created, ['MAT200', 'MAT201'])
+        self.assertEqual(result.already_inscribed, ['MAT101'])
+        self.assertEqual(result.full, ['MAT202'])
+        self.assertEqual(
+            sorted(SubjectInscription.objects.filter(student=self.student).values_list('subject_id', flat=True)),
+            ['MAT101', 'MAT200', 'MAT201'],
+        )
+        self.assertEqual(Grade.objects.filter(student=self.student).count(), 3)
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).regular_count, 3)
+        self.assertEqual(
+            list(Subject.objects.filter(pk__in=['MAT200', 'MAT201']).values_list('seats_taken', flat=True)), [1, 1]
+        )
+
+        # Resubmitting the same selection changes nothing.
+        result = inscribe_subjects(self.student, [self.subject, *self.others])
+        self.assertEqual((result.created, len(result.already_inscribed)), ([], 3))
+        self.assertEqual(Subject.objects.get(pk='MAT200').seats_taken, 1)
+
+    def test_batch_keeps_existing_grade(self):
+        Grade.objects.create(student=self.student, subject=self.others[0], final_grade=7)
+        inscribe_subjects(self.student, self.others[:1])
+        self.assertEqual(Grade.objects.get(student=self.student).final_grade, 7)
+        self.assertTrue(SubjectInscription.objects.filter(student=self.student, subject=self.others[0]).exists())
+
+
+class EnrollmentImportTest(TestCase):
+    def setUp(self):
+        SubjectInscriptionModelTest.setUp(self)
+        other_career = Career.objects.create(
+            name='Medicina', code='MED', faculty=self.faculty, director='Director', duration_years=6
+        )
+        self.foreign = Subject.objects.create(
+            name='Anatomía', code='ANA101', career=other_career, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=6,
+        )
+        self.second = Subject.objects.create(
+            name='Física', code='FIS101', career=self.career, year=1,
+            category=Subject.Category.OBLIGATORY, period=Subject.Period.FIRST, semanal_hours=6,
+        )
+
+    def test_import_reports_rejected_rows(self):
+        SubjectInscription.objects.create(student=self.student, subject=self.second)
+        csv_text = (
+            'student_id,subject_code\n'
+            'S1,MAT101\n'
+            'S1,FIS101\n'
+            'S1,MAT101\n'
+            'S9,MAT101\n'
+            'S1,XXX\n'
+            'S1,ANA101\n'
+            '\n'
+            'S1\n'
+        )
+        result = import_enrollments(io.StringIO(csv_text), chunk_size=1)
+        self.assertEqual((result.rows, result.created, result.duplicates), (7, 1, 1))
+        self.assertEqual([(e.line, e.error) for e in result.errors], [
+            (4, 'Fila repetida en el archivo.'),
+            (5, 'Estudiante inexistente.'),
+            (6, 'Materia inexistente.'),
+            (7, 'La materia no pertenece a la carrera del estudiante.'),
+            (9, 'Se esperaban 2 columnas.'),
+        ])
+        self.assertEqual(Grade.objects.filter(student=self.student).count(), 2)
+        self.assertEqual(Subject.objects.get(pk='MAT101').seats_taken, 1)
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).regular_count, 2)
+
+    def test_import_writes_in_chunks(self):
+        csv_text = 'S1,MAT101\nS1,FIS101\n'
+        # Key sets, then per chunk: savepoint, two inserts, seats and the summary refresh.
+        with self.assertNumQueries(2 + 7):
+            result = import_enrollments(io.StringIO(csv_text))
+        self.assertEqual(result.created, 2)
+        self.assertEqual(import_enrollments(io.StringIO(csv_text)).duplicates, 2)
+
+    def test_command_rejects_non_utf8_file_before_importing(self):
+        # The Latin-1 byte sits after the first chunk, which must not be written either.
+        content = 'S1,MAT101\n'.encode() + 'S1,FÍS101\n'.encode('latin-1')
+        with tempfile.NamedTemporaryFile(suffix='.csv') as fh:
+            fh.write(content)
+            fh.flush()
+            with self.assertRaisesMessage(CommandError, 'is not UTF-8 encoded; nothing was imported.'):
+                call_command('import_enrollments', fh.name, chunk_size=1, stdout=io.StringIO())
+        self.assertFalse(SubjectInscription.objects.exists())
+
+
+class GradeCreationTest(TestCase):
+    def setUp(self):
+        SubjectInscriptionModelTest.setUp(self)
+
+    def test_orm_inscription_creates_grade(self):
+        SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        self.assertEqual(Grade.objects.get(student=self.student).status, Grade.StatusSubject.REGULAR)
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).regular_count, 1)
+
+    def test_reconcile_grades(self):
+        SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        Grade.objects.all().delete()
+        with self.assertNumQueries(5):  # savepoint, the insert, release, then the summary refresh
+            self.assertEqual(reconcile_grades(), 1)
+        self.assertTrue(Grade.objects.filter(student=self.student, subject=self.subject).exists())
+        self.assertEqual(StudentAcademicSummary.objects.get(student=self.student).regular_count, 1)
+
+        out = io.StringIO()
+        call_command('reconcile_grades', stdout=out)
+        self.assertIn('Created 0 missing grades.', out.getvalue())
+
+
+class SeatCapacityTest(TestCase):
+    def setUp(self):
+        SubjectInscriptionModelTest.setUp(self)
+        self.other = Student.objects.create(
+            student_id='S2',
+            user=CustomUser.objects.create_user(
+                username='student2', password='testpass', role=CustomUser.Role.STUDENT, dni='87654321'
+            ),
+            career=self.career,
+            enrollment_date='2022-01-01'
+        )
+        self.subject.capacity = 1
+        self.subject.save()
+
+    def test_subject_seats(self):
+        inscribe_subject(self.student, self.subject)
+        self.subject.refresh_from_db()
+        self.assertEqual((self.subject.seats_taken, self.subject.seats_left), (1, 0))
+
+        with self.assertRaises(NoSeatsAvailable):
+            inscribe_subject(self.other, self.subject)
+        self.assertFalse(SubjectInscription.objects.filter(student=self.other).exists())
+        self.assertFalse(Grade.objects.filter(student=self.other).exists())
+
+        # Already inscribed students are not refused nor counted twice.
+        self.assertEqual(inscribe_subject(self.student, self.subject), (False, False))
+        self.subject.refresh_from_db()
+        self.assertEqual(self.subject.seats_taken, 1)
+
+        SubjectInscription.objects.get(student=self.student).delete()
+        inscribe_subject(self.other, self.subject)
+        self.subject.refresh_from_db()
+        self.assertEqual(self.subject.seats_taken, 1)
+
+    def test_final_exam_seats(self):
+        final_exam = FinalExam.objects.create(
+            subject=self.subject,
+            date=datetime.date.today() + datetime.timedelta(days=10),
+            location='Aula 1',
+            duration=datetime.timedelta(hours=2),
+            call_number=1,
+            capacity=1
+        )
+        self.assertTrue(inscribe_final_exam(self.student, final_exam))
+        self.assertFalse(inscribe_final_exam(self.student, final_exam))
+        with self.assertRaises(NoSeatsAvailable):
+            inscribe_final_exam(self.other, final_exam)
+        final_exam.refresh_from_db()
+        self.assertEqual(final_exam.seats_taken, 1)
+
+    def test_recount_seats_after_upgrade(self):
+        final_exam = FinalExam.objects.create(
+            subject=self.subject, date=datetime.date.today() + datetime.timedelta(days=10), location='Aula 1',
+            duration=datetime.timedelta(hours=2), call_number=1, capacity=1,
+        )
+        SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        FinalExamInscription.objects.create(student=self.student, final_exam=final_exam)
+        # Inscriptions that predate the counters: the new columns start at 0.
+        Subject.objects.update(seats_taken=0)
+        FinalExam.objects.update(seats_taken=0)
+
+        out = io.StringIO()
+        call_command('recount_seats', stdout=out)
+        self.assertIn('Corrected the seats of 1 subjects and 1 final exams.', out.getvalue())
+        with self.assertRaises(NoSeatsAvailable):
+            inscribe_subject(self.other, self.subject)
+        with self.assertRaises(NoSeatsAvailable):
+            inscribe_final_exam(self.other, final_exam)
+        # Correct counters are not written again.
+        self.assertEqual((recount_subject_seats(), recount_final_exam_seats()), (0, 0))
+
+    def test_orm_inscriptions_are_counted(self):
+        self.subject.capacity = None
+        self.subject.save()
+        SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        SubjectInscription.objects.create(student=self.other, subject=self.subject)
+        self.subject.refresh_from_db()
+        self.assertEqual((self.subject.seats_taken, self.subject.seats_left), (2, None))
+
+
 class FinalExamInscriptionModelTest(TestCase):
     def setUp(self):
         self.faculty = Faculty.objects.create(
@@ -106,3 +355,75 @@ class FinalExamInscriptionModelTest(TestCase):
         self.assertEqual(inscription.final_exam.subject.name, 'Matemática')
         self.assertIsNotNone(inscription.inscription_date)
         self.assertIn('student1', str(inscription))
+
+
+class FairGateTest(SimpleTestCase):
+    def test_capacity_timeout_and_queue_limit(self):
+        gate = FairGate(1)
+        self.assertTrue(gate.acquire(timeout=0, max_waiting=10))
+        self.assertFalse(gate.acquire(timeout=0.01, max_waiting=10))
+        self.assertFalse(gate.acquire(timeout=10, max_waiting=0))  # refused without waiting
+        gate.release()
+        self.assertTrue(gate.acquire(timeout=0, max_waiting=10))
+        self.assertEqual((gate.admitted, gate.rejected, gate.queue_depth), (2, 2, 0))
+
+    def test_waiters_are_admitted_in_arrival_order(self):
+        gate = FairGate(1)
+        gate.acquire(timeout=0, max_waiting=10)
+        order = []
+
+        def waiter(n):
+            gate.acquire(timeout=5, max_waiting=10)
+            order.append(n)
+            gate.release()
+
+        threads = []
+        for n in range(3):
+            threads.append(threading.Thread(target=waiter, args=(n,)))
+            threads[-1].start()
+            while gate.queue_depth <= n:  # wait until this thread is queued
+                time.sleep(0.001)
+        gate.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, [0, 1, 2])
+
+
+class InscriptionAdmissionMiddlewareTest(TestCase):
+    def setUp(self):
+        SubjectInscriptionModelTest.setUp(self)
+        self.client.force_login(self.user)
+        self.url = reverse('users:subject-inscribe', args=[self.subject.code])
+
+    def test_admitted_request_reports_queue_depth(self):
+        resp = self.client.post(self.url)
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp['X-Queue-Depth'], '0')
+
+    @override_settings(INSCRIPTION_MAX_IN_FLIGHT=0, INSCRIPTION_MAX_QUEUE=0)
+    def test_excess_requests_get_the_waiting_room(self):
+        resp = self.client.post(self.url)
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp['Retry-After'], '1')
+        self.assertContains(resp, 'Sala de espera', status_code=503)
+        self.assertFalse(SubjectInscription.objects.exists())
+        # Only inscription POSTs are gated.
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(INSCRIPTION_RATE_LIMIT=1)
+    def test_shared_rate_limit(self):
+        with unittest.mock.patch('inscriptions.middleware.time.time', return_value=1_000_000.0):
+            self.assertEqual(self.client.post(self.url).status_code, 302)
+            self.assertEqual(self.client.post(self.url).status_code, 503)
+        self.assertEqual(admission_stats()['rejected'], 1)
+
+    @override_settings(INSCRIPTION_MAX_IN_FLIGHT=0, INSCRIPTION_MAX_QUEUE=0, INSCRIPTION_RATE_LIMIT=1)
+    def test_anonymous_requests_take_no_slot_or_token(self):
+        self.client.logout()
+        with unittest.mock.patch('inscriptions.middleware.CacheTokenBucket.take') as take:
+            for _ in range(3):
+                resp = self.client.post(self.url)
+                self.assertEqual(resp.status_code, 302)
+                self.assertIn('/login', resp['Location'])
+        take.assert_not_called()
+        self.assertEqual(admission_stats()['rejected'], 0)
@@ -0,0 +1,179 @@
+"""Development checks and instrumentation applied to every request.
+
+Includes:
+- RepeatedQueryMiddleware: detect N+1 query patterns, i.e. the same SQL statement
+  shape executed many times while serving one request.
+- RepeatedQueryError: raised for such a request when the check is set to "raise".
+- ServerTimingMiddleware: total, database, template and certificate (docxtpl)
+  time of a request, as a Server-Timing header and sampled JSON log lines.
+
+Notes:
+    - Enabled by settings.QUERY_SHAPE_CHECK: "log" (warning on the
+      "main.queries" logger), "raise", or empty to remove the middleware from the
+      chain. Defaults to "log" when DEBUG is on.
+    - A shape is the SQL sent to the database with its parameters left as
+      placeholders and IN lists collapsed, so the same lookup with different ids
+      counts as repeated. settings.QUERY_SHAPE_THRESHOLD sets how many runs of one
+      shape are tolerated; legitimate batches (bulk_update chunks) stay below it.
+    - Queries are observed with connection.execute_wrapper(), which works with
+      DEBUG off and costs one dictionary update per query.
+    - ServerTimingMiddleware is enabled by settings.SERVER_TIMING_HEADER and/or
+      settings.SERVER_TIMING_SAMPLE_RATE. Requests that get no header and are not
+      sampled are passed through untouched; with both off the middleware is
+      removed from the chain. Phases other than the database are reported by
+      main.timing.timed() blocks (main.template_backends, users.certificates).
+    - A streamed body (StreamingHttpResponse, e.g. the bulk certificate ZIP) is
+      produced after the middleware returns. Each chunk is pulled inside a copy
+      of the request's context with the query wrappers installed, whichever
+      thread iterates it, and the sampled log line is written once the stream
+      ends or is closed. The Server-Timing header has already been sent by then,
+      so it only covers the work done before the first byte.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from main.timing import RequestTimings
+
+logger = logging.getLogger("main.queries")
+timing_logger = logging.getLogger("main.timing")
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_SAVEPOINT = re.compile(r'^\s*(?:SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b', re.IGNORECASE)
+
+
+class RepeatedQueryError(Exception):
+    """A request executed the same query shape more often than QUERY_SHAPE_THRESHOLD allows."""
+
+
+def query_shape(sql):
+    """Return `sql` with IN (%s, %s, ...) lists collapsed, or None for savepoint statements."""
+    if _SAVEPOINT.match(sql):
+        return None
+    return _IN_LIST.sub("(%s, ...)", sql)
+
+
+class RepeatedQueryMiddleware:
+    """Report requests that run one query shape at least QUERY_SHAPE_THRESHOLD times."""
+
+    def __init__(self, get_response):
+        self.mode = settings.QUERY_SHAPE_CHECK
+        if self.mode not in ("log", "raise"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.QUERY_SHAPE_THRESHOLD
+
+    def __call__(self, request):
+        shapes = Counter()
+
+        def record(execute, sql, params, many, context):
+            shape = query_shape(sql)
+            if shape is not None:
+                shapes[shape] += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(record))
+            response = self.get_response(request)
+
+        repeated = [(shape, count) for shape, count in shapes.most_common() if count >= self.threshold]
+        if repeated:
+            report = "\n".join(f"  {count}x {shape}" for shape, count in repeated)
+            message = f"{request.method} {request.path} repeated {len(repeated)} query shape(s):\n{report}"
+            if self.mode == "raise":
+                raise RepeatedQueryError(message)
+            logger.warning(message)
+        return response
+
+
+class ServerTimingMiddleware:
+    """Measure where a request spends its time and report it as Server-Timing and log lines."""
+
+    def __init__(self, get_response):
+        self.header = settings.SERVER_TIMING_HEADER
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if not self.header and self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not (self.header or sampled):
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        start = time.perf_counter()
+        with timings.activate():
+            with self.recording_queries(timings):
+                response = self.get_response(request)
+            context = contextvars.copy_context()
+        timings.durations["total"] = time.perf_counter() - start
+
+        if self.header:
+            response["Server-Timing"] = self.server_timing(timings)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.timed_stream(
+                response.streaming_content, context, timings, start, request, response, sampled,
+            )
+        elif sampled:
+            self.log(request, response, timings)
+        return response
+
+    @staticmethod
+    @contextmanager
+    def recording_queries(timings):
+        """Time the queries run in the block, on every database connection of the current thread."""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timings.record_query))
+            yield
+
+    def timed_stream(self, chunks, context, timings, start, request, response, sampled):
+        """Yield `chunks`, producing each one inside the request's `context`, and log when done."""
+        chunks = iter(chunks)
+        try:
+            while True:
+                with self.recording_queries(timings):
+                    chunk = context.run(next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            timings.durations["total"] = time.perf_counter() - start
+            if sampled:
+                self.log(request, response, timings)
+
+    @staticmethod
+    def log(request, response, timings):
+        """Write the sampled JSON line of one request to the main.timing logger."""
+        match = request.resolver_match
+        timing_logger.info(json.dumps({
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": timings.queries,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in timings.durations.items()},
+        }))
+
+    @staticmethod
+    def server_timing(timings):
+        """Return the Server-Timing header value of `timings` (durations in milliseconds)."""
+        metrics = []
+        for name in ("total", "db", "tpl", "docx"):
+            if name in timings.durations or name == "db":
+                metric = f"{name};dur={timings.durations[name] * 1000:.1f}"
+                if name == "db":
+                    metric += f';desc="{timings.queries} queries"'
+                metrics.append(metric)
+        return ", ".join(metrics)
@@ -0,0 +1,132 @@
+"""Keyset (seek) pagination for long list views.
+
+Includes:
+- KeysetPage: one page of rows plus the cursors of its neighbours.
+- keyset_paginate: slice a queryset after (or before) a cursor.
+
+Notes:
+    - A page is fetched with WHERE (key) > (cursor) ORDER BY key LIMIT n + 1, so
+      its cost depends on the page size only, not on how deep the page is; there
+      is no OFFSET and no COUNT(*).
+    - The ordering must be unique and non-null (end it with the primary key) and
+      backed by an index that starts with the filtered columns. It may lead with
+      annotations (e.g. a search rank) computed on the filtered rows.
+    - Cursors are opaque URL-safe strings holding the key of the first or last
+      row shown; an unreadable cursor falls back to the first page.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+
+
+@dataclass
+class KeysetPage:
+    """
+    A page produced by keyset_paginate().
+
+    Attributes:
+        object_list (list): Rows of the page, in list order.
+        next_cursor (str | None): Cursor of the following page, if any.
+        previous_cursor (str | None): Cursor of the preceding page, if any.
+    """
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.next_cursor is not None or self.previous_cursor is not None
+
+
+def _encode(direction, values):
+    raw = json.dumps([direction, values], cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor, fields):
+    """Return (direction, values) of `cursor`, with values converted back by the model fields."""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    direction, values = json.loads(raw)
+    if direction not in ("next", "prev") or not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError("Malformed cursor.")
+    return direction, [field.to_python(value) for field, value in zip(fields, values)]
+
+
+def _seek(ordering, values, forward):
+    """Q selecting the rows strictly after (forward) or before the key `values`."""
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(ordering, values):
+        after = descending != forward  # "lt" when walking a descending key forwards
+        condition |= equal & Q(**{f"{name}__{'gt' if after else 'lt'}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def keyset_paginate(queryset, ordering, cursor=None, per_page=DEFAULT_PAGE_SIZE):
+    """
+    Return the page of `queryset` that follows or precedes `cursor`.
+
+    Args:
+        queryset (QuerySet): Rows to page through, already filtered.
+        ordering (Sequence[str]): Model field or annotation names ("-" prefix for
+            descending) forming a unique, non-null key; the last one should be the pk.
+        cursor (str | None): next_cursor/previous_cursor of a page; None for the first page.
+        per_page (int): Rows per page.
+
+    Returns:
+        KeysetPage: The rows of the page and the cursors of its neighbours.
+    """
+    ordering = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+    annotations = queryset.query.annotations
+    fields = [
+        annotations[name].output_field if name in annotations else queryset.model._meta.get_field(name)
+        for name, _ in ordering
+    ]
+    attnames = [name if name in annotations else field.attname for (name, _), field in zip(ordering, fields)]
+
+    direction, values = "next", None
+    if cursor:
+        try:
+            direction, values = _decode(cursor, fields)
+        except (ValueError, TypeError, ValidationError):  # binascii/JSON errors are ValueErrors
+            direction, values = "next", None
+    forward = direction == "next"
+
+    # Walking backwards reads the key in reverse order, then flips the page.
+    rows = queryset.order_by(*[("-" if desc == forward else "") + name for name, desc in ordering])
+    if values is not None:
+        rows = rows.filter(_seek(ordering, values, forward))
+    rows = list(rows[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    def key(obj):
+        return [getattr(obj, attname) for attname in attnames]
+
+    if forward:
+        has_next, has_previous = more, values is not None
+    else:
+        has_next, has_previous = True, more
+    page = KeysetPage(rows)
+    if rows:
+        if has_next:
+            page.next_cursor = _encode("next", key(rows[-1]))
+        if has_previous:
+            page.previous_cursor = _encode("prev", key(rows[0]))
+    return page
@@ -52,12 +52,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'main.middleware.RepeatedQueryMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'inscriptions.middleware.InscriptionAdmissionMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -65,7 +68,7 @@ ROOT_URLCONF = 'main.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'main.template_backends.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -147,6 +150,69 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Certificates
+# Process pool size for bulk certificate generation (defaults to the CPU count).
+# Only the generate_certificates command uses it; web requests use the cap below.
+CERTIFICATE_BULK_WORKERS = int(os.getenv('CERTIFICATE_BULK_WORKERS', '0')) or None
+# Render processes of the admin bulk certificate download (1 renders in the request process).
+CERTIFICATE_BULK_REQUEST_WORKERS = int(os.getenv('CERTIFICATE_BULK_REQUEST_WORKERS', '1'))
+# Rendered certificates, stored by content hash. Must not be served publicly.
+CERTIFICATE_STORE_DIR = Path(os.getenv('CERTIFICATE_STORE_DIR', BASE_DIR / 'certificate_store'))
+# Hand stored files to the front proxy: 'X-Accel-Redirect' (nginx), 'X-Sendfile' (Apache) or empty.
+CERTIFICATE_SENDFILE_HEADER = os.getenv('CERTIFICATE_SENDFILE_HEADER', '')
+# X-Accel-Redirect only: internal location mapped to CERTIFICATE_STORE_DIR.
+CERTIFICATE_SENDFILE_PREFIX = os.getenv('CERTIFICATE_SENDFILE_PREFIX', '/protected/certificates/')
+# Seconds after which a RUNNING certificate job is considered abandoned and reclaimed.
+CERTIFICATE_JOB_TIMEOUT = int(os.getenv('CERTIFICATE_JOB_TIMEOUT', '300'))
+# Claims after which an abandoned certificate job is marked FAILED instead of reclaimed.
+CERTIFICATE_JOB_MAX_ATTEMPTS = int(os.getenv('CERTIFICATE_JOB_MAX_ATTEMPTS', '3'))
+
+# Student dashboard
+# Seconds a rendered dashboard fragment is kept; entries are also replaced whenever
+# the student's data changes (users.signals).
+STUDENT_DASHBOARD_CACHE_TIMEOUT = int(os.getenv('STUDENT_DASHBOARD_CACHE_TIMEOUT', '900'))
+# Finals dated within this many days from today are offered to REGULAR students.
+ELIGIBLE_FINALS_LOOKAHEAD_DAYS = int(os.getenv('ELIGIBLE_FINALS_LOOKAHEAD_DAYS', '120'))
+
+# Professor permissions
+# Seconds a professor's cached subject/final assignments are trusted; they are also
+# dropped whenever an assignment changes (users.signals).
+PROFESSOR_AUTHORIZATION_CACHE_TIMEOUT = int(os.getenv('PROFESSOR_AUTHORIZATION_CACHE_TIMEOUT', '300'))
+
+# Inscription admission control (inscriptions.middleware)
+# URL names whose POSTs go through the admission gate.
+INSCRIPTION_ADMISSION_URL_NAMES = ['users:subject-inscribe', 'users:subjects-batch-inscribe', 'users:final-inscribe']
+# Concurrent inscription requests per worker process.
+INSCRIPTION_MAX_IN_FLIGHT = int(os.getenv('INSCRIPTION_MAX_IN_FLIGHT', '4'))
+# Requests allowed to wait for a slot, and for how long (seconds), before the waiting room.
+INSCRIPTION_MAX_QUEUE = int(os.getenv('INSCRIPTION_MAX_QUEUE', '50'))
+INSCRIPTION_QUEUE_TIMEOUT = float(os.getenv('INSCRIPTION_QUEUE_TIMEOUT', '2'))
+# Inscriptions per second across all workers sharing the cache (0 = unlimited).
+INSCRIPTION_RATE_LIMIT = int(os.getenv('INSCRIPTION_RATE_LIMIT', '0'))
+
+# Grade grid and CSV grade import
+# The grade grid posts 4 fields per student; Django's default of 1000 would cap it at ~250 rows.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = int(os.getenv('DATA_UPLOAD_MAX_NUMBER_FIELDS', '10000'))
+# Uploaded grade files kept between the preview and the confirmation. Must not be served publicly.
+GRADE_IMPORT_STAGING_DIR = Path(os.getenv('GRADE_IMPORT_STAGING_DIR', BASE_DIR / 'grade_imports'))
+
+# Admin list views (main.pagination)
+# Rows per page; pages are fetched by key, so deep pages cost the same as the first.
+ADMIN_LIST_PAGE_SIZE = int(os.getenv('ADMIN_LIST_PAGE_SIZE', '50'))
+
+# N+1 query detection (main.middleware.RepeatedQueryMiddleware)
+# 'log', 'raise' or '' (off). Logs by default while DEBUG is on.
+QUERY_SHAPE_CHECK = os.getenv('QUERY_SHAPE_CHECK', 'log' if DEBUG else '')
+# Runs of one query shape per request that are reported.
+QUERY_SHAPE_THRESHOLD = int(os.getenv('QUERY_SHAPE_THRESHOLD', '5'))
+
+# Request timing (main.middleware.ServerTimingMiddleware)
+# Send total/db/tpl/docx durations as a Server-Timing header; it tells clients about the
+# server's internals, so it is only on by default while DEBUG is on.
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', str(DEBUG)).lower() in ['true', '1', 'yes']
+# Fraction of requests (0 to 1) logged as JSON on the "main.timing" logger; 0 disables logging.
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '0'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
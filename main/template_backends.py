@@ -0,0 +1,28 @@
+"""Template backend reporting render time to main.timing.
+
+Includes:
+- TimedDjangoTemplates: the Django template backend, timing every render as
+  the "tpl" phase of the current request.
+"""
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from main.timing import timed
+
+
+class TimedTemplate(Template):
+    """Django backend template whose render() is timed."""
+
+    def render(self, context=None, request=None):
+        with timed("tpl"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates returning TimedTemplate objects; configured like DjangoTemplates."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
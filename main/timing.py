@@ -0,0 +1,73 @@
+"""Per-request timing of named phases (templates, certificate renders, ...).
+
+Includes:
+- RequestTimings: durations accumulated while serving one request.
+- timed: context manager adding the duration of a block to the current request.
+
+Notes:
+    - The current RequestTimings lives in a context variable set by
+      main.middleware.ServerTimingMiddleware, so threads and async tasks of
+      different requests never mix.
+    - Outside a timed request, timed() only reads the context variable.
+    - Work done in another thread for the request only counts when it runs in a
+      copy of the request's context (contextvars.copy_context(), as the
+      middleware does for streamed bodies).
+    - A phase nested in the same phase (a template rendered while rendering
+      another one) is counted once, by the outer block.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Durations of the phases of one request.
+
+    Attributes:
+        durations (defaultdict[str, float]): Phase name -> seconds spent.
+        queries (int): Database queries executed.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = 0
+        self._active = set()
+
+    @contextmanager
+    def activate(self):
+        """Make these timings the current ones for the duration of the block."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def record_query(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook timing each query as the "db" phase."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations["db"] += time.perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to phase `name` of the current request, if any."""
+    timings = _current.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+    timings._active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[name] += time.perf_counter() - start
+        timings._active.discard(name)
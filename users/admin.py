@@ -1,13 +1,13 @@
 """Django admin registrations for the Users app.
 
-Registers CustomUser, Student, Professor, and Administrator with basic list and search configuration.
+Registers CustomUser, Student, Professor, Administrator, and CertificateJob with basic list and search configuration.
 
 Notes:
     Uses namespaced search_fields for related user and career lookups.
 """
 
 from django.contrib import admin
-from .models import CustomUser, Student, Professor, Administrator
+from .models import CustomUser, Student, Professor, Administrator, CertificateJob
 
 
 @admin.register(CustomUser)
@@ -36,3 +36,11 @@ class AdministratorAdmin(admin.ModelAdmin):
     """Admin for Administrator: identity, position, and hire date."""
     list_display = ("administrator_id", "user", "position", "hire_date")
     search_fields = ("administrator_id", "user__username", "position")
+
+
+@admin.register(CertificateJob)
+class CertificateJobAdmin(admin.ModelAdmin):
+    """Admin for CertificateJob: queue state, attempts, and timings."""
+    list_display = ("id", "student", "status", "issue_date", "attempts", "created_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("student__student_id", "student__user__username")
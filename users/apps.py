@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from users import signals  # noqa: F401  (connects dashboard cache invalidation)
+        from users.search import create_search_indexes
+
+        post_migrate.connect(create_search_indexes, sender=self)
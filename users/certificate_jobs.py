@@ -0,0 +1,155 @@
+"""Database-backed queue for regular certificate renders.
+
+Includes:
+- enqueue_certificate: create (or reuse) a pending job for a student.
+- claim_next_job: atomically hand the oldest pending job to a worker.
+- run_job: render a claimed job into the CertificateStore.
+- work: polling loop used by the `certificate_worker` management command.
+
+Notes:
+    - Claims use SELECT ... FOR UPDATE SKIP LOCKED where the database supports it
+      plus a conditional UPDATE, so several worker processes never run the same job.
+    - Jobs left RUNNING by a crashed worker are reclaimed after
+      settings.CERTIFICATE_JOB_TIMEOUT seconds, up to
+      settings.CERTIFICATE_JOB_MAX_ATTEMPTS claims. A job that keeps killing its
+      worker is then marked FAILED instead of being retried forever.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from users.certificates import build_certificate_context, certificate_store, regular_certificate_template_path
+from users.models import CertificateJob, Student
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_certificate(student, issue_date=None):
+    """
+    Queue a regular certificate render for `student`.
+
+    A PENDING or RUNNING job for the same student and issue date is reused, so
+    repeated clicks do not pile up work.
+
+    Args:
+        student (users.Student): Student the certificate is issued to.
+        issue_date (date | None): Date printed on the certificate; defaults to today.
+
+    Returns:
+        CertificateJob: The new or reused job.
+    """
+    issue_date = issue_date or timezone.localdate()
+    active = (
+        CertificateJob.objects.filter(
+            student=student,
+            issue_date=issue_date,
+            status__in=[CertificateJob.Status.PENDING, CertificateJob.Status.RUNNING],
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    return active or CertificateJob.objects.create(student=student, issue_date=issue_date)
+
+
+def claim_next_job():
+    """
+    Mark the oldest claimable job as RUNNING and return it.
+
+    Abandoned jobs that already used every attempt are marked FAILED first.
+
+    Returns:
+        CertificateJob | None: Claimed job, or None when the queue is empty.
+    """
+    now = timezone.now()
+    max_attempts = settings.CERTIFICATE_JOB_MAX_ATTEMPTS
+    stale = Q(
+        status=CertificateJob.Status.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.CERTIFICATE_JOB_TIMEOUT),
+    )
+    exhausted = CertificateJob.objects.filter(stale, attempts__gte=max_attempts).update(
+        status=CertificateJob.Status.FAILED,
+        error=f"El certificado no pudo generarse tras {max_attempts} intentos.",
+        finished_at=now,
+    )
+    if exhausted:
+        logger.error("Gave up on %s certificate jobs after %s attempts", exhausted, max_attempts)
+    claimable = Q(status=CertificateJob.Status.PENDING) | (stale & Q(attempts__lt=max_attempts))
+    while True:
+        with transaction.atomic():
+            jobs = CertificateJob.objects.filter(claimable).order_by("created_at")
+            if connection.features.has_select_for_update_skip_locked:
+                jobs = jobs.select_for_update(skip_locked=True)
+            job = jobs.first()
+            if job is None:
+                return None
+            # Conditional update keeps the claim exclusive on backends without row locks.
+            now = timezone.now()
+            claimed = CertificateJob.objects.filter(pk=job.pk, attempts=job.attempts).update(
+                status=CertificateJob.Status.RUNNING, started_at=now, attempts=F("attempts") + 1
+            )
+        if claimed:
+            job.status, job.started_at, job.attempts = CertificateJob.Status.RUNNING, now, job.attempts + 1
+            return job
+
+
+def run_job(job):
+    """
+    Render the certificate of a claimed job and record the outcome.
+
+    Args:
+        job (CertificateJob): Job in RUNNING state.
+
+    Returns:
+        CertificateJob: The job in DONE or FAILED state.
+    """
+    try:
+        student = Student.objects.select_related("user", "career__faculty").get(pk=job.student_id)
+        context = build_certificate_context(student, job.issue_date)
+        job.content_key, _ = certificate_store().fetch(regular_certificate_template_path(), context)
+        job.status = CertificateJob.Status.DONE
+        job.error = ""
+    except Exception as exc:
+        logger.exception("Certificate job %s failed", job.pk)
+        job.status = CertificateJob.Status.FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    job.finished_at = timezone.now()
+    job.save(update_fields=["content_key", "status", "error", "finished_at"])
+    return job
+
+
+def work(poll_interval=1.0, once=False, stop=None):
+    """
+    Process jobs until stopped.
+
+    Args:
+        poll_interval (float): Seconds to sleep when the queue is empty.
+        once (bool): Return as soon as the queue is empty.
+        stop (Callable[[], bool] | None): Checked between jobs; True ends the loop.
+
+    Returns:
+        int: Number of processed jobs.
+    """
+    processed = 0
+    while not (stop and stop()):
+        try:
+            job = claim_next_job()
+        except DatabaseError:
+            # Transient failures (lost connection, lock timeout) must not kill the worker.
+            logger.warning("Could not claim a certificate job; retrying", exc_info=True)
+            close_old_connections()
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,447 @@
+"""Certificate rendering helpers for the Users app.
+
+Includes:
+- CompiledCertificateTemplate: a DOCX template parsed once, with its XML parts
+  patched and compiled to Jinja templates on first use.
+- CertificateTemplateCache: process-wide cache of compiled templates keyed by path,
+  reloaded only when the file changes on disk.
+- render_certificate: render a context into a file-like object using the cache.
+- build_certificate_context / certificate_filename: per-student template variables and file name.
+- render_certificate_file: render into a temporary file (process pool entry point).
+- iter_certificate_zip: render many certificates into a streamed ZIP using a process pool.
+- CertificateStore: content-addressed on-disk store of rendered certificates.
+
+Notes:
+    - Each worker process keeps its own cache; nothing is shared between processes.
+    - A render works on a deep copy of the parsed document, so the cached template
+      is never mutated and concurrent renders in threads are safe.
+    - Documents are written to files or straight into the response stream; no
+      code path materializes a rendered DOCX with BytesIO.getvalue().
+"""
+
+import copy
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from docx import Document
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+from main.timing import timed
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class _MemoizedEnvironment(Environment):
+    """Jinja environment that compiles each distinct template source only once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compiled = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        """Return the compiled template for `source`, compiling it on first use."""
+        if globals is not None or template_class is not None:
+            return super().from_string(source, globals=globals, template_class=template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = self._compiled[source] = super().from_string(source)
+        return template
+
+
+class _CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate working on a copy of a pre-parsed document with memoized XML patching."""
+
+    def __init__(self, compiled):
+        super().__init__(compiled.path)
+        self.docx = copy.deepcopy(compiled.document)
+        self._patched = compiled.patched_xml
+
+    def patch_xml(self, src_xml):
+        """Return the patched XML for `src_xml`, reusing the result from previous renders."""
+        patched = self._patched.get(src_xml)
+        if patched is None:
+            patched = self._patched[src_xml] = super().patch_xml(src_xml)
+        return patched
+
+
+class CompiledCertificateTemplate:
+    """
+    DOCX template parsed once and reused across renders.
+
+    Attributes:
+        path (Path): Template location on disk.
+        fingerprint (str): SHA-256 of the template bytes.
+        document (docx.Document): Parsed document; never rendered directly.
+        patched_xml (dict[str, str]): docxtpl-patched XML keyed by source XML.
+        jinja_env (Environment): Environment memoizing compiled Jinja templates.
+    """
+
+    def __init__(self, path, data):
+        self.path = Path(path)
+        self.fingerprint = hashlib.sha256(data).hexdigest()
+        self.document = Document(BytesIO(data))
+        self.patched_xml = {}
+        self.jinja_env = _MemoizedEnvironment()
+
+    def new_render(self):
+        """Return a fresh DocxTemplate backed by a copy of the parsed document."""
+        return _CachedDocxTemplate(self)
+
+    def render(self, context, output):
+        """
+        Render `context` and save the resulting DOCX into `output`.
+
+        Args:
+            context (dict): Template variables.
+            output (str | Path | IO[bytes]): Destination path or binary file-like object.
+        """
+        with timed("docx"):
+            doc = self.new_render()
+            doc.render(context, jinja_env=self.jinja_env)
+            doc.save(output)
+
+
+class CertificateTemplateCache:
+    """
+    Process-wide cache of compiled certificate templates.
+
+    A cached entry is revalidated with a stat() call on every lookup. When the
+    modification time or size changed, the file is read again and re-parsed only
+    if its content hash differs from the cached one.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        Return the compiled template for `path`, loading it if needed.
+
+        Args:
+            path (str | Path): Template location.
+
+        Returns:
+            CompiledCertificateTemplate: Cached or freshly compiled template.
+
+        Raises:
+            FileNotFoundError: If the template does not exist.
+        """
+        path = Path(path)
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+            data = path.read_bytes()
+            if entry is not None and entry[1].fingerprint == hashlib.sha256(data).hexdigest():
+                compiled = entry[1]
+            else:
+                compiled = CompiledCertificateTemplate(path, data)
+            self._entries[key] = (signature, compiled)
+            return compiled
+
+    def clear(self):
+        """Drop every cached template."""
+        with self._lock:
+            self._entries.clear()
+
+
+template_cache = CertificateTemplateCache()
+
+
+def render_certificate(template_path, context, output):
+    """
+    Render a certificate using the process-wide template cache.
+
+    Args:
+        template_path (str | Path): DOCX template location.
+        context (dict): Template variables.
+        output (str | Path | IO[bytes]): Destination path or binary file-like object.
+
+    Raises:
+        FileNotFoundError: If the template does not exist.
+    """
+    template_cache.get(template_path).render(context, output)
+
+
+def regular_certificate_template_path():
+    """Return the location of the regular student certificate template."""
+    return Path(settings.BASE_DIR) / "regular_certificate.docx"
+
+
+def build_certificate_context(student, today):
+    """
+    Build the template variables for a student's regular certificate.
+
+    Args:
+        student (users.Student): Student with `user` and `career__faculty` loaded.
+        today (date): Issue date printed on the certificate.
+
+    Returns:
+        dict: Context for the DOCX template.
+    """
+    user = student.user
+    career = student.career
+    return {
+        "full_name": user.get_full_name() or user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "dni": user.dni,
+        "student_id": student.student_id,
+        "career_name": career.name if career else "",
+        "career_code": career.code if career else "",
+        "faculty_name": career.faculty.name if career and career.faculty else "",
+        "enrollment_date": student.enrollment_date.strftime("%d/%m/%Y") if student.enrollment_date else "",
+        "today_date": today.strftime("%d/%m/%Y"),
+        "today_day": f"{today.day:02d}",
+        "today_month": f"{today.month:02d}",
+        "today_year": f"{today.year}",
+    }
+
+
+def certificate_filename(user, today):
+    """Return the download file name of a user's regular certificate."""
+    return f"certificado-regular-{user.last_name or user.username}-{today.strftime('%Y%m%d')}.docx"
+
+
+def render_certificate_file(template_path, context, directory):
+    """
+    Render a certificate into a new file in `directory` (process pool entry point).
+
+    Workers hand back a path instead of the document bytes, so nothing but the
+    file name crosses the process boundary.
+
+    Returns:
+        str: Location of the rendered DOCX; the caller deletes it.
+    """
+    fd, name = tempfile.mkstemp(dir=directory, suffix=".docx")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            render_certificate(template_path, context, fh)
+    except BaseException:
+        Path(name).unlink(missing_ok=True)
+        raise
+    return name
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Unseekable sink collecting ZIP output until it is drained by the consumer."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        """Return and forget everything written since the previous drain."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _copy_member(archive, sink, name, path, block_size=STREAM_BLOCK_SIZE):
+    """Move the file at `path` into `archive` as `name`, yielding ZIP output per block."""
+    try:
+        with open(path, "rb") as src, archive.open(name, "w") as member:
+            while block := src.read(block_size):
+                member.write(block)
+                yield sink.drain()
+    finally:
+        os.unlink(path)
+
+
+def _rendered_file(future):
+    """Wait for a pool render, timed as "docx" since worker processes cannot report to the request."""
+    with timed("docx"):
+        return future.result()
+
+
+def iter_certificate_zip(students, today, template_path=None, workers=None):
+    """
+    Render regular certificates for `students` and stream them as a ZIP archive.
+
+    Renders are spread across a process pool with a bounded number of in-flight
+    jobs, so memory stays proportional to the pool size rather than to the number
+    of students. Pool workers and inline renders both write temporary files that
+    are copied into the archive block by block, and the output is yielded after
+    every block: no chunk holds much more than STREAM_BLOCK_SIZE bytes, and no
+    document is ever held as a whole bytes object.
+
+    Args:
+        students (Iterable[users.Student]): Students with `user` and `career__faculty` loaded.
+        today (date): Issue date printed on the certificates.
+        template_path (Path | None): DOCX template; defaults to the regular certificate.
+        workers (int | None): Pool size; defaults to settings.CERTIFICATE_BULK_WORKERS.
+            Values below 2 render in the current process.
+
+    Yields:
+        bytes: Consecutive chunks of the ZIP file.
+
+    Raises:
+        FileNotFoundError: If the template does not exist.
+    """
+    template_path = Path(template_path or regular_certificate_template_path())
+    template_cache.get(template_path)  # fail fast before the first byte is sent
+    if workers is None:
+        workers = getattr(settings, "CERTIFICATE_BULK_WORKERS", None) or os.cpu_count() or 1
+
+    jobs = (
+        (f"{student.student_id}-{certificate_filename(student.user, today)}",
+         build_certificate_context(student, today))
+        for student in students
+    )
+    sink = _ZipStreamBuffer()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive, \
+            tempfile.TemporaryDirectory(prefix="certificates-") as scratch:
+        if workers < 2:
+            for name, context in jobs:
+                yield from _copy_member(archive, sink, name, render_certificate_file(template_path, context, scratch))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for name, context in jobs:
+                    pending.append((name, pool.submit(render_certificate_file, template_path, context, scratch)))
+                    if len(pending) >= workers * 2:
+                        name, future = pending.popleft()
+                        yield from _copy_member(archive, sink, name, _rendered_file(future))
+                while pending:
+                    name, future = pending.popleft()
+                    yield from _copy_member(archive, sink, name, _rendered_file(future))
+    yield sink.drain()
+
+
+class CertificateStore:
+    """
+    Content-addressed store of rendered certificates.
+
+    A certificate is stored under the SHA-256 of its template fingerprint and render
+    context, so the key changes whenever the student data, the issue date, or the
+    template change. The key doubles as the HTTP ETag of the document.
+
+    Attributes:
+        root (Path): Directory holding the rendered files (two-level fan-out).
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def key_for(self, template_path, context):
+        """
+        Return the content key of a certificate without rendering it.
+
+        Raises:
+            FileNotFoundError: If the template does not exist.
+        """
+        fingerprint = template_cache.get(template_path).fingerprint
+        payload = json.dumps(context, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{fingerprint}\n{payload}".encode()).hexdigest()
+
+    def path_for(self, key):
+        """Return the on-disk location of `key`."""
+        return self.root / key[:2] / f"{key}.docx"
+
+    def fetch(self, template_path, context, key=None):
+        """
+        Return the stored certificate for `context`, rendering it on a miss.
+
+        The file is rendered into a temporary file in the target directory and
+        atomically renamed, so readers never observe a partial document.
+
+        Args:
+            template_path (str | Path): DOCX template location.
+            context (dict): Template variables.
+            key (str | None): Precomputed key_for() result.
+
+        Returns:
+            tuple[str, Path]: Content key and file path.
+
+        Raises:
+            FileNotFoundError: If the template does not exist.
+        """
+        key = key or self.key_for(template_path, context)
+        path = self.path_for(key)
+        if path.exists():
+            return key, path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                render_certificate(template_path, context, fh)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return key, path
+
+    def fetch_file(self, template_path, context, key=None, attempts=3):
+        """
+        Like fetch(), but also return the stored file opened for reading.
+
+        prune() may unlink a file between fetch() and open(); the open handle keeps
+        the document readable whatever happens to the path afterwards, and a file
+        pruned before it was opened is rendered again.
+
+        Returns:
+            tuple[str, Path, BinaryIO]: Content key, file path, and the open file;
+            the caller closes it.
+
+        Raises:
+            FileNotFoundError: If the template does not exist, or the file kept
+                disappearing for `attempts` renders.
+        """
+        key = key or self.key_for(template_path, context)
+        for _ in range(attempts):
+            key, path = self.fetch(template_path, context, key=key)
+            try:
+                return key, path, open(path, "rb")
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"Certificate {key} was pruned while it was being served.")
+
+    def prune(self, max_age_seconds):
+        """
+        Delete stored certificates not modified within `max_age_seconds`.
+
+        Returns:
+            int: Number of deleted files.
+        """
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        for path in self.root.glob("*/*.docx"):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+
+
+def certificate_store():
+    """Return the store configured by settings.CERTIFICATE_STORE_DIR."""
+    return CertificateStore(settings.CERTIFICATE_STORE_DIR)
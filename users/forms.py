@@ -5,6 +5,11 @@ Includes:
 - StudentProfileForm: student profile data linked to a Career.
 - ProfessorProfileForm: professor profile data.
 - AdministratorProfileForm: administrator profile data.
+- BulkCertificateForm: career or faculty selection for bulk certificate generation.
+- BatchInscriptionForm: several subjects of the student's career to inscribe at once.
+- EnrollmentImportForm: CSV upload for the bulk enrollment import.
+- GradeImportForm: CSV upload of a subject's grades.
+- ListFilterForm: role/career/year filters of the admin list views.
 
 Notes:
     Labels are in Spanish to match the current UI.
@@ -12,7 +17,8 @@ Notes:
 
 from django import forms
 from users.models import CustomUser, Student, Professor, Administrator
-from academics.models import Career
+from academics.models import Career, Faculty, Subject
+from inscriptions.importers import decodes_as_utf8
 
 
 class UserForm(forms.ModelForm):
@@ -102,7 +108,7 @@ class StudentProfileForm(forms.ModelForm):
     Fields:
         student_id, career, enrollment_date.
     """
-    career = forms.ModelChoiceField(queryset=Career.objects.all(), label="Carrera")
+    career = forms.ModelChoiceField(queryset=Career.objects.select_related("faculty"), label="Carrera")
 
     class Meta:
         model = Student
@@ -134,3 +140,138 @@ class AdministratorProfileForm(forms.ModelForm):
         model = Administrator
         fields = ['administrator_id', 'position', 'hire_date']
         labels = {'administrator_id': 'Legajo Administrador', 'position': 'Cargo', 'hire_date': 'Fecha de Alta'}
+
+
+class BulkCertificateForm(forms.Form):
+    """
+    Select the students whose regular certificates are generated in bulk.
+
+    Behavior:
+        - Exactly one of career or faculty must be chosen.
+        - get_students() returns the matching students in a single query.
+
+    Fields:
+        career, faculty.
+    """
+    career = forms.ModelChoiceField(queryset=Career.objects.select_related("faculty"), label="Carrera", required=False)
+    faculty = forms.ModelChoiceField(queryset=Faculty.objects.all(), label="Facultad", required=False)
+
+    def clean(self):
+        """Require exactly one of career or faculty."""
+        cleaned = super().clean()
+        if bool(cleaned.get("career")) == bool(cleaned.get("faculty")):
+            raise forms.ValidationError("Seleccione una carrera o una facultad.")
+        return cleaned
+
+    def get_students(self):
+        """Return the selected students with user, career and faculty joined."""
+        students = Student.objects.select_related("user", "career__faculty").order_by("student_id")
+        if career := self.cleaned_data.get("career"):
+            return students.filter(career=career)
+        return students.filter(career__faculty=self.cleaned_data["faculty"])
+
+    def archive_name(self):
+        """Return the ZIP file name for the current selection."""
+        scope = self.cleaned_data.get("career") or self.cleaned_data.get("faculty")
+        return f"certificados-regulares-{scope.code}.zip"
+
+
+class BatchInscriptionForm(forms.Form):
+    """
+    Select several subjects of the student's career to inscribe in one request.
+
+    Behavior:
+        - All chosen codes are validated together in a single query against the
+          student's career; any foreign code invalidates the form.
+
+    Fields:
+        subjects.
+    """
+    subjects = forms.ModelMultipleChoiceField(
+        queryset=Subject.objects.none(),
+        widget=forms.CheckboxSelectMultiple,
+        label="Materias",
+        error_messages={"required": "Seleccione al menos una materia."},
+    )
+
+    def __init__(self, *args, student, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["subjects"].queryset = Subject.objects.filter(career_id=student.career_id)
+
+
+class EnrollmentImportForm(forms.Form):
+    """
+    Upload a CSV of (student_id, subject_code) rows to enroll in bulk.
+
+    Fields:
+        file, error_report.
+
+    Validation:
+        - The whole file must decode as UTF-8. It is checked chunk by chunk
+          before any row is imported, so a bad byte near the end cannot leave
+          the earlier chunks written behind an encoding error.
+    """
+    file = forms.FileField(label="Archivo CSV", help_text="Columnas: student_id, subject_code (encabezado opcional).")
+    error_report = forms.BooleanField(label="Descargar las filas rechazadas como CSV", required=False)
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not decodes_as_utf8(upload.chunks()):
+            raise forms.ValidationError("El archivo debe estar codificado en UTF-8.")
+        upload.seek(0)
+        return upload
+
+
+class GradeImportForm(forms.Form):
+    """
+    Upload a CSV of a subject's grades, previewed before it is applied.
+
+    Fields:
+        file.
+    """
+    file = forms.FileField(
+        label="Archivo CSV",
+        help_text="Columnas: student_id, promotion_grade, final_grade (encabezado opcional).",
+    )
+
+
+class ListFilterForm(forms.Form):
+    """
+    Server-side filters of the admin list views (GET parameters).
+
+    Each view keeps only the fields it supports, e.g.
+    ListFilterForm(request.GET, fields=("role", "career")).
+
+    Fields:
+        q, role, career, year (all optional).
+    """
+    q = forms.CharField(
+        label="Buscar", required=False, max_length=100,
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "Usuario, DNI, nombre o email"}),
+    )
+    role = forms.ChoiceField(
+        label="Rol", required=False, choices=[("", "Todos"), *CustomUser.Role.choices],
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    career = forms.ModelChoiceField(
+        label="Carrera", required=False, empty_label="Todas",
+        queryset=Career.objects.only("code", "name").order_by("name"),
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    year = forms.IntegerField(
+        label="Año", required=False, min_value=1, max_value=10,
+        widget=forms.NumberInput(attrs={"class": "form-control"}),
+    )
+
+    def __init__(self, *args, fields=("role", "career", "year"), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in set(self.fields) - set(fields):
+            del self.fields[name]
+        if "career" in self.fields:
+            self.fields["career"].label_from_instance = lambda career: career.name  # no faculty lookup per option
+
+    def filters(self):
+        """Return the valid, non-empty filter values as a dict (empty when the form is invalid)."""
+        if not self.is_valid():
+            return {}
+        return {name: value for name, value in self.cleaned_data.items() if value not in (None, "")}
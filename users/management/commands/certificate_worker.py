@@ -0,0 +1,68 @@
+"""Run the background worker that renders queued certificates.
+
+Usage:
+    python manage.py certificate_worker
+    python manage.py certificate_worker --processes 4 --nice 10
+    python manage.py certificate_worker --once
+"""
+
+import multiprocessing
+import os
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from users.certificate_jobs import work
+
+
+def _run_worker(poll_interval, once, niceness):
+    """Worker entry point: loop until SIGTERM/SIGINT (or an empty queue with `once`)."""
+    stopping = False
+
+    def request_stop(*_args):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    if niceness:
+        # Let web workers on the same host win the CPU over renders.
+        os.nice(niceness)
+    return work(poll_interval=poll_interval, once=once, stop=lambda: stopping)
+
+
+class Command(BaseCommand):
+    help = "Render queued regular certificates outside the request cycle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes (default: 1).")
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty."
+        )
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+        parser.add_argument("--nice", type=int, default=0, help="Increment the process niceness by N.")
+
+    def handle(self, *args, **options):
+        worker_args = (options["poll_interval"], options["once"], options["nice"])
+        if options["processes"] <= 1:
+            processed = _run_worker(*worker_args)
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} certificate jobs."))
+            return
+
+        # Children must open their own database connections.
+        connections.close_all()
+        children = [
+            multiprocessing.Process(target=_run_worker, args=worker_args)
+            for _ in range(options["processes"])
+        ]
+        for child in children:
+            child.start()
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            for child in children:
+                child.terminate()
+                child.join()
+        self.stdout.write(self.style.SUCCESS(f"{len(children)} certificate workers stopped."))
@@ -0,0 +1,63 @@
+"""Generate regular student certificates in bulk as a ZIP archive.
+
+Usage:
+    python manage.py generate_certificates --career ISI --output isi.zip
+    python manage.py generate_certificates --faculty FRSR --output frsr.zip --workers 8
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from academics.models import Career, Faculty
+from users.certificates import iter_certificate_zip, regular_certificate_template_path
+from users.models import Student
+
+
+class Command(BaseCommand):
+    help = "Generate regular certificates for every student of a career or faculty into a ZIP file."
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--career", help="Career code.")
+        scope.add_argument("--faculty", help="Faculty code.")
+        parser.add_argument("--output", required=True, help="Destination ZIP path.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Render processes (default: settings.CERTIFICATE_BULK_WORKERS or CPU count).",
+        )
+
+    def handle(self, *args, **options):
+        students = Student.objects.select_related("user", "career__faculty").order_by("student_id")
+        if options["career"]:
+            if not Career.objects.filter(code=options["career"]).exists():
+                raise CommandError(f"Career {options['career']!r} does not exist.")
+            students = students.filter(career_id=options["career"])
+        else:
+            if not Faculty.objects.filter(code=options["faculty"]).exists():
+                raise CommandError(f"Faculty {options['faculty']!r} does not exist.")
+            students = students.filter(career__faculty_id=options["faculty"])
+
+        template_path = regular_certificate_template_path()
+        if not template_path.exists():
+            raise CommandError(f"Certificate template not found: {template_path}")
+
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        with open(options["output"], "wb") as fh:
+            for chunk in iter_certificate_zip(
+                counted(students.iterator(chunk_size=500)),
+                timezone.localdate(),
+                template_path=template_path,
+                workers=options["workers"],
+            ):
+                fh.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} certificates to {options['output']}."))
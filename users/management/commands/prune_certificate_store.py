@@ -0,0 +1,20 @@
+"""Delete rendered certificates that have not been produced recently.
+
+Usage:
+    python manage.py prune_certificate_store --days 30
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.certificates import certificate_store
+
+
+class Command(BaseCommand):
+    help = "Delete stored certificates older than the given number of days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Maximum age in days (default: 30).")
+
+    def handle(self, *args, **options):
+        deleted = certificate_store().prune(options["days"] * 86400)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} stored certificates."))
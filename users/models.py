@@ -5,6 +5,7 @@ Defines:
 - Student: one-to-one profile linked to a Career.
 - Professor: one-to-one profile with teaching assignments and category.
 - Administrator: one-to-one profile for administrative staff.
+- CertificateJob: queued regular-certificate render processed by a background worker.
 
 Notes:
     - db_table is set for each model to keep stable table names.
@@ -42,6 +43,10 @@ class CustomUser(AbstractUser):
     class Meta:
         """Meta options for CustomUser."""
         db_table = 'users'
+        indexes = [
+            # Admin user list filtered by role, paged by id (main.pagination).
+            models.Index(fields=['role', 'id'], name='users_role_id_idx'),
+        ]
 
     def __str__(self):
         """Return full name for admin readability."""
@@ -131,3 +136,49 @@ class Administrator(models.Model):
     def __str__(self):
         """Return full name for admin readability."""
         return f"{self.user.get_full_name()}"
+
+
+class CertificateJob(models.Model):
+    """
+    Regular certificate render queued for the background worker.
+
+    Attributes:
+        student (Student): Student the certificate is issued to.
+        status (str): One of Status choices.
+        issue_date (date): Date printed on the certificate.
+        content_key (str): CertificateStore key of the rendered file once DONE.
+        error (str): Failure description when FAILED.
+        attempts (int): Number of times a worker claimed the job.
+        created_at (datetime): Enqueue time.
+        started_at (datetime | None): Last claim time.
+        finished_at (datetime | None): Completion time.
+
+    Notes:
+        - Workers claim jobs oldest first using the (status, created_at) index.
+    """
+
+    class Status(models.TextChoices):
+        """Lifecycle of a certificate job."""
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='certificate_jobs')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    issue_date = models.DateField()
+    content_key = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """Meta options for CertificateJob."""
+        db_table = 'certificate_jobs'
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        """Readable identifier with student and status."""
+        return f"Certificate job {self.pk} - {self.student_id} ({self.status})"
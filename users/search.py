@@ -0,0 +1,119 @@
+"""Indexed user search for the administrator user list.
+
+Includes:
+- search_users: filter users by username, DNI, first/last name or email and rank them.
+- create_search_indexes: post_migrate receiver creating the indexes the search relies on.
+
+Rules:
+    - The search text is split into words; every word must match one of the
+      fields. Matching is case-insensitive.
+    - rank 0: the whole text is the username, DNI or email; rank 1: some field
+      starts with the whole text; rank 2: any other match. Results are ordered
+      by (rank, id), so they can be keyset-paginated.
+
+Notes:
+    - PostgreSQL matches words anywhere in a field (icontains) through pg_trgm GIN
+      indexes on UPPER(field), the expression Django's icontains compares.
+    - Other databases match word prefixes only, as a range on LOWER(field)
+      (LOWER(field) >= word AND LOWER(field) < next word) that an expression
+      index on LOWER(field) answers with a seek; DNI prefixes use the unique
+      index on dni. SQLite's LOWER folds ASCII letters only.
+    - The indexes depend on the database, so they are created after migrate
+      (CREATE ... IF NOT EXISTS) instead of being declared in CustomUser.Meta.
+"""
+
+import logging
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+
+from users.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ("username", "dni", "first_name", "last_name", "email")
+
+
+def _prefix(column, word):
+    """Q matching rows whose `column` expression starts with `word`, as an indexable range."""
+    upper_bound = word[:-1] + chr(ord(word[-1]) + 1)
+    return Q(GreaterThanOrEqual(column, word), LessThan(column, upper_bound))
+
+
+def _word_matches(word, vendor):
+    """Q matching rows where one of the SEARCH_FIELDS contains (PostgreSQL) or starts with `word`."""
+    matches = Q()
+    for field in SEARCH_FIELDS:
+        if vendor == "postgresql":
+            matches |= Q(**{f"{field}__icontains": word})
+        else:
+            # DNIs are compared as stored, so the unique index on dni serves them.
+            matches |= _prefix(F(field), word) if field == "dni" else _prefix(Lower(field), word.lower())
+    return matches
+
+
+def search_users(queryset, text):
+    """
+    Narrow `queryset` to the users matching `text` and annotate their rank.
+
+    Args:
+        queryset (QuerySet[CustomUser]): Users to search, possibly filtered already.
+        text (str): Search text, one or more words.
+
+    Returns:
+        QuerySet[CustomUser]: Matching users with a `rank` annotation (0 best);
+        order it by ("rank", "id").
+    """
+    words = text.split()
+    if not words:
+        return queryset.annotate(rank=Value(2, output_field=IntegerField()))
+    vendor = connections[queryset.db].vendor
+    for word in words:
+        queryset = queryset.filter(_word_matches(word, vendor))
+    text = " ".join(words)
+    exact = Q(dni=text) | Q(username__iexact=text) | Q(email__iexact=text)
+    prefix = Q()
+    for field in SEARCH_FIELDS:
+        prefix |= Q(**{f"{field}__istartswith": text})
+    return queryset.annotate(rank=Case(
+        When(exact, then=Value(0)), When(prefix, then=Value(1)), default=Value(2), output_field=IntegerField(),
+    ))
+
+
+def _index_statements(connection):
+    """CREATE statements of the search indexes for `connection`'s database."""
+    qn = connection.ops.quote_name
+    table = qn(CustomUser._meta.db_table)
+    statements = []
+    if connection.vendor == "postgresql":
+        statements.append("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in SEARCH_FIELDS:
+        column = qn(CustomUser._meta.get_field(field).column)
+        if connection.vendor == "postgresql":
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {qn(f'users_{field}_trgm_idx')} "
+                f"ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)"
+            )
+        elif field != "dni":
+            statements.append(f"CREATE INDEX IF NOT EXISTS {qn(f'users_{field}_lower_idx')} ON {table} (LOWER({column}))")
+    return statements
+
+
+def create_search_indexes(sender, using="default", **kwargs):
+    """
+    Create the user search indexes, once the users table exists (post_migrate).
+
+    A database refusing an index (e.g. pg_trgm not installable by the migrating
+    role) is logged: search keeps working, with sequential scans.
+    """
+    connection = connections[using]
+    if CustomUser._meta.db_table not in connection.introspection.table_names():
+        return
+    for statement in _index_statements(connection):
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute(statement)
+        except DatabaseError as exc:
+            logger.warning("User search index not created (%s): %s", exc, statement)
@@ -0,0 +1,227 @@
+"""Read-side services for the Users app.
+
+Includes:
+- StudentAcademicSnapshot: everything the student dashboard shows, loaded in
+  three queries (plus one when the career's correlative index is not cached).
+- dashboard_cache_versions / invalidate_student_dashboards / invalidate_career_dashboards:
+  version tokens for the cached dashboard fragments (see users.signals).
+- eligible_finals_cache_key: per-student, per-day key of the precomputed eligible finals.
+- professor_authorization / invalidate_professor_authorization: cached sets of the
+  subjects and final exams assigned to a professor (see users.signals).
+
+Notes:
+    - Membership data (inscribed subject codes, inscribed final ids) is returned as
+      sets so templates test `in` in constant time.
+    - Related objects used by the dashboard template are loaded with
+      select_related, so rendering issues no further queries.
+    - Dashboard fragments are cached under the student's and the career's version
+      tokens. Invalidation replaces a token instead of deleting fragments, so stale
+      entries simply stop being read and expire on their own.
+"""
+
+import uuid
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from academics.correlatives import correlative_index
+from academics.models import FinalExam, Grade, Subject
+from inscriptions.models import FinalExamInscription, SubjectInscription
+
+
+class StudentAcademicSnapshot:
+    """
+    Subjects, grades, and finals of one student, as shown on the dashboard.
+
+    Queries:
+        1. Career subjects plus any subject the student is inscribed in, annotated
+           with the inscription flag.
+        2. Grades with their subject.
+        3. Upcoming finals of REGULAR subjects (within
+           settings.ELIGIBLE_FINALS_LOOKAHEAD_DAYS) plus upcoming finals the student
+           is inscribed in, with their subject and the inscription flag. The eligible
+           final ids are cached per student and day (eligible_finals_cache_key), so
+           later snapshots look them up by primary key.
+
+    Correlatives are checked in memory against the career's cached
+    CorrelativeIndex (academics.correlatives) and the grades of query 2.
+
+    Attributes:
+        subjects (list[Subject]): Subjects of the student's career.
+        inscribed_subjects (list[Subject]): Subjects the student is inscribed in.
+        inscribed_subject_codes (set[str]): Codes of `inscribed_subjects`.
+        grades (list[Grade]): Grades with `subject` loaded.
+        regular_subject_ids (set[str]): Subjects where the student is REGULAR.
+        enrollable_subject_codes (set[str]): Career subjects whose correlatives are met.
+        finals_window (tuple[date, date]): First and last date of eligible finals.
+        eligible_finals (list[FinalExam]): Finals of REGULAR subjects in the window whose
+            correlatives are promoted, by date.
+        inscribed_finals (list[FinalExam]): Upcoming finals the student is inscribed in, by date.
+        inscribed_final_ids (set[int]): Ids of `inscribed_finals`.
+    """
+
+    def __init__(self, student):
+        self.student = student
+        self._load_subjects()
+        self._load_grades()
+        self._load_finals()
+
+    def _load_subjects(self):
+        student = self.student
+        subjects = list(
+            Subject.objects.annotate(
+                inscribed=Exists(
+                    SubjectInscription.objects.filter(student=student, subject=OuterRef("pk"))
+                )
+            )
+            .filter(Q(career_id=student.career_id) | Q(inscribed=True))
+            .order_by("year", "name")
+        )
+        self.subjects = [s for s in subjects if s.career_id == student.career_id]
+        self.inscribed_subjects = [s for s in subjects if s.inscribed]
+        self.inscribed_subject_codes = {s.code for s in self.inscribed_subjects}
+
+    def _load_grades(self):
+        self.grades = list(Grade.objects.filter(student=self.student).select_related("subject"))
+        self.regular_subject_ids = {
+            g.subject_id for g in self.grades if g.status == Grade.StatusSubject.REGULAR
+        }
+        self.correlatives = correlative_index(self.student.career_id)
+        self.standing = self.correlatives.standing(
+            (g.subject_id, g.status) for g in self.grades if not g.is_inscription_placeholder
+        )
+        self.enrollable_subject_codes = {
+            s.code for s in self.subjects if not self.correlatives.missing(s.code, self.standing)
+        }
+
+    def _load_finals(self):
+        today = timezone.localdate()
+        self.finals_window = (today, today + timedelta(days=settings.ELIGIBLE_FINALS_LOOKAHEAD_DAYS))
+        cache_key = eligible_finals_cache_key(self.student, today)
+        eligible_ids = cache.get(cache_key)
+        if eligible_ids is None:
+            eligible = Q(subject_id__in=self.regular_subject_ids, date__range=self.finals_window)
+        else:
+            eligible = Q(pk__in=eligible_ids)
+        finals = list(
+            FinalExam.objects.annotate(
+                inscribed=Exists(
+                    FinalExamInscription.objects.filter(student=self.student, final_exam=OuterRef("pk"))
+                )
+            )
+            .filter(eligible | Q(inscribed=True, date__gte=today))
+            .select_related("subject")
+            .order_by("date", "call_number")
+        )
+        start, end = self.finals_window
+        eligible_finals = [
+            fe for fe in finals if fe.subject_id in self.regular_subject_ids and start <= fe.date <= end
+        ]
+        self.inscribed_finals = [fe for fe in finals if fe.inscribed]
+        self.inscribed_final_ids = {fe.id for fe in self.inscribed_finals}
+        if eligible_ids is None:
+            cache.set(cache_key, [fe.id for fe in eligible_finals], timeout=86400)
+        # Applied after caching: correlative changes do not rotate the student's key.
+        self.eligible_finals = [
+            fe for fe in eligible_finals
+            if not self.correlatives.missing(fe.subject_id, self.standing, for_final=True)
+        ]
+
+
+def _student_version_key(student_id):
+    return f"dashboard:student:{student_id}"
+
+
+def _career_version_key(career_id):
+    return f"dashboard:career:{career_id}"
+
+
+def dashboard_cache_versions(student):
+    """
+    Return the version tokens the student's dashboard fragments are cached under.
+
+    Missing tokens (first visit, evicted entries) are created, so a fragment
+    cached before an eviction is never served again.
+
+    Args:
+        student (users.Student): Dashboard owner.
+
+    Returns:
+        tuple[str, str]: Student and career version tokens.
+    """
+    keys = [_student_version_key(student.pk), _career_version_key(student.career_id)]
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+
+def invalidate_student_dashboards(student_ids):
+    """Expire the cached dashboard fragments of the given students."""
+    cache.set_many({_student_version_key(pk): uuid.uuid4().hex for pk in set(student_ids)}, timeout=None)
+
+
+def invalidate_career_dashboards(career_ids):
+    """Expire the cached dashboard fragments of every student in the given careers."""
+    cache.set_many({_career_version_key(pk): uuid.uuid4().hex for pk in set(career_ids)}, timeout=None)
+
+
+def eligible_finals_cache_key(student, today):
+    """
+    Return the cache key of the student's eligible final ids for `today`.
+
+    The key embeds the student's dashboard version token, so the list is rebuilt
+    whenever a grade or a relevant final changes (users.signals), and the date,
+    so the window moves forward every day.
+    """
+    student_version, _ = dashboard_cache_versions(student)
+    return f"eligible-finals:{student.pk}:{student_version}:{today.isoformat()}"
+
+
+class ProfessorAuthorization(NamedTuple):
+    """Subjects and final exams a professor may manage."""
+    subject_codes: frozenset
+    final_exam_ids: frozenset
+
+
+def _professor_authorization_key(professor_id):
+    return f"professor-authz:{professor_id}"
+
+
+def professor_authorization(professor):
+    """
+    Return the cached assignments of `professor` for O(1) permission checks.
+
+    Built with two queries on a cache miss and kept for
+    PROFESSOR_AUTHORIZATION_CACHE_TIMEOUT seconds, or until an assignment of the
+    professor changes or an assigned subject or final is deleted (users.signals).
+    The expiry bounds how long a process with a stale local cache keeps old
+    permissions; the invalidation only reaches other processes through a shared
+    cache backend.
+
+    Args:
+        professor (users.Professor): Professor to authorize.
+
+    Returns:
+        ProfessorAuthorization: Assigned subject codes and final exam ids.
+    """
+    key = _professor_authorization_key(professor.pk)
+    authorization = cache.get(key)
+    if authorization is None:
+        authorization = ProfessorAuthorization(
+            frozenset(professor.subjects.values_list("code", flat=True)),
+            frozenset(professor.final_exams.values_list("pk", flat=True)),
+        )
+        cache.set(key, authorization, timeout=settings.PROFESSOR_AUTHORIZATION_CACHE_TIMEOUT)
+    return authorization
+
+
+def invalidate_professor_authorization(professor_ids):
+    """Drop the cached assignments of the given professors."""
+    cache.delete_many([_professor_authorization_key(pk) for pk in set(professor_ids)])
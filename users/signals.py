@@ -0,0 +1,116 @@
+"""Signal receivers keeping the cached student dashboards fresh.
+
+Includes:
+- Grade, SubjectInscription and FinalExamInscription changes expire the owning
+  student's dashboard.
+- Subject changes expire the dashboards of the subject's career and of students
+  inscribed in or graded on it from other careers.
+- FinalExam changes expire the dashboards of students graded on its subject or
+  inscribed in the exam.
+- Correlative changes expire the dashboards of the subject's career.
+- Professor.subjects / Professor.final_exams changes (either side of the relation),
+  and deleting a Subject or FinalExam, drop the cached professor authorization.
+- grades_bulk_changed / inscriptions_bulk_changed expire the listed students' dashboards.
+
+Notes:
+    - Receivers are connected in UsersConfig.ready().
+    - QuerySet.update()/bulk_create() do not send post_save; code using them sends
+      grades_bulk_changed or inscriptions_bulk_changed instead.
+    - Deleting a Subject or FinalExam removes its professor assignments without
+      m2m_changed; the professors are collected in pre_delete, while the rows exist.
+"""
+
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from academics.models import Correlative, FinalExam, Grade, Subject
+from academics.signals import grades_bulk_changed
+from inscriptions.models import FinalExamInscription, SubjectInscription
+from inscriptions.signals import inscriptions_bulk_changed
+from users.models import Professor, Student
+from users.services import (
+    invalidate_career_dashboards,
+    invalidate_professor_authorization,
+    invalidate_student_dashboards,
+)
+
+
+@receiver([post_save, post_delete], sender=Grade)
+@receiver([post_save, post_delete], sender=SubjectInscription)
+@receiver([post_save, post_delete], sender=FinalExamInscription)
+def expire_student_dashboard(sender, instance, **kwargs):
+    """Expire the dashboard of the student owning `instance`."""
+    invalidate_student_dashboards([instance.student_id])
+
+
+@receiver(grades_bulk_changed)
+@receiver(inscriptions_bulk_changed)
+def expire_bulk_changed_dashboards(sender, student_ids, **kwargs):
+    """Expire the dashboards of students whose rows were written without post_save."""
+    invalidate_student_dashboards(student_ids)
+
+
+@receiver([post_save, post_delete], sender=Subject)
+def expire_subject_dashboards(sender, instance, **kwargs):
+    """Expire the dashboards showing `instance`."""
+    invalidate_career_dashboards([instance.career_id])
+    outside_career = (
+        Student.objects.filter(Q(subjects_inscriptions__subject=instance) | Q(grades__subject=instance))
+        .exclude(career_id=instance.career_id)
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    invalidate_student_dashboards(outside_career)
+
+
+@receiver([post_save, post_delete], sender=FinalExam)
+def expire_final_exam_dashboards(sender, instance, **kwargs):
+    """Expire the dashboards that list `instance` as eligible or inscribed."""
+    affected = (
+        Student.objects.filter(
+            Q(grades__subject_id=instance.subject_id) | Q(final_exam_inscriptions__final_exam_id=instance.pk)
+        )
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    invalidate_student_dashboards(affected)
+
+
+@receiver([post_save, post_delete], sender=Correlative)
+def expire_correlative_dashboards(sender, instance, **kwargs):
+    """Expire the dashboards marking which subjects of the career are enrollable."""
+    invalidate_career_dashboards(
+        Subject.objects.filter(pk=instance.subject_id).values_list("career_id", flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Professor.subjects.through)
+@receiver(m2m_changed, sender=Professor.final_exams.through)
+def expire_professor_authorization(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop the cached assignments of every professor whose subjects or finals changed."""
+    if not reverse:
+        if action.startswith("post_"):
+            invalidate_professor_authorization([instance.pk])
+        return
+    # instance is a Subject or FinalExam; pk_set holds professor ids, except for clear().
+    if action == "pre_clear":
+        instance._cleared_professor_ids = list(instance.professors.values_list("pk", flat=True))
+    elif action == "post_clear":
+        invalidate_professor_authorization(getattr(instance, "_cleared_professor_ids", []))
+    elif action in ("post_add", "post_remove"):
+        invalidate_professor_authorization(pk_set)
+
+
+@receiver(pre_delete, sender=Subject)
+@receiver(pre_delete, sender=FinalExam)
+def collect_assigned_professors(sender, instance, **kwargs):
+    """Remember the professors of `instance` before its assignments are deleted with it."""
+    instance._deleted_professor_ids = list(instance.professors.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Subject)
+@receiver(post_delete, sender=FinalExam)
+def expire_deleted_assignments(sender, instance, **kwargs):
+    """Drop the cached assignments of the professors of a deleted subject or final."""
+    invalidate_professor_authorization(getattr(instance, "_deleted_professor_ids", []))
@@ -1,13 +1,39 @@
+import itertools
+import json
+import logging
+import os
+import shutil
+import threading
+import tracemalloc
+import zipfile
 from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest.mock import patch
 from tempfile import TemporaryDirectory
 
-from django.test import TestCase, override_settings
-from django.urls import reverse
-
-from academics.models import Career, Faculty, FinalExam, Grade, Subject
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
+
+from academics.correlatives import correlative_index
+from academics.models import Career, Correlative, Faculty, FinalExam, Grade, Subject
 from inscriptions.models import FinalExamInscription, SubjectInscription
-from users.models import Administrator, CustomUser, Professor, Student
+from main import timing
+from main.middleware import RepeatedQueryError, RepeatedQueryMiddleware, ServerTimingMiddleware, query_shape
+from users import certificates
+from users.certificates import CertificateStore, CertificateTemplateCache
+from users.certificate_jobs import claim_next_job, enqueue_certificate, work
+from users.models import Administrator, CertificateJob, CustomUser, Professor, Student
+from users import services
+from users.services import StudentAcademicSnapshot
 
 
 class CustomUserModelTest(TestCase):
@@ -178,6 +204,43 @@ class AdminViewsTests(TestCase):
     def setUp(self):
         self.admin = make_admin()
 
+    def test_inscription_admission_stats(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("users:inscription-admission"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["queue_depth"], 0)
+        self.assertEqual(resp.json()["limit"], settings.INSCRIPTION_MAX_IN_FLIGHT)
+
+    def test_enrollment_import_upload(self):
+        _, student = make_student()
+        subject = make_subject(career=student.career)
+        self.client.force_login(self.admin)
+        url = reverse("users:enrollment-import")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        def upload(**data):
+            csv_file = BytesIO(f"{student.pk},{subject.code}\nS-0,{subject.code}\n".encode())
+            csv_file.name = "inscripciones.csv"
+            return self.client.post(url, {"file": csv_file, **data})
+
+        resp = upload()
+        self.assertContains(resp, "Estudiante inexistente.")
+        self.assertTrue(SubjectInscription.objects.filter(student=student, subject=subject).exists())
+        self.assertTrue(Grade.objects.filter(student=student, subject=subject).exists())
+
+        resp = upload(error_report="on")
+        self.assertEqual(resp["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(resp.content.decode().splitlines()[1], "2,S-0,MAT101,Estudiante inexistente.")
+        # The totals belong to the page that was not shown; they must not wait for the next one.
+        self.assertNotContains(self.client.get(url), "Se leyeron")
+
+        SubjectInscription.objects.all().delete()
+        latin1 = BytesIO(f"{student.pk},{subject.code}\n".encode() + "S-1,Física\n".encode("latin-1"))
+        latin1.name = "inscripciones.csv"
+        resp = self.client.post(url, {"file": latin1})
+        self.assertContains(resp, "El archivo debe estar codificado en UTF-8.")
+        self.assertFalse(SubjectInscription.objects.exists())  # the valid first row was not written either
+
     def test_admin_dashboard_requires_admin(self):
         # Unauthenticated -> redirect to login
         resp = self.client.get(reverse("users:admin-dashboard"))
@@ -194,6 +257,88 @@ class AdminViewsTests(TestCase):
         resp = self.client.get(reverse("users:user-list"))
         self.assertEqual(resp.status_code, 200)
 
+    @override_settings(ADMIN_LIST_PAGE_SIZE=2)
+    def test_user_list_keyset_pages_and_filters(self):
+        career = make_career()
+        students = [make_student(f"stud{i}", f"2000000{i}", career)[0] for i in range(5)]
+        make_professor()
+        self.client.force_login(self.admin)
+        url = reverse("users:user-list")
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            with self.assertNumQueries(4):  # session, user, one page, careers of the filter form
+                resp = self.client.get(url, {"role": CustomUser.Role.STUDENT, **({"cursor": cursor} if cursor else {})})
+            page = resp.context["page"]
+            seen += [u.pk for u in page]
+            pages += 1
+            if not page.next_cursor:
+                break
+            cursor = page.next_cursor
+            self.assertIn(f"cursor={cursor}", resp.content.decode())
+            self.assertIn("role=student", resp.content.decode())  # filters kept in the pager links
+        self.assertEqual(seen, [u.pk for u in students])
+        self.assertEqual(pages, 3)
+
+        # Walking back returns the previous page in list order.
+        back = self.client.get(url, {"role": CustomUser.Role.STUDENT, "cursor": page.previous_cursor}).context["page"]
+        self.assertEqual([u.pk for u in back], [u.pk for u in students[2:4]])
+        self.assertIsNotNone(back.previous_cursor)
+
+        # Unknown filter values and cursors fall back to the unfiltered first page.
+        resp = self.client.get(url, {"career": "NOPE", "cursor": "garbage"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNone(resp.context["page"].previous_cursor)
+        self.assertTrue(resp.context["filters"].errors)
+
+    @override_settings(ADMIN_LIST_PAGE_SIZE=2)
+    def test_user_list_search_ranks_and_pages(self):
+        career = make_career()
+        people = [("perez", "Ana", "Pérez"), ("aperla", "Perla", "Gómez"), ("jperezz", "Juan", "Perezz"),
+                  ("lopez", "Pedro", "López"), ("mperez", "María", "Perezoso")]
+        users = {}
+        for i, (username, first, last) in enumerate(people):
+            users[username] = make_student(username, f"3000000{i}", career)[0]
+            CustomUser.objects.filter(pk=users[username].pk).update(first_name=first, last_name=last,
+                                                                    email=f"{username}@example.com")
+        self.client.force_login(self.admin)
+        url = reverse("users:user-list")
+
+        def search(q, cursor=None):
+            page = self.client.get(url, {"q": q, **({"cursor": cursor} if cursor else {})}).context["page"]
+            return page, [u.username for u in page]
+
+        # Exact username first, then names starting with the text; case does not matter.
+        page, found = search("PEREZ")
+        self.assertEqual(found, ["perez", "jperezz"])
+        page, found = search("PEREZ", page.next_cursor)
+        self.assertEqual(found, ["mperez"])
+        self.assertIsNone(page.next_cursor)
+        self.assertEqual(search("PEREZ", page.previous_cursor)[1], ["perez", "jperezz"])
+        _, found = search("per")
+        self.assertEqual(found, ["perez", "aperla"])  # "perez" and "Perla" both start with "per"
+        # DNI prefix, every word must match some field, no match.
+        self.assertEqual(search("3000000")[1], ["perez", "aperla"])
+        self.assertEqual(search("juan perezz")[1], ["jperezz"])
+        self.assertEqual(search("pedro perez")[1], [])
+        # Other filters still apply.
+        resp = self.client.get(url, {"q": "lopez", "role": CustomUser.Role.PROFESSOR})
+        self.assertEqual(list(resp.context["page"]), [])
+
+    def test_subject_and_final_lists_filter_by_career_and_year(self):
+        career = make_career()
+        subjects = [make_subject(f"Y{year}", career) for year in (1, 2)]
+        Subject.objects.filter(code="Y2").update(year=2)
+        make_subject("OTHER", make_career("MED", career.faculty))
+        for subject in subjects:
+            FinalExam.objects.create(subject=subject, date=date.today(), location="Aula", duration=timedelta(hours=2),
+                                     call_number=1)
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("users:subject-list"), {"career": career.code, "year": 2})
+        self.assertEqual([s.code for s in resp.context["subjects"]], ["Y2"])
+        resp = self.client.get(reverse("users:final-list"), {"career": career.code, "year": 1})
+        self.assertEqual([f.subject_id for f in resp.context["finals"]], ["Y1"])
+
     def test_user_create_admin_role(self):
         self.client.force_login(self.admin)
         payload = {
@@ -354,8 +499,12 @@ class AdminViewsTests(TestCase):
 
 class StudentViewsTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.student_user, self.student = make_student()
         self.subject = make_subject(career=self.student.career)
+        store_dir = TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        self.enterContext(override_settings(CERTIFICATE_STORE_DIR=Path(store_dir.name)))
 
     def test_student_dashboard_requires_profile(self):
         # User without profile
@@ -384,6 +533,53 @@ class StudentViewsTests(TestCase):
         resp = self.client.post(reverse("users:subject-inscribe", args=[self.subject.code]))
         self.assertEqual(resp.status_code, 302)
 
+    def test_subjects_batch_inscribe(self):
+        other_career = make_career(code="OTR", faculty=self.student.career.faculty)
+        second = make_subject(code="MAT102", career=self.student.career)
+        foreign = make_subject(code="OTR101", career=other_career)
+        self.client.force_login(self.student_user)
+        url = reverse("users:subjects-batch-inscribe")
+
+        dashboard = self.client.get(reverse("users:student-dashboard"))
+        self.assertContains(dashboard, 'form="batch-inscribe"', count=2)
+
+        # A subject from another career invalidates the whole selection.
+        self.client.post(url, {"subjects": [self.subject.code, foreign.code]})
+        self.assertFalse(SubjectInscription.objects.exists())
+
+        resp = self.client.post(url, {"subjects": [self.subject.code, second.code]})
+        self.assertRedirects(resp, reverse("users:student-dashboard"), fetch_redirect_response=False)
+        self.assertEqual(SubjectInscription.objects.filter(student=self.student).count(), 2)
+        self.assertEqual(Grade.objects.filter(student=self.student).count(), 2)
+        # The cached dashboard fragment was expired by the bulk signals.
+        dashboard = self.client.get(reverse("users:student-dashboard"))
+        self.assertNotContains(dashboard, 'form="batch-inscribe"')
+
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_correlatives_block_inscription(self):
+        second = make_subject(code="MAT201", career=self.student.career)
+        Correlative.objects.create(subject=second, required_subject=self.subject)
+        self.client.force_login(self.student_user)
+
+        dashboard = self.client.get(reverse("users:student-dashboard"))
+        self.assertContains(dashboard, "Correlativas pendientes", count=1)
+        resp = self.client.post(reverse("users:subject-inscribe", args=[second.code]))
+        self.assertRedirects(resp, reverse("users:student-dashboard"), fetch_redirect_response=False)
+        self.assertFalse(SubjectInscription.objects.filter(subject=second).exists())
+        self.client.post(reverse("users:subjects-batch-inscribe"), {"subjects": [second.code]})
+        self.assertFalse(SubjectInscription.objects.filter(subject=second).exists())
+
+        # Being inscribed in the prerequisite is not enough; its regularity must be recorded.
+        self.client.post(reverse("users:subject-inscribe", args=[self.subject.code]))
+        self.assertContains(self.client.get(reverse("users:student-dashboard")), "Correlativas pendientes", count=1)
+        grade = Grade.objects.get(student=self.student, subject=self.subject)
+        grade.promotion_grade = Decimal("7")
+        grade.save()
+        self.assertNotContains(self.client.get(reverse("users:student-dashboard")), "Correlativas pendientes")
+        self.client.post(reverse("users:subjects-batch-inscribe"), {"subjects": [second.code]})
+        self.assertTrue(SubjectInscription.objects.filter(subject=second).exists())
+
     def test_final_exam_inscribe_requires_regular(self):
         self.client.force_login(self.student_user)
         final = FinalExam.objects.create(
@@ -399,7 +595,7 @@ class StudentViewsTests(TestCase):
         self.assertEqual(resp["Location"], reverse("users:student-dashboard"))
 
         # Make regular and POST
-        Grade.objects.create(student=self.student, subject=self.subject, status=Grade.StatusSubject.REGULAR)
+        Grade.objects.create(student=self.student, subject=self.subject, status_override=Grade.StatusSubject.REGULAR)
         resp = self.client.post(reverse("users:final-inscribe", args=[final.id]))
         self.assertEqual(resp.status_code, 302)
         self.assertTrue(FinalExamInscription.objects.filter(student=self.student, final_exam=final).exists())
@@ -433,21 +629,14 @@ class StudentViewsTests(TestCase):
                 self.assertEqual(resp.status_code, 302)
                 self.assertEqual(resp["Location"], reverse("users:student-dashboard"))
 
-    @patch("users.views.DocxTemplate")
-    def test_download_certificate_success_returns_docx(self, mock_tpl_cls):
-        # Mock DocxTemplate to avoid real file IO and docx processing
-        class FakeTpl:
-            def __init__(self, *_args, **_kwargs):
-                pass
-
-            def render(self, _context):
-                return None
+    @patch("users.certificates.render_certificate")
+    def test_download_certificate_success_returns_docx(self, mock_render):
+        # Mock the cached renderer to avoid real file IO and docx processing
+        def fake_render(_template_path, _context, dest):
+            # Write some bytes to the provided BytesIO
+            dest.write(b"PK\x03\x04fake-docx-content")
 
-            def save(self, dest):
-                # Write some bytes to the provided BytesIO
-                dest.write(b"PK\x03\x04fake-docx-content")
-
-        mock_tpl_cls.return_value = FakeTpl()
+        mock_render.side_effect = fake_render
 
         # Ensure logged in as valid student
         self.client.force_login(self.student_user)
@@ -464,11 +653,175 @@ class StudentViewsTests(TestCase):
             or "attachment; filename=\"certificado-regular-stud-" in content_disp
         )
         self.assertTrue(ok)
-        self.assertTrue(len(resp.content) > 0)
+        self.assertTrue(len(b"".join(resp.streaming_content)) > 0)
+
+    @patch("users.certificates.render_certificate", wraps=certificates.render_certificate)
+    def test_download_certificate_is_stored_and_revalidated(self, mock_render):
+        self.client.force_login(self.student_user)
+        url = reverse("users:student-regular-certificate")
+        first = self.client.get(url)
+        body = b"".join(first.streaming_content)
+        etag = first["ETag"]
+        self.assertIn("private", first["Cache-Control"])
+
+        # Repeat download is served from the store without rendering again
+        second = self.client.get(url)
+        self.assertEqual(second["ETag"], etag)
+        self.assertEqual(b"".join(second.streaming_content), body)
+        self.assertEqual(mock_render.call_count, 1)
+
+        # Conditional request for an unchanged document -> 304
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(mock_render.call_count, 1)
+
+        # Changed student data -> new content key
+        self.student_user.first_name = "Otro"
+        self.student_user.save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(mock_render.call_count, 2)
+
+    def test_download_certificate_with_x_accel_redirect(self):
+        self.client.force_login(self.student_user)
+        with override_settings(
+            CERTIFICATE_SENDFILE_HEADER="X-Accel-Redirect", CERTIFICATE_SENDFILE_PREFIX="/protected/certificates/"
+        ):
+            resp = self.client.get(reverse("users:student-regular-certificate"))
+        self.assertEqual(resp.status_code, 200)
+        location = resp["X-Accel-Redirect"]
+        self.assertTrue(location.startswith("/protected/certificates/"))
+        self.assertTrue(location.endswith(resp["ETag"].strip('"') + ".docx"))
+        self.assertEqual(resp.content, b"")
+
+
+class StudentAcademicSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student_user, self.student = make_student()
+        career = self.student.career
+        self.regular = make_subject(code="MAT101", career=career)
+        self.free = make_subject(code="FIS101", career=career)
+        self.other = make_subject(code="ECO101", career=make_career(code="ECO", faculty=career.faculty))
+        # Inscriptions create REGULAR grades; the other career's subject is marked FREE.
+        SubjectInscription.objects.create(student=self.student, subject=self.regular)
+        SubjectInscription.objects.create(student=self.student, subject=self.other)
+        Grade.objects.filter(subject=self.other).update(status_override=Grade.StatusSubject.FREE)
+        Grade.objects.create(student=self.student, subject=self.free, status_override=Grade.StatusSubject.FREE)
+        today = date.today()
+        self.finals = [
+            FinalExam.objects.create(
+                subject=subject, date=today + timedelta(days=days), location="Aula 1", duration=timedelta(hours=2),
+                call_number=1,
+            )
+            for days, subject in enumerate([self.regular, self.regular, self.free, self.other], start=1)
+        ]
+        FinalExamInscription.objects.create(student=self.student, final_exam=self.finals[1])
+        FinalExamInscription.objects.create(student=self.student, final_exam=self.finals[3])
+
+    def test_snapshot_contents_in_three_queries(self):
+        correlative_index(self.student.career_id)  # cached index, built once per career
+        with self.assertNumQueries(3):
+            snapshot = StudentAcademicSnapshot(self.student)
+            # Related objects used by the template are already loaded.
+            [fe.subject.name for fe in snapshot.eligible_finals + snapshot.inscribed_finals]
+            [g.subject.name for g in snapshot.grades]
+
+        self.assertEqual({s.code for s in snapshot.subjects}, {"MAT101", "FIS101"})
+        self.assertEqual(snapshot.inscribed_subject_codes, {"MAT101", "ECO101"})
+        self.assertEqual(snapshot.regular_subject_ids, {"MAT101"})
+        self.assertEqual(snapshot.eligible_finals, self.finals[:2])
+        self.assertEqual(snapshot.inscribed_finals, [self.finals[1], self.finals[3]])
+        self.assertEqual(snapshot.inscribed_final_ids, {self.finals[1].id, self.finals[3].id})
+
+    @override_settings(ELIGIBLE_FINALS_LOOKAHEAD_DAYS=30)
+    def test_eligible_finals_window_and_precomputed_list(self):
+        today = date.today()
+        for days in (-1, 31):  # already taken, beyond the look-ahead
+            FinalExam.objects.create(
+                subject=self.regular, date=today + timedelta(days=days), location="Aula 2",
+                duration=timedelta(hours=2), call_number=2,
+            )
+        snapshot = StudentAcademicSnapshot(self.student)
+        self.assertEqual(snapshot.eligible_finals, self.finals[:2])
+        self.assertEqual(snapshot.finals_window, (today, today + timedelta(days=30)))
+        self.assertEqual(
+            cache.get(services.eligible_finals_cache_key(self.student, today)), [f.id for f in self.finals[:2]]
+        )
+
+        # The cached ids are used until a grade changes.
+        with self.assertNumQueries(3):
+            self.assertEqual(StudentAcademicSnapshot(self.student).eligible_finals, self.finals[:2])
+        grade = Grade.objects.get(subject=self.regular)
+        grade.final_grade = 9
+        grade.update_status()
+        self.assertEqual(StudentAcademicSnapshot(self.student).eligible_finals, [])
+
+    def test_dashboard_query_budget(self):
+        self.client.force_login(self.student_user)
+        correlative_index(self.student.career_id)
+        # Session, user and student lookups plus the three snapshot queries.
+        with self.assertNumQueries(6):
+            resp = self.client.get(reverse("users:student-dashboard"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Inscripto", count=4)
+
+
+class StudentDashboardCacheTests(TestCase):
+    url = reverse_lazy("users:student-dashboard")
+
+    def setUp(self):
+        cache.clear()
+        self.student_user, self.student = make_student()
+        self.other_user, self.other = make_student(username="stud2", dni="10000009", career=self.student.career)
+        self.subject = make_subject(career=self.student.career)
+        self.client.force_login(self.student_user)
+        self.other_client = self.client_class()
+        self.other_client.force_login(self.other_user)
+        # Warm both dashboards.
+        self.client.get(self.url)
+        self.other_client.get(self.url)
+
+    def test_repeat_visit_skips_academic_queries(self):
+        with self.assertNumQueries(3):
+            resp = self.client.get(self.url)
+        self.assertContains(resp, "Matemática")
+
+    def test_grade_change_expires_only_its_student(self):
+        Grade.objects.create(student=self.student, subject=self.subject, final_grade=5)
+        with self.assertNumQueries(6):
+            resp = self.client.get(self.url)
+        self.assertContains(resp, "Regular")
+        with self.assertNumQueries(3):
+            self.other_client.get(self.url)
+
+    def test_subject_change_expires_career(self):
+        self.subject.name = "Álgebra"
+        self.subject.save()
+        self.assertContains(self.client.get(self.url), "Álgebra")
+        self.assertContains(self.other_client.get(self.url), "Álgebra")
+
+    def test_new_final_expires_regular_students(self):
+        Grade.objects.create(student=self.student, subject=self.subject, status_override=Grade.StatusSubject.REGULAR)
+        self.client.get(self.url)
+        FinalExam.objects.create(
+            subject=self.subject, date=date.today() + timedelta(days=30), location="Aula 9",
+            duration=timedelta(hours=2), call_number=3,
+        )
+        self.assertContains(self.client.get(self.url), "Llamado 3")
+        with self.assertNumQueries(3):
+            self.other_client.get(self.url)
+
+    def test_new_csrf_secret_rerenders_fragment(self):
+        del self.client.cookies[settings.CSRF_COOKIE_NAME]
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
 
 
 class ProfessorViewsTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.prof_user, self.prof = make_professor()
         self.student_user, self.student = make_student(dni="12223334")
         self.subject = make_subject(career=self.student.career)
@@ -487,18 +840,124 @@ class ProfessorViewsTests(TestCase):
         self.assertEqual(resp.status_code, 302)
         self.assertEqual(resp["Location"], reverse("home"))
 
-    def test_grade_list_creates_missing_grades(self):
+    def test_grade_list_is_read_only(self):
         SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        # Grade is created with the inscription
+        self.assertTrue(Grade.objects.filter(student=self.student, subject=self.subject).exists())
         self.client.force_login(self.prof_user)
-        resp = self.client.get(reverse("users:grade-list", args=[self.subject.code]))
+        self.client.get(reverse("users:grade-list", args=[self.subject.code]))
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("users:grade-list", args=[self.subject.code]))
         self.assertEqual(resp.status_code, 200)
-        # Grade should be auto-created
-        self.assertTrue(Grade.objects.filter(student=self.student, subject=self.subject).exists())
+        self.assertEqual([g.student_id for g in resp.context["grades"]], [self.student.pk])
+        self.assertFalse([q for q in queries if not q["sql"].lstrip().upper().startswith("SELECT")])
+
+    def test_grade_grid_saves_changed_rows_in_one_update(self):
+        career = self.student.career
+        students = [self.student] + [make_student(f"grid{i}", f"3000000{i}", career)[1] for i in range(3)]
+        for student in students:
+            SubjectInscription.objects.create(student=student, subject=self.subject)
+        outsider = Grade.objects.create(student=make_student("grid9", "30000009", career)[1], subject=self.subject)
+        self.client.force_login(self.prof_user)
+        url = reverse("users:grade-grid", args=[self.subject.code])
+
+        resp = self.client.get(url)
+        grades = [form.instance for form in resp.context["formset"]]
+        self.assertEqual(len(grades), 4)  # not the graded student who is not inscribed
+        data = {"form-TOTAL_FORMS": "4", "form-INITIAL_FORMS": "4"}
+        for i, grade in enumerate(grades):
+            data.update({f"form-{i}-id": grade.pk, f"form-{i}-promotion_grade": "", f"form-{i}-final_grade": "",
+                         f"form-{i}-status_override": grade.status_override})
+        data.update({"form-0-final_grade": "8", "form-1-final_grade": "4",
+                     "form-2-status_override": Grade.StatusSubject.FREE})
+
+        # Session/user/professor/subject lookups, the grid query, and one UPDATE for all rows
+        # plus the summary refresh; no per-row SELECT or save.
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(url, data)
+        self.assertRedirects(resp, reverse("users:grade-list", args=[self.subject.code]), fetch_redirect_response=False)
+        self.assertEqual(sum(q["sql"].startswith("UPDATE") for q in queries), 1)
+        self.assertLessEqual(len(queries), 12)
+        statuses = dict(Grade.objects.filter(pk__in=[g.pk for g in grades]).values_list("pk", "status"))
+        self.assertEqual([statuses[g.pk] for g in grades], ["promoted", "regular", "free", "regular"])
+
+        # Rows of other subjects, or of students not inscribed, are refused.
+        data["form-0-id"] = outsider.pk
+        resp = self.client.post(url, data)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.context["formset"].non_form_errors())
+
+    def test_grade_import_previews_then_applies(self):
+        SubjectInscription.objects.create(student=self.student, subject=self.subject)
+        self.client.force_login(self.prof_user)
+        url = reverse("users:grade-import", args=[self.subject.code])
+        upload = BytesIO(f"{self.student.student_id},7,8\nNOPE,1,1\n".encode())
+        upload.name = "notas.csv"
+        with TemporaryDirectory() as tmp, override_settings(GRADE_IMPORT_STAGING_DIR=Path(tmp)):
+            resp = self.client.post(url, {"file": upload})
+            self.assertTemplateUsed(resp, "users/grade_import_preview.html")
+            self.assertEqual((resp.context["change_count"], len(resp.context["errors"])), (1, 1))
+            token = resp.context["token"]
+            self.assertIsNone(Grade.objects.get(student=self.student, subject=self.subject).final_grade)
+
+            # A stale or foreign token is refused.
+            resp = self.client.post(url, {"confirm": "1", "token": "0" * 32})
+            self.assertRedirects(resp, url, fetch_redirect_response=False)
+            self.assertEqual(len(list(Path(tmp).glob("*.csv"))), 1)
+
+            upload.seek(0)
+            token = self.client.post(url, {"file": upload}).context["token"]
+            resp = self.client.post(url, {"confirm": "1", "token": token})
+            self.assertRedirects(resp, reverse("users:grade-list", args=[self.subject.code]),
+                                 fetch_redirect_response=False)
+            grade = Grade.objects.get(student=self.student, subject=self.subject)
+            self.assertEqual((grade.final_grade, grade.status), (8, Grade.StatusSubject.PROMOTED))
+            self.assertFalse(list(Path(tmp).glob("*.csv")))
+
+    def test_authorization_cache_follows_assignments(self):
+        other = make_subject("HIS1", self.student.career)
+        final = FinalExam.objects.create(
+            subject=other, date=date.today() + timedelta(days=7), location="Aula 1",
+            duration=timedelta(hours=2), call_number=1,
+        )
+        self.client.force_login(self.prof_user)
+        self.assertEqual(self.client.get(reverse("users:grade-list", args=[other.code])).status_code, 404)
+        self.assertEqual(services.professor_authorization(self.prof).subject_codes, {self.subject.code})
+
+        other.professors.add(self.prof)  # reverse side
+        self.assertEqual(self.client.get(reverse("users:grade-list", args=[other.code])).status_code, 200)
+        self.prof.final_exams.add(final)  # forward side
+        url = reverse("users:professor-final-inscriptions", args=[final.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        final.professors.clear()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.prof.subjects.remove(other)
+        self.assertEqual(self.client.get(reverse("users:grade-list", args=[other.code])).status_code, 404)
+
+        with self.assertNumQueries(0):
+            self.assertIn(self.subject.code, services.professor_authorization(self.prof).subject_codes)
+
+    def test_authorization_cache_expires_and_follows_deletes(self):
+        final = FinalExam.objects.create(
+            subject=self.subject, date=date.today() + timedelta(days=7), location="Aula 1",
+            duration=timedelta(hours=2), call_number=1,
+        )
+        self.prof.final_exams.add(final)
+        with patch.object(services.cache, "set", wraps=services.cache.set) as cache_set:
+            self.assertEqual(services.professor_authorization(self.prof).final_exam_ids, {final.pk})
+        self.assertEqual(cache_set.call_args.kwargs["timeout"], settings.PROFESSOR_AUTHORIZATION_CACHE_TIMEOUT)
+
+        # Deleting cascades through the assignment table without m2m_changed.
+        final.delete()
+        self.assertEqual(services.professor_authorization(self.prof).final_exam_ids, set())
+        self.subject.delete()
+        self.assertEqual(services.professor_authorization(self.prof).subject_codes, set())
 
     def test_grade_edit_permissions_and_update(self):
         # Create grade and inscription
         SubjectInscription.objects.create(student=self.student, subject=self.subject)
-        grade = Grade.objects.create(student=self.student, subject=self.subject)
+        grade = Grade.objects.get(student=self.student, subject=self.subject)
         # Another subject not assigned to professor
         other_subject = make_subject("HIS1", self.student.career)
         grade_other = Grade.objects.create(student=self.student, subject=other_subject)
@@ -512,12 +971,12 @@ class ProfessorViewsTests(TestCase):
         # Can edit assigned and update_status auto-applies
         resp = self.client.post(
             reverse("users:grade-edit", args=[grade.id]),
-            data={"promotion_grade": 8, "final_grade": 7, "status": Grade.StatusSubject.REGULAR},
+            data={"promotion_grade": 8, "final_grade": 7, "status_override": Grade.StatusSubject.REGULAR},
         )
         self.assertEqual(resp.status_code, 302)
         grade.refresh_from_db()
     # Since status wasn't changed explicitly (remains REGULAR),
-    # update_status should set PROMOTED for final_grade >= 6
+    # the new final grade clears it and the database derives PROMOTED
         self.assertEqual(grade.status, Grade.StatusSubject.PROMOTED)
 
     def test_professor_final_inscriptions_list(self):
@@ -534,3 +993,519 @@ class ProfessorViewsTests(TestCase):
         self.client.force_login(self.prof_user)
         resp = self.client.get(reverse("users:professor-final-inscriptions", args=[final.id]))
         self.assertEqual(resp.status_code, 200)
+
+
+class RepeatedQueryMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = [make_faculty(f"F{i}") for i in range(4)]
+
+    def run_view(self, view):
+        return RepeatedQueryMiddleware(view)(RequestFactory().get("/careers/"))
+
+    def test_query_shape_collapses_in_lists_and_skips_savepoints(self):
+        self.assertEqual(
+            query_shape('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+            query_shape('SELECT 1 FROM t WHERE id IN (%s, %s)'),
+        )
+        self.assertIsNone(query_shape('SAVEPOINT "s1_x1"'))
+
+    @override_settings(QUERY_SHAPE_CHECK="raise", QUERY_SHAPE_THRESHOLD=3)
+    def test_repeated_lookups_raise(self):
+        def view(request):
+            for faculty in self.faculties:
+                Faculty.objects.get(pk=faculty.pk)
+            return HttpResponse()
+
+        with self.assertRaisesMessage(RepeatedQueryError, "4x SELECT"):
+            self.run_view(view)
+
+    @override_settings(QUERY_SHAPE_CHECK="log", QUERY_SHAPE_THRESHOLD=3)
+    def test_log_mode_warns_and_returns_response(self):
+        def view(request):
+            for faculty in self.faculties:
+                Faculty.objects.get(pk=faculty.pk)
+            list(Faculty.objects.filter(pk__in=[f.pk for f in self.faculties]))
+            return HttpResponse("ok")
+
+        with self.assertLogs("main.queries", "WARNING") as logs:
+            response = self.run_view(view)
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("repeated 1 query shape(s)", logs.output[0])
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student_user, self.student = make_student()
+        make_subject(career=self.student.career)
+        store_dir = TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        self.enterContext(override_settings(CERTIFICATE_STORE_DIR=Path(store_dir.name)))
+        self.client.force_login(self.student_user)
+
+    def metrics(self, response):
+        return {metric.split(";")[0]: metric for metric in response["Server-Timing"].split(", ")}
+
+    @override_settings(SERVER_TIMING_HEADER=True, SERVER_TIMING_SAMPLE_RATE=0)
+    def test_header_reports_total_db_and_template_time(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("users:student-dashboard"))
+        metrics = self.metrics(resp)
+        self.assertEqual(set(metrics), {"total", "db", "tpl"})
+        self.assertIn(f'desc="{len(queries)} queries"', metrics["db"])
+        self.assertRegex(metrics["total"], r"^total;dur=\d+\.\d$")
+
+    @override_settings(SERVER_TIMING_HEADER=True, SERVER_TIMING_SAMPLE_RATE=0)
+    def test_header_reports_certificate_render_time(self):
+        resp = self.client.get(reverse("users:student-regular-certificate"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("docx", self.metrics(resp))
+        # A stored certificate is served without rendering.
+        self.assertNotIn("docx", self.metrics(self.client.get(reverse("users:student-regular-certificate"))))
+
+    @override_settings(SERVER_TIMING_HEADER=False, SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_requests_are_logged_with_the_url_name(self):
+        with self.assertLogs("main.timing", "INFO") as logs:
+            resp = self.client.get(reverse("users:student-dashboard"))
+        self.assertNotIn("Server-Timing", resp)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "users:student-dashboard")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertGreaterEqual(record["total_ms"], record["db_ms"])
+
+    @override_settings(SERVER_TIMING_HEADER=False, SERVER_TIMING_SAMPLE_RATE=1, CERTIFICATE_BULK_WORKERS=1)
+    def test_streamed_body_is_timed_when_consumed_in_another_thread(self):
+        for i in range(2):
+            make_student(f"stream{i}", f"3000000{i}", self.student.career)
+        self.client.force_login(make_admin())
+        timed_renders = []
+
+        def render(*args):
+            timed_renders.append(timing._current.get() is not None)
+            return render_certificate(*args)
+
+        render_certificate = certificates.render_certificate
+        with patch.object(certificates, "render_certificate", render), \
+                self.assertLogs("main.timing", "INFO") as logs:
+            resp = self.client.get(reverse("users:bulk-certificates"), {"career": self.student.career.code})
+            logging.getLogger("main.timing").info("headers sent")
+            consumer = threading.Thread(target=lambda: b"".join(resp.streaming_content))
+            consumer.start()
+            consumer.join()
+
+        self.assertEqual(timed_renders, [True] * 3)  # the first in the view, the rest in the consumer thread
+        self.assertEqual(logs.records[0].getMessage(), "headers sent")  # logged once the stream ended
+        record = json.loads(logs.records[1].getMessage())
+        self.assertEqual(record["view"], "users:bulk-certificates")
+        self.assertGreater(record["docx_ms"], 0)
+        self.assertGreaterEqual(record["total_ms"], record["docx_ms"])
+
+    @override_settings(SERVER_TIMING_HEADER=False, SERVER_TIMING_SAMPLE_RATE=0)
+    def test_disabled_middleware_leaves_the_chain(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: HttpResponse())
+        self.assertNotIn("Server-Timing", self.client.get(reverse("users:student-dashboard")))
+
+
+# Query budget of a cold GET to every users.urls view, with the QueryBudgetTests
+# dataset: URL name -> (who requests it, maximum queries). Declare new views here.
+QUERY_BUDGETS = {
+    "admin-dashboard": ("admin", 2),
+    "user-list": ("admin", 4),
+    "user-create": ("admin", 3),
+    "user-edit": ("admin", 7),
+    "user-delete": ("admin", 3),
+    "faculty-list": ("admin", 3),
+    "faculty-create": ("admin", 2),
+    "faculty-edit": ("admin", 3),
+    "faculty-delete": ("admin", 3),
+    "career-list": ("admin", 3),
+    "career-create": ("admin", 3),
+    "career-edit": ("admin", 4),
+    "career-delete": ("admin", 3),
+    "subject-list": ("admin", 4),
+    "subject-create": ("admin", 3),
+    "subject-edit": ("admin", 4),
+    "subject-delete": ("admin", 3),
+    "assign-subject-professors": ("admin", 5),
+    "final-list": ("admin", 4),
+    "final-create": ("admin", 3),
+    "final-edit": ("admin", 4),
+    "final-delete": ("admin", 3),
+    "assign-final-professors": ("admin", 6),
+    "bulk-certificates": ("admin", 4),
+    "enrollment-import": ("admin", 2),
+    "inscription-admission": ("admin", 2),
+    "student-dashboard": ("student", 7),
+    "subject-inscribe": ("student", 6),
+    "subjects-batch-inscribe": ("student", 2),
+    "final-inscribe": ("student", 8),
+    "student-regular-certificate": ("student", 3),
+    "certificate-job-create": ("student", 2),
+    "certificate-job-status": ("student", 3),
+    "certificate-job-download": ("student", 3),
+    "professor-dashboard": ("professor", 7),
+    "grade-list": ("professor", 7),
+    "grade-grid": ("professor", 7),
+    "grade-import": ("professor", 6),
+    "grade-edit": ("professor", 7),
+    "professor-final-inscriptions": ("professor", 7),
+}
+
+
+class QueryBudgetTests(TestCase):
+    """GET every users.urls view and hold it to its QUERY_BUDGETS entry, with N+1 detection raising."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_admin()
+        cls.prof_user, cls.prof = make_professor()
+        faculties = [make_faculty(f"F{i}") for i in range(3)]
+        careers = [make_career(f"C{i}", faculty) for i, faculty in enumerate(faculties)]
+        cls.subjects = [make_subject(f"S{i}", careers[0]) for i in range(3)] + [make_subject("X0", careers[1])]
+        make_subject("S3", careers[0])  # offered to the students, not inscribed yet
+        cls.finals = [
+            FinalExam.objects.create(subject=subject, date=date.today() + timedelta(days=7), location="Aula 1",
+                                     duration=timedelta(hours=2), call_number=1)
+            for subject in cls.subjects
+        ]
+        students = [make_student(f"qb{i}", f"4000000{i}", careers[0]) for i in range(3)]
+        cls.student_user, cls.student = students[0]
+        for _, student in students:
+            for subject in cls.subjects[:3]:
+                SubjectInscription.objects.create(student=student, subject=subject)
+            FinalExamInscription.objects.create(student=student, final_exam=cls.finals[0])
+        cls.prof.subjects.add(*cls.subjects)
+        cls.prof.final_exams.add(*cls.finals)
+        Correlative.objects.create(subject=cls.subjects[1], required_subject=cls.subjects[0])
+        cls.job = enqueue_certificate(cls.student)
+        cls.grade = Grade.objects.get(student=cls.student, subject=cls.subjects[0])
+
+    def url_kwargs(self, name):
+        return {
+            "user-edit": {"pk": self.student_user.pk},
+            "user-delete": {"pk": self.student_user.pk},
+            "faculty-edit": {"code": "F0"},
+            "faculty-delete": {"code": "F0"},
+            "career-edit": {"code": "C0"},
+            "career-delete": {"code": "C0"},
+            "subject-edit": {"code": "S0"},
+            "subject-delete": {"code": "S0"},
+            "assign-subject-professors": {"code": "S0"},
+            "final-edit": {"pk": self.finals[0].pk},
+            "final-delete": {"pk": self.finals[0].pk},
+            "assign-final-professors": {"pk": self.finals[0].pk},
+            "subject-inscribe": {"subject_code": "S3"},
+            "final-inscribe": {"final_exam_id": self.finals[2].pk},
+            "certificate-job-status": {"pk": self.job.pk},
+            "certificate-job-download": {"pk": self.job.pk},
+            "grade-list": {"subject_code": "S0"},
+            "grade-grid": {"subject_code": "S0"},
+            "grade-import": {"subject_code": "S0"},
+            "grade-edit": {"pk": self.grade.pk},
+            "professor-final-inscriptions": {"final_exam_id": self.finals[0].pk},
+        }.get(name, {})
+
+    def test_every_view_has_a_budget(self):
+        from users.urls import urlpatterns
+
+        self.assertEqual({pattern.name for pattern in urlpatterns}, set(QUERY_BUDGETS))
+
+    @override_settings(QUERY_SHAPE_CHECK="raise", QUERY_SHAPE_THRESHOLD=3)
+    def test_views_stay_within_budget(self):
+        store_dir = TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        self.enterContext(override_settings(CERTIFICATE_STORE_DIR=Path(store_dir.name)))
+        users = {"admin": self.admin, "student": self.student_user, "professor": self.prof_user}
+        for name, (who, budget) in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                cache.clear()
+                self.client.force_login(users[who])
+                url = reverse(f"users:{name}", kwargs=self.url_kwargs(name))
+                with CaptureQueriesContext(connection) as queries:
+                    resp = self.client.get(url)
+                self.assertLess(resp.status_code, 500)
+                self.assertLessEqual(
+                    len(queries), budget, "\n".join(q["sql"] for q in queries.captured_queries)
+                )
+
+
+class CertificateTemplateCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.template_path = Path(self.tmpdir.name) / "regular_certificate.docx"
+        shutil.copy(Path(settings.BASE_DIR) / "regular_certificate.docx", self.template_path)
+        self.cache = CertificateTemplateCache()
+
+    def test_template_is_parsed_once(self):
+        first = self.cache.get(self.template_path)
+        self.assertIs(self.cache.get(self.template_path), first)
+
+    def test_touch_without_content_change_keeps_compiled_template(self):
+        first = self.cache.get(self.template_path)
+        stat = self.template_path.stat()
+        os.utime(self.template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIs(self.cache.get(self.template_path), first)
+
+    def test_content_change_reloads_template(self):
+        first = self.cache.get(self.template_path)
+        with open(self.template_path, "ab") as fh:
+            fh.write(b"\0")
+        stat = self.template_path.stat()
+        os.utime(self.template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = self.cache.get(self.template_path)
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.fingerprint, first.fingerprint)
+
+    def test_missing_template_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(Path(self.tmpdir.name) / "missing.docx")
+
+    def test_renders_do_not_leak_into_cached_template(self):
+        compiled = self.cache.get(self.template_path)
+        outputs = []
+        for dni in ("11111111", "22222222"):
+            out = BytesIO()
+            compiled.render({"dni": dni, "student_id": "S-1"}, out)
+            outputs.append(out.getvalue())
+        self.assertIn(b"PK", outputs[0][:2])
+        self.assertNotEqual(outputs[0], outputs[1])
+        self.assertIn("{{", "".join(p.text for p in compiled.document.paragraphs))
+
+
+@override_settings(CERTIFICATE_BULK_WORKERS=1)
+class BulkCertificateTests(TestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.career = make_career("ISI")
+        other_career = make_career("IEM", faculty=make_faculty("F2"))
+        self.students = [
+            make_student(f"stud{i}", f"3000000{i}", career=self.career)[1] for i in range(3)
+        ]
+        make_student("other", "30000009", career=other_career)
+
+    def test_form_requires_exactly_one_scope(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("users:bulk-certificates"))
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(
+            reverse("users:bulk-certificates"), {"career": self.career.code, "faculty": self.career.faculty.code}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Seleccione una carrera o una facultad.")
+
+    def test_career_zip_contains_one_certificate_per_student(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("users:bulk-certificates"), {"career": self.career.code})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/zip")
+        archive = zipfile.ZipFile(BytesIO(b"".join(resp.streaming_content)))
+        names = archive.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith("S-3000000") for name in names))
+        self.assertIsNone(archive.testzip())
+
+    def test_faculty_students_are_loaded_in_one_query(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("users:bulk-certificates"), {"faculty": "F2"})
+            content = b"".join(resp.streaming_content)
+        student_queries = [q["sql"] for q in queries.captured_queries if '"students"' in q["sql"]]
+        self.assertEqual(len(student_queries), 1)
+        self.assertIn('"users"', student_queries[0])
+        self.assertEqual(len(zipfile.ZipFile(BytesIO(content)).namelist()), 1)
+
+    @override_settings(CERTIFICATE_BULK_WORKERS=8)
+    def test_download_does_not_start_the_full_pool(self):
+        self.client.force_login(self.admin)
+        with patch("users.certificates.ProcessPoolExecutor") as pool:
+            resp = self.client.get(reverse("users:bulk-certificates"), {"career": self.career.code})
+            self.assertEqual(len(zipfile.ZipFile(BytesIO(b"".join(resp.streaming_content))).namelist()), 3)
+        pool.assert_not_called()
+
+    def test_command_writes_zip_with_process_pool(self):
+        with TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "isi.zip"
+            call_command("generate_certificates", career=self.career.code, output=str(output), workers=2, stdout=StringIO())
+            with zipfile.ZipFile(output) as archive:
+                self.assertEqual(len(archive.namelist()), 3)
+
+
+class CertificateStoreTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.store = CertificateStore(Path(tmpdir.name))
+        self.template_path = Path(settings.BASE_DIR) / "regular_certificate.docx"
+
+    def test_key_depends_on_context(self):
+        key = self.store.key_for(self.template_path, {"dni": "1", "today_date": "01/01/2024"})
+        self.assertEqual(key, self.store.key_for(self.template_path, {"today_date": "01/01/2024", "dni": "1"}))
+        self.assertNotEqual(key, self.store.key_for(self.template_path, {"dni": "1", "today_date": "02/01/2024"}))
+
+    def test_fetch_renders_once_and_prune_removes_old_files(self):
+        context = {"dni": "1"}
+        key, path = self.store.fetch(self.template_path, context)
+        self.assertTrue(path.exists())
+        self.assertEqual(path, self.store.path_for(key))
+        self.assertEqual(list(path.parent.glob("*.tmp")), [])
+        with patch("users.certificates.render_certificate") as mock_render:
+            self.assertEqual(self.store.fetch(self.template_path, context), (key, path))
+            mock_render.assert_not_called()
+
+        self.assertEqual(self.store.prune(3600), 0)
+        os.utime(path, (0, 0))
+        self.assertEqual(self.store.prune(3600), 1)
+        self.assertFalse(path.exists())
+
+    def test_fetch_file_renders_again_when_pruned_before_open(self):
+        context = {"dni": "1"}
+        key, path = self.store.fetch(self.template_path, context)
+        fetch = self.store.fetch
+
+        def fetch_then_prune(*args, **kwargs):
+            result = fetch(*args, **kwargs)
+            if fetch_then_prune.prune:
+                fetch_then_prune.prune = False
+                path.unlink()  # prune_certificate_store running between fetch() and open()
+            return result
+
+        fetch_then_prune.prune = True
+        with patch.object(self.store, "fetch", fetch_then_prune):
+            fetched_key, fetched_path, stored = self.store.fetch_file(self.template_path, context)
+        with stored:
+            self.assertEqual((fetched_key, fetched_path), (key, path))
+            path.unlink()  # pruned while the response is being sent
+            self.assertTrue(zipfile.is_zipfile(stored))
+
+
+def fake_students(count):
+    """Yield unsaved, student-shaped objects accepted by the certificate helpers."""
+    for i in range(count):
+        user = CustomUser(username=f"mem{i}", first_name="Ana", last_name=f"Mem{i}", dni=f"{i:08d}")
+        yield Student(user=user, student_id=f"MEM{i:04d}", enrollment_date=date(2020, 3, 1))
+
+
+class CertificateMemoryTests(SimpleTestCase):
+    """Peak Python heap while many certificates are rendered concurrently stays bounded."""
+
+    THREADS = 4
+    CEILING = 8 * 1024 * 1024
+
+    def setUp(self):
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.store = CertificateStore(Path(tmpdir.name))
+        self.template_path = Path(settings.BASE_DIR) / "regular_certificate.docx"
+        certificates.template_cache.get(self.template_path)  # keep the parse out of the measurement
+
+    def measure_peak(self, target, *args):
+        threads = [threading.Thread(target=target, args=args) for _ in range(self.THREADS)]
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    def test_concurrent_zip_streams(self):
+        def consume(count):
+            for chunk in certificates.iter_certificate_zip(fake_students(count), date(2024, 1, 1), workers=1):
+                self.assertLess(len(chunk), 2 * certificates.STREAM_BLOCK_SIZE)
+
+        few, many = self.measure_peak(consume, 10), self.measure_peak(consume, 40)
+        self.assertLess(many, self.CEILING)
+        # Four times more documents per stream must not mean four times more memory.
+        self.assertLess(many, few * 2)
+
+    def test_concurrent_store_renders(self):
+        batches = itertools.count()
+
+        def render():
+            batch = next(batches)
+            for student in fake_students(10):
+                self.store.fetch(self.template_path, {"dni": f"{batch}-{student.user.dni}"})
+
+        self.assertLess(self.measure_peak(render), self.CEILING)
+        self.assertEqual(len(list(self.store.root.glob("*/*.docx"))), self.THREADS * 10)
+
+
+class CertificateJobTests(TestCase):
+    def setUp(self):
+        self.student_user, self.student = make_student()
+        store_dir = TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        self.enterContext(override_settings(CERTIFICATE_STORE_DIR=Path(store_dir.name)))
+
+    def test_enqueue_poll_and_download(self):
+        self.client.force_login(self.student_user)
+        resp = self.client.post(reverse("users:certificate-job-create"))
+        self.assertEqual(resp.status_code, 202)
+        job_id = resp.json()["job_id"]
+        self.assertEqual(resp.json()["status"], CertificateJob.Status.PENDING)
+
+        # Repeated clicks reuse the pending job
+        resp = self.client.post(reverse("users:certificate-job-create"))
+        self.assertEqual(resp.json()["job_id"], job_id)
+
+        resp = self.client.get(reverse("users:certificate-job-download", args=[job_id]))
+        self.assertEqual(resp.status_code, 404)
+
+        self.assertEqual(work(once=True), 1)
+
+        status = self.client.get(reverse("users:certificate-job-status", args=[job_id])).json()
+        self.assertEqual(status["status"], CertificateJob.Status.DONE)
+        resp = self.client.get(status["download_url"])
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(b"".join(resp.streaming_content).startswith(b"PK"))
+        resp = self.client.get(status["download_url"], HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 304)
+
+    def test_jobs_are_private_to_their_student(self):
+        job = enqueue_certificate(self.student)
+        other_user, _ = make_student("other", "10000009", career=self.student.career)
+        self.client.force_login(other_user)
+        resp = self.client.get(reverse("users:certificate-job-status", args=[job.pk]))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_claim_is_exclusive_and_failures_are_recorded(self):
+        enqueue_certificate(self.student)
+        job = claim_next_job()
+        self.assertEqual(job.status, CertificateJob.Status.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(claim_next_job())
+
+        with TemporaryDirectory() as tmpdir, override_settings(BASE_DIR=tmpdir, CERTIFICATE_JOB_TIMEOUT=0):
+            # Abandoned RUNNING jobs are reclaimed; missing template marks it FAILED
+            with self.assertLogs("users.certificate_jobs", level="ERROR"):
+                self.assertEqual(work(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, CertificateJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(CERTIFICATE_JOB_TIMEOUT=0, CERTIFICATE_JOB_MAX_ATTEMPTS=2)
+    def test_abandoned_job_fails_after_max_attempts(self):
+        job = enqueue_certificate(self.student)
+        self.assertEqual(claim_next_job().attempts, 1)
+        self.assertEqual(claim_next_job().attempts, 2)  # its worker died; reclaimed
+        with self.assertLogs("users.certificate_jobs", level="ERROR"):
+            self.assertIsNone(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, CertificateJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("2 intentos", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_worker_command_drains_queue(self):
+        enqueue_certificate(self.student)
+        out = StringIO()
+        call_command("certificate_worker", once=True, stdout=out)
+        self.assertIn("Processed 1", out.getvalue())
+        self.assertEqual(CertificateJob.objects.get().status, CertificateJob.Status.DONE)
@@ -46,15 +46,25 @@ urlpatterns = [
     path('admin/finals/<int:pk>/delete/', views.final_delete, name='final-delete'),
     path('admin/finals/<int:pk>/assign-professors/', views.assign_final_professors, name='assign-final-professors'),
 
+    path('admin/certificates/', views.bulk_certificates, name='bulk-certificates'),
+    path('admin/inscriptions/import/', views.enrollment_import, name='enrollment-import'),
+    path('admin/inscriptions/admission/', views.inscription_admission_stats, name='inscription-admission'),
+
     # Student
     path('student/dashboard/', views.student_dashboard, name='student-dashboard'),
     path('student/subject/<str:subject_code>/inscribe/', views.subject_inscribe, name='subject-inscribe'),
+    path('student/subjects/inscribe/', views.subjects_batch_inscribe, name='subjects-batch-inscribe'),
     path('student/final/<int:final_exam_id>/inscribe/', views.final_exam_inscribe, name='final-inscribe'),
     path('student/certificate/regular/', views.download_regular_certificate, name='student-regular-certificate'),
+    path('student/certificate/regular/jobs/', views.certificate_job_create, name='certificate-job-create'),
+    path('student/certificate/regular/jobs/<int:pk>/', views.certificate_job_status, name='certificate-job-status'),
+    path('student/certificate/regular/jobs/<int:pk>/download/', views.certificate_job_download, name='certificate-job-download'),
 
     # Professor
     path('professor/dashboard/', views.professor_dashboard, name='professor-dashboard'),
     path('professor/grades/<str:subject_code>/', views.grade_list, name='grade-list'),
+    path('professor/grades/<str:subject_code>/grid/', views.grade_grid, name='grade-grid'),
+    path('professor/grades/<str:subject_code>/import/', views.grade_import, name='grade-import'),
     path('professor/grade/<int:pk>/edit/', views.grade_edit, name='grade-edit'),
     path('professor/final/<int:final_exam_id>/inscriptions/',views.professor_final_inscriptions, name='professor-final-inscriptions')
 ]
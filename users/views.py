@@ -2,7 +2,7 @@
 
 Includes:
 - Admin: CRUD for users, faculties, careers, subjects, finals, and assignments.
-- Student: dashboard, subject/final inscriptions, regular certificate.
+- Student: dashboard, subject/final inscriptions, regular certificate (direct or queued).
 - Professor: dashboard, grade management, final inscriptions.
 
 Notes:
@@ -11,23 +11,58 @@ Notes:
     - Keeps business rules minimal in views; core rules live in models/services.
 """
 
-from io import BytesIO
-from pathlib import Path
+import io
 
-from docxtpl import DocxTemplate
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
-
-from academics.forms import CareerForm, FacultyForm, FinalExamForm, GradeForm, SubjectForm
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_POST
+
+from academics.correlatives import correlative_grades, correlative_index, missing_correlatives
+from academics.forms import CareerForm, FacultyForm, FinalExamForm, GradeForm, GradeGridFormSet, SubjectForm
+from academics.importers import GradeImport, discard_staged, stage_upload, staged_path
 from academics.models import Career, Faculty, FinalExam, Grade, Subject
+from academics.signals import grades_bulk_changed
+from inscriptions.importers import import_enrollments, write_error_report
+from inscriptions.middleware import admission_stats
 from inscriptions.models import FinalExamInscription, SubjectInscription
-from users.forms import AdministratorProfileForm, ProfessorProfileForm, StudentProfileForm, UserForm
-from users.models import CustomUser, Professor, Student
+from inscriptions.services import NoSeatsAvailable, inscribe_final_exam, inscribe_subject, inscribe_subjects
+from main.pagination import keyset_paginate
+from users.certificate_jobs import enqueue_certificate
+from users.certificates import (
+    DOCX_CONTENT_TYPE,
+    STREAM_BLOCK_SIZE,
+    build_certificate_context,
+    certificate_filename,
+    certificate_store,
+    iter_certificate_zip,
+    regular_certificate_template_path,
+)
+from users.forms import (
+    AdministratorProfileForm,
+    BatchInscriptionForm,
+    BulkCertificateForm,
+    EnrollmentImportForm,
+    GradeImportForm,
+    ListFilterForm,
+    ProfessorProfileForm,
+    StudentProfileForm,
+    UserForm,
+)
+from users.models import CertificateJob, CustomUser, Professor, Student
+from users.search import search_users
+from users.services import StudentAcademicSnapshot, dashboard_cache_versions, professor_authorization
+
+ENROLLMENT_IMPORT_ERRORS_SHOWN = 500
 
 
 # --------- Admin Views -------
@@ -52,13 +87,27 @@ def admin_dashboard(request):
 @user_passes_test(is_admin)
 def user_list(request):
     """
-    List all users.
+    List users, one keyset page at a time, filtered by role and student career.
+
+    Behavior:
+        - "q" searches username, DNI, names and email (users.search); matches are
+          listed best first, ordered by (rank, id).
 
     Returns:
-        HttpResponse: Page with user queryset.
+        HttpResponse: Page with the users of the current page, pager and filters.
     """
+    filters = ListFilterForm(request.GET, fields=("q", "role", "career"))
     users = CustomUser.objects.all()
-    return render(request, "users/user_list.html", {"users": users})
+    wanted = filters.filters()
+    if "role" in wanted:
+        users = users.filter(role=wanted["role"])
+    if "career" in wanted:
+        users = users.filter(student__career=wanted["career"])
+    ordering = ("id",)
+    if "q" in wanted:
+        users, ordering = search_users(users, wanted["q"]), ("rank", "id")
+    page = keyset_paginate(users, ordering, request.GET.get("cursor"), settings.ADMIN_LIST_PAGE_SIZE)
+    return render(request, "users/user_list.html", {"users": page, "page": page, "filters": filters})
 
 
 @login_required
@@ -220,13 +269,13 @@ def user_delete(request, pk):
 @user_passes_test(is_admin)
 def faculty_list(request):
     """
-    List faculties.
+    List faculties, one keyset page at a time.
 
     Returns:
-        HttpResponse: Page with faculties queryset.
+        HttpResponse: Page with the faculties of the current page and pager.
     """
-    faculties = Faculty.objects.all()
-    return render(request, "users/faculty_list.html", {"faculties": faculties})
+    page = keyset_paginate(Faculty.objects.all(), ("code",), request.GET.get("cursor"), settings.ADMIN_LIST_PAGE_SIZE)
+    return render(request, "users/faculty_list.html", {"faculties": page, "page": page})
 
 
 @login_required
@@ -294,13 +343,14 @@ def faculty_delete(request, code):
 @user_passes_test(is_admin)
 def career_list(request):
     """
-    List careers.
+    List careers, one keyset page at a time.
 
     Returns:
-        HttpResponse: Page with careers queryset.
+        HttpResponse: Page with the careers of the current page and pager.
     """
-    careers = Career.objects.all()
-    return render(request, "users/career_list.html", {"careers": careers})
+    careers = Career.objects.select_related("faculty")
+    page = keyset_paginate(careers, ("code",), request.GET.get("cursor"), settings.ADMIN_LIST_PAGE_SIZE)
+    return render(request, "users/career_list.html", {"careers": page, "page": page})
 
 
 @login_required
@@ -368,13 +418,20 @@ def career_delete(request, code):
 @user_passes_test(is_admin)
 def subject_list(request):
     """
-    List subjects.
+    List subjects, one keyset page at a time, filtered by career and year.
 
     Returns:
-        HttpResponse: Page with subjects queryset.
+        HttpResponse: Page with the subjects of the current page, pager and filters.
     """
-    subjects = Subject.objects.select_related("career").all()
-    return render(request, "users/subject_list.html", {"subjects": subjects})
+    filters = ListFilterForm(request.GET, fields=("career", "year"))
+    subjects = Subject.objects.select_related("career")
+    wanted = filters.filters()
+    if "career" in wanted:
+        subjects = subjects.filter(career=wanted["career"])
+    if "year" in wanted:
+        subjects = subjects.filter(year=wanted["year"])
+    page = keyset_paginate(subjects, ("code",), request.GET.get("cursor"), settings.ADMIN_LIST_PAGE_SIZE)
+    return render(request, "users/subject_list.html", {"subjects": page, "page": page, "filters": filters})
 
 
 @login_required
@@ -478,13 +535,20 @@ def assign_subject_professors(request, code):
 @user_passes_test(is_admin)
 def final_list(request):
     """
-    List final exams.
+    List final exams by date, one keyset page at a time, filtered by the subject's career and year.
 
     Returns:
-        HttpResponse: Page with final exams queryset.
+        HttpResponse: Page with the final exams of the current page, pager and filters.
     """
-    finals = FinalExam.objects.select_related("subject").all()
-    return render(request, "users/final_list.html", {"finals": finals})
+    filters = ListFilterForm(request.GET, fields=("career", "year"))
+    finals = FinalExam.objects.select_related("subject")
+    wanted = filters.filters()
+    if "career" in wanted:
+        finals = finals.filter(subject__career=wanted["career"])
+    if "year" in wanted:
+        finals = finals.filter(subject__year=wanted["year"])
+    page = keyset_paginate(finals, ("date", "id"), request.GET.get("cursor"), settings.ADMIN_LIST_PAGE_SIZE)
+    return render(request, "users/final_list.html", {"finals": page, "page": page, "filters": filters})
 
 
 @login_required
@@ -584,6 +648,103 @@ def assign_final_professors(request, pk):
     return render(request, "users/assign_professors.html", {"final": final, "professors": profs})
 
 
+@login_required
+@user_passes_test(is_admin)
+def bulk_certificates(request):
+    """
+    Generate regular certificates for every student of a career or faculty.
+
+    Behavior:
+        - GET without a valid selection renders the selection form.
+        - With a valid selection, streams a ZIP with one DOCX per student; members
+          are sent as soon as they are ready.
+        - Renders use settings.CERTIFICATE_BULK_REQUEST_WORKERS processes (default 1:
+          inline), not the full CERTIFICATE_BULK_WORKERS pool, so one download cannot
+          take every core of the web server. Large batches belong to the
+          generate_certificates command.
+
+    Returns:
+        HttpResponse | StreamingHttpResponse: Form page or ZIP download.
+    """
+    form = BulkCertificateForm(request.GET or None)
+    if not form.is_valid():
+        return render(request, "users/bulk_certificates.html", {"form": form})
+
+    try:
+        chunks = iter_certificate_zip(
+            form.get_students().iterator(chunk_size=500),
+            timezone.localdate(),
+            workers=settings.CERTIFICATE_BULK_REQUEST_WORKERS,
+        )
+        first_chunk = next(chunks)
+    except FileNotFoundError:
+        messages.error(request, "No se encontró la plantilla de certificado.")
+        return render(request, "users/bulk_certificates.html", {"form": form})
+
+    def stream():
+        yield first_chunk
+        yield from chunks
+
+    response = StreamingHttpResponse(stream(), content_type="application/zip")
+    response["Content-Disposition"] = f"attachment; filename=\"{form.archive_name()}\""
+    return response
+
+
+@login_required
+@user_passes_test(is_admin)
+def enrollment_import(request):
+    """
+    Import subject enrollments from an uploaded CSV file.
+
+    Behavior:
+        - The form checks that the whole upload is UTF-8 first; the file is then
+          parsed as a stream and written in chunked bulk inserts
+          (inscriptions.importers.import_enrollments).
+        - Renders the totals and the first rejected rows, or returns every
+          rejected row as a CSV download when requested (the totals are then
+          not shown, since the download does not leave the page).
+
+    Returns:
+        HttpResponse: Upload form, import summary, or error report CSV.
+    """
+    form = EnrollmentImportForm(request.POST or None, request.FILES or None)
+    if request.method != "POST" or not form.is_valid():
+        return render(request, "users/enrollment_import.html", {"form": form})
+
+    upload = form.cleaned_data["file"]
+    with io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="") as lines:
+        result = import_enrollments(lines)
+
+    if result.errors and form.cleaned_data["error_report"]:
+        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="inscripciones-rechazadas.csv"'
+        write_error_report(result.errors, response)
+        return response
+    messages.success(
+        request,
+        f"Se leyeron {result.rows} filas: {result.created} inscripciones creadas, "
+        f"{result.duplicates} ya existentes, {len(result.errors)} rechazadas.",
+    )
+    return render(request, "users/enrollment_import.html", {
+        "form": EnrollmentImportForm(),
+        "result": result,
+        "errors": result.errors[:ENROLLMENT_IMPORT_ERRORS_SHOWN],
+    })
+
+
+@login_required
+@user_passes_test(is_admin)
+def inscription_admission_stats(request):
+    """
+    Report the inscription admission gate of the serving worker as JSON.
+
+    Returns:
+        JsonResponse: in_flight, queue_depth, limit, admitted and rejected counters
+        (see inscriptions.middleware.admission_stats).
+    """
+    return JsonResponse(admission_stats())
+
+
 # ------- Student Views -------
 def is_student(user):
     """Return True if the user is authenticated and has student role."""
@@ -596,14 +757,17 @@ def student_dashboard(request):
     """
     Render student dashboard with subjects, grades, and inscriptions.
 
+    The sections are cached per student with {% cache %}; the snapshot is lazy,
+    so a cache hit runs no academic queries at all.
+
     Context:
-        subjects: Career subjects for the student.
-        inscriptions: Subject inscriptions for the student.
-        grades: Grade queryset for the student.
-        eligible_finals: Finals where status is REGULAR.
-        final_inscriptions: Final exam inscriptions.
-        inscribed_final_ids: IDs of finals already inscribed.
-        inscribed_subject_codes: Codes of subjects already inscribed.
+        snapshot: users.services.StudentAcademicSnapshot of the student (three queries):
+            subjects, inscribed_subjects, inscribed_subject_codes, grades,
+            eligible_finals (finals where status is REGULAR), inscribed_finals,
+            and inscribed_final_ids.
+        cache_versions: Student and career version tokens (see users.signals).
+        cache_timeout: settings.STUDENT_DASHBOARD_CACHE_TIMEOUT.
+        csrf_secret: Part of the fragment key, since the fragment embeds CSRF tokens.
 
     Returns:
         HttpResponse: Dashboard page.
@@ -612,33 +776,12 @@ def student_dashboard(request):
     if not student:
         messages.error(request, "Tu perfil de estudiante no está configurado. Contactá a un administrador.")
         return redirect("home")
-    subjects = Subject.objects.filter(career=student.career)
-    inscriptions = SubjectInscription.objects.filter(student=student).select_related("subject")
-    inscribed_subject_codes = list(inscriptions.values_list("subject__code", flat=True))
-    grades = Grade.objects.filter(student=student).select_related("subject")
-
-    eligible_subject_ids = (
-        grades.filter(status=Grade.StatusSubject.REGULAR)
-        .values_list("subject_id", flat=True)
-        .distinct()
-    )
-    eligible_finals = FinalExam.objects.filter(subject_id__in=eligible_subject_ids)
-
-    final_inscriptions = (
-        FinalExamInscription.objects.filter(student=student)
-        .select_related("final_exam__subject")
-        .order_by("final_exam__date")
-    )
-    inscribed_final_ids = list(final_inscriptions.values_list("final_exam_id", flat=True))
-
+    get_token(request)  # make sure the CSRF secret exists before it is used as a cache key
     return render(request, "users/student_dashboard.html", {
-            "subjects": subjects,
-            "inscriptions": inscriptions,
-            "grades": grades,
-            "eligible_finals": eligible_finals,
-            "final_inscriptions": final_inscriptions,
-            "inscribed_final_ids": inscribed_final_ids,
-            "inscribed_subject_codes": inscribed_subject_codes})
+            "snapshot": SimpleLazyObject(lambda: StudentAcademicSnapshot(student)),
+            "cache_versions": dashboard_cache_versions(student),
+            "cache_timeout": settings.STUDENT_DASHBOARD_CACHE_TIMEOUT,
+            "csrf_secret": request.META["CSRF_COOKIE"]})
 
 
 @login_required
@@ -647,6 +790,11 @@ def subject_inscribe(request, subject_code):
     """
     Create subject inscription and ensure grade record exists.
 
+    Both rows are inserted atomically with conflict-ignoring inserts
+    (inscriptions.services.inscribe_subject), so double submissions are harmless.
+    A seat is taken in the same transaction when the subject has a capacity.
+    Students who do not meet the subject's correlatives are turned away.
+
     Args:
         subject_code (str): Subject code (PK).
 
@@ -655,11 +803,16 @@ def subject_inscribe(request, subject_code):
     """
     student = request.user.student
     subject = get_object_or_404(Subject, code=subject_code, career=student.career)
+    if missing := missing_correlatives(student, subject):
+        messages.error(request, f"Te faltan las correlativas: {', '.join(missing)}.")
+        return redirect("users:student-dashboard")
     if request.method == "POST":
-        created = False
-        obj, created = SubjectInscription.objects.get_or_create(student=student, subject=subject)
-        Grade.objects.get_or_create(student=student, subject=subject)
-        if created:
+        try:
+            result = inscribe_subject(student, subject)
+        except NoSeatsAvailable:
+            messages.error(request, "No quedan cupos disponibles en esta materia.")
+            return redirect("users:student-dashboard")
+        if result.inscription_created:
             messages.success(request, "Inscripción a la materia realizada.")
         else:
             messages.info(request, "Ya estabas inscripto en esta materia.")
@@ -667,11 +820,53 @@ def subject_inscribe(request, subject_code):
     return render(request, "users/inscribe_confirm.html", {"subject": subject})
 
 
+@login_required
+@user_passes_test(is_student)
+@require_POST
+def subjects_batch_inscribe(request):
+    """
+    Inscribe the student in every subject ticked on the dashboard.
+
+    The selection is validated as a whole against the student's career and
+    written with one bulk insert per table (inscriptions.services.inscribe_subjects).
+    Subjects whose correlatives are not met, and full subjects, are reported
+    without blocking the rest.
+
+    Returns:
+        HttpResponse: Redirect to the student dashboard.
+    """
+    student = request.user.student
+    form = BatchInscriptionForm(request.POST, student=student)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+        return redirect("users:student-dashboard")
+    index = correlative_index(student.career_id)
+    standing = index.standing(correlative_grades(student))
+    subjects, blocked = [], []
+    for subject in form.cleaned_data["subjects"]:
+        (blocked if index.missing(subject.code, standing) else subjects).append(subject)
+    if blocked:
+        messages.error(request, f"Te faltan correlativas para: {', '.join(s.code for s in blocked)}.")
+    if not subjects:
+        return redirect("users:student-dashboard")
+    result = inscribe_subjects(student, subjects)
+    if result.created:
+        messages.success(request, f"Inscripción realizada en {len(result.created)} materia(s): {', '.join(result.created)}.")
+    if result.already_inscribed:
+        messages.info(request, f"Ya estabas inscripto en: {', '.join(result.already_inscribed)}.")
+    if result.full:
+        messages.error(request, f"No quedan cupos disponibles en: {', '.join(result.full)}.")
+    return redirect("users:student-dashboard")
+
+
 @login_required
 @user_passes_test(is_student)
 def final_exam_inscribe(request, final_exam_id):
     """
-    Create final exam inscription if the subject status is REGULAR.
+    Create final exam inscription if the subject status is REGULAR, its correlatives
+    are promoted, and seats are left.
 
     Args:
         final_exam_id (int): FinalExam primary key.
@@ -685,9 +880,19 @@ def final_exam_inscribe(request, final_exam_id):
     if not grade or grade.status not in [Grade.StatusSubject.REGULAR]:
         messages.error(request, "Solo puedes inscribirte si la materia está regular.")
         return redirect("users:student-dashboard")
+    if missing := missing_correlatives(student, final_exam.subject, for_final=True):
+        messages.error(request, f"Para rendir debes aprobar las correlativas: {', '.join(missing)}.")
+        return redirect("users:student-dashboard")
     if request.method == "POST":
-        FinalExamInscription.objects.get_or_create(student=student, final_exam=final_exam)
-        messages.success(request, "Inscripción al final realizada.")
+        try:
+            created = inscribe_final_exam(student, final_exam)
+        except NoSeatsAvailable:
+            messages.error(request, "No quedan cupos disponibles en este final.")
+            return redirect("users:student-dashboard")
+        if created:
+            messages.success(request, "Inscripción al final realizada.")
+        else:
+            messages.info(request, "Ya estabas inscripto en este final.")
         return redirect("users:student-dashboard")
     return render(request, "users/inscribe_confirm.html", {"final_exam": final_exam})
 
@@ -696,60 +901,171 @@ def final_exam_inscribe(request, final_exam_id):
 @user_passes_test(is_student)
 def download_regular_certificate(request):
     """
-    Generate and download a 'regular student' certificate as DOCX.
+    Download the 'regular student' certificate as DOCX.
+
+    Behavior:
+        - The template is parsed once per worker through users.certificates.template_cache.
+        - Rendered documents are kept in the content-addressed CertificateStore; the
+          content key is the ETag, so repeat downloads with If-None-Match get a 304.
+        - Stored files are served with FileResponse, or handed to the front proxy
+          when settings.CERTIFICATE_SENDFILE_HEADER is set.
+
+    Returns:
+        HttpResponse: DOCX download, 304 Not Modified, or redirect on error.
     """
     # Evitar acceder a request.user.student directamente (puede lanzar RelatedObjectDoesNotExist)
     user = request.user
-    student = Student.objects.filter(user=user).select_related("career__faculty").first()
+    student = Student.objects.filter(user=user).select_related("user", "career__faculty").first()
     if not student:
         messages.error(request, "Tu perfil de estudiante no está configurado. Contactá a un administrador.")
         return redirect("home")
 
-    template_path = Path(settings.BASE_DIR) / "regular_certificate.docx"
-    if not template_path.exists():
+    today = timezone.localdate()
+    context = build_certificate_context(student, today)
+    template_path = regular_certificate_template_path()
+    store = certificate_store()
+    try:
+        key = store.key_for(template_path, context)
+    except FileNotFoundError:
         messages.error(request, "No se encontró la plantilla de certificado.")
         return redirect("users:student-dashboard")
 
-    today = timezone.localdate()
-    context = {
-        "full_name": request.user.get_full_name() or request.user.username,
-        "first_name": request.user.first_name,
-        "last_name": request.user.last_name,
-        "dni": request.user.dni,
-        "student_id": student.student_id,
-        "career_name": student.career.name if student.career else "",
-        "career_code": student.career.code if student.career else "",
-        "faculty_name": (
-            student.career.faculty.name
-            if getattr(student, "career", None) and student.career and student.career.faculty
-            else ""
-        ),
-        "enrollment_date": student.enrollment_date.strftime("%d/%m/%Y") if student.enrollment_date else "",
-        "today_date": today.strftime("%d/%m/%Y"),
-        "today_day": f"{today.day:02d}",
-        "today_month": f"{today.month:02d}",
-        "today_year": f"{today.year}",
-    }
+    if (not_modified := _certificate_not_modified(request, key)) is not None:
+        return not_modified
 
     try:
-        doc = DocxTemplate(str(template_path))
-        doc.render(context)
-        output = BytesIO()
-        doc.save(output)
-        output.seek(0)
+        key, path, stored = store.fetch_file(template_path, context, key=key)
     except Exception:
         messages.error(request, "Ocurrió un error al generar el certificado.")
         return redirect("users:student-dashboard")
 
-    filename = f"certificado-regular-{request.user.last_name or request.user.username}-{today.strftime('%Y%m%d')}.docx"
-    response = HttpResponse(
-        output.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    )
-    response["Content-Disposition"] = f"attachment; filename=\"{filename}\""
+    return _stored_certificate_response(store, key, path, stored, certificate_filename(user, today))
+
+
+def _certificate_not_modified(request, key):
+    """Return a 304 response when If-None-Match matches the certificate key, else None."""
+    not_modified = get_conditional_response(request, etag=quote_etag(key))
+    if not_modified is not None:
+        patch_cache_control(not_modified, private=True, no_cache=True)
+    return not_modified
+
+
+def _stored_certificate_response(store, key, path, stored, filename):
+    """
+    Build the download response for a certificate kept in the CertificateStore.
+
+    The file is served from the handle opened by the caller, so a concurrent
+    prune_certificate_store cannot remove it between the lookup and the response.
+
+    Args:
+        store (CertificateStore): Store holding the file.
+        key (str): Content key, sent as ETag.
+        path (Path): Stored file location.
+        stored (BinaryIO): The stored file, open for reading; the response closes it.
+        filename (str): Download file name.
+
+    Returns:
+        HttpResponse: FileResponse, or an empty response carrying the sendfile header.
+    """
+    if header := settings.CERTIFICATE_SENDFILE_HEADER:
+        # The front proxy streams the file; only the internal location is sent.
+        if header.lower() == "x-accel-redirect":
+            location = settings.CERTIFICATE_SENDFILE_PREFIX + path.relative_to(store.root).as_posix()
+        else:
+            location = str(path)
+        stored.close()
+        response = HttpResponse(content_type=DOCX_CONTENT_TYPE)
+        response[header] = location
+        response["Content-Disposition"] = f"attachment; filename=\"{filename}\""
+    else:
+        # Served straight from disk (wsgi.file_wrapper/sendfile when the server offers it).
+        response = FileResponse(
+            stored, as_attachment=True, filename=filename, content_type=DOCX_CONTENT_TYPE
+        )
+        response.block_size = STREAM_BLOCK_SIZE
+    response["ETag"] = quote_etag(key)
+    patch_cache_control(response, private=True, no_cache=True)
     return response
 
 
+def _certificate_job_payload(job):
+    """Serialize a CertificateJob for the polling endpoints."""
+    payload = {
+        "job_id": job.pk,
+        "status": job.status,
+        "status_url": reverse("users:certificate-job-status", args=[job.pk]),
+    }
+    if job.status == CertificateJob.Status.DONE:
+        payload["download_url"] = reverse("users:certificate-job-download", args=[job.pk])
+    elif job.status == CertificateJob.Status.FAILED:
+        payload["error"] = "Ocurrió un error al generar el certificado."
+    return payload
+
+
+@login_required
+@user_passes_test(is_student)
+@require_POST
+def certificate_job_create(request):
+    """
+    Queue a regular certificate render for the current student.
+
+    Returns:
+        JsonResponse: 202 with job id and polling URL, or 400 without student profile.
+    """
+    student = Student.objects.filter(user=request.user).first()
+    if not student:
+        return JsonResponse({"error": "Tu perfil de estudiante no está configurado."}, status=400)
+    job = enqueue_certificate(student)
+    return JsonResponse(_certificate_job_payload(job), status=202)
+
+
+@login_required
+@user_passes_test(is_student)
+def certificate_job_status(request, pk):
+    """
+    Report the state of one of the current student's certificate jobs.
+
+    Args:
+        pk (int): CertificateJob primary key.
+
+    Returns:
+        JsonResponse: Job status, with download_url once DONE.
+    """
+    job = get_object_or_404(CertificateJob, pk=pk, student__user=request.user)
+    return JsonResponse(_certificate_job_payload(job))
+
+
+@login_required
+@user_passes_test(is_student)
+def certificate_job_download(request, pk):
+    """
+    Download the certificate rendered by a finished job.
+
+    Args:
+        pk (int): CertificateJob primary key.
+
+    Returns:
+        HttpResponse: DOCX download or 304 Not Modified.
+
+    Raises:
+        Http404: If the job is not DONE or its file was pruned from the store.
+    """
+    job = get_object_or_404(
+        CertificateJob, pk=pk, student__user=request.user, status=CertificateJob.Status.DONE
+    )
+    if (not_modified := _certificate_not_modified(request, job.content_key)) is not None:
+        return not_modified
+    store = certificate_store()
+    path = store.path_for(job.content_key)
+    try:
+        stored = open(path, "rb")
+    except FileNotFoundError:
+        raise Http404("El certificado ya no está disponible.") from None
+    return _stored_certificate_response(
+        store, job.content_key, path, stored, certificate_filename(request.user, job.issue_date)
+    )
+
+
 # ------- Professor Views -------
 def is_professor(user):
     """Return True if the user is authenticated and has professor role."""
@@ -769,8 +1085,9 @@ def professor_dashboard(request):
     if not professor:
         messages.error(request, "Tu perfil de profesor no está configurado. Contactá a un administrador.")
         return redirect("home")
-    subjects = professor.subjects.all()
-    finals = professor.final_exams.select_related("subject").all()
+    authorization = professor_authorization(professor)
+    subjects = Subject.objects.filter(code__in=authorization.subject_codes)
+    finals = FinalExam.objects.filter(pk__in=authorization.final_exam_ids).select_related("subject")
     return render(request, "users/professor_dashboard.html", {"subjects": subjects, "finals": finals})
 
 
@@ -778,7 +1095,10 @@ def professor_dashboard(request):
 @user_passes_test(is_professor)
 def grade_list(request, subject_code):
     """
-    List grades for a subject and backfill missing Grade entries.
+    List grades for a subject.
+
+    Read-only: Grade rows are created when the student inscribes
+    (inscriptions.signals / inscriptions.services); reconcile_grades repairs drift.
 
     Args:
         subject_code (str): Subject code (PK) assigned to the professor.
@@ -786,14 +1106,9 @@ def grade_list(request, subject_code):
     Returns:
         HttpResponse: Page with grades queryset.
     """
-    professor = request.user.professor
-    subject = get_object_or_404(Subject, code=subject_code, professors=professor)
-    enrolled_student_ids = set(SubjectInscription.objects.filter(subject=subject).values_list("student_id", flat=True))
-    existing_grade_student_ids = set(Grade.objects.filter(subject=subject).values_list("student_id", flat=True))
-    missing_ids = enrolled_student_ids - existing_grade_student_ids
-    if missing_ids:
-        Grade.objects.bulk_create([Grade(student_id=sid, subject=subject) for sid in missing_ids])
-
+    if subject_code not in professor_authorization(request.user.professor).subject_codes:
+        raise Http404("Subject not assigned.")
+    subject = get_object_or_404(Subject, code=subject_code)
     grades = (
         Grade.objects.filter(subject=subject)
         .select_related("student__user")
@@ -802,6 +1117,109 @@ def grade_list(request, subject_code):
     return render(request, "users/grade_list.html", {"grades": grades, "subject": subject})
 
 
+@login_required
+@user_passes_test(is_professor)
+def grade_grid(request, subject_code):
+    """
+    Edit every grade of a subject in one spreadsheet-like form.
+
+    Behavior:
+        - Lists the grades of students inscribed in the subject (one query).
+        - On POST, saves only the changed rows with a single bulk_update(); the
+          status follows the final grade unless a manual status is set.
+
+    Args:
+        subject_code (str): Subject code (PK) assigned to the professor.
+
+    Returns:
+        HttpResponse: Grid page, or redirect to the grade list after saving.
+    """
+    if subject_code not in professor_authorization(request.user.professor).subject_codes:
+        raise Http404("Subject not assigned.")
+    subject = get_object_or_404(Subject, code=subject_code)
+    grades = (
+        Grade.objects.filter(subject=subject, student__subjects_inscriptions__subject=subject)
+        .select_related("student__user")
+        .order_by("student__user__last_name", "student__user__first_name", "pk")
+    )
+    formset = GradeGridFormSet(request.POST or None, queryset=grades)
+    if request.method == "POST" and formset.is_valid():
+        changed = formset.changed_grades()
+        if changed:
+            now = timezone.now()
+            for grade in changed:
+                grade.last_updated = now
+            with transaction.atomic():
+                Grade.objects.bulk_update(
+                    changed, ["promotion_grade", "final_grade", "status_override", "last_updated"], batch_size=500
+                )
+            grades_bulk_changed.send(sender=Grade, student_ids=[grade.student_id for grade in changed])
+        messages.success(request, f"Se guardaron {len(changed)} notas.")
+        return redirect("users:grade-list", subject_code=subject.code)
+    return render(request, "users/grade_grid.html", {"formset": formset, "subject": subject})
+
+
+@login_required
+@user_passes_test(is_professor)
+def grade_import(request, subject_code):
+    """
+    Load a subject's grades from a CSV file, with a preview before applying.
+
+    Behavior:
+        - Upload: the file is staged on disk and streamed once to build a diff
+          against the current grades (academics.importers.GradeImport.preview).
+        - Confirm: the staged file is streamed again and the changes are written in
+          chunks with bulk_update(); cancel discards it.
+        - The staged file is tied to the session, one pending import per subject.
+
+    Args:
+        subject_code (str): Subject code (PK) assigned to the professor.
+
+    Returns:
+        HttpResponse: Upload form, preview page, or redirect after applying.
+    """
+    if subject_code not in professor_authorization(request.user.professor).subject_codes:
+        raise Http404("Subject not assigned.")
+    subject = get_object_or_404(Subject, code=subject_code)
+    session_key = f"grade-import:{subject.code}"
+
+    if request.method == "POST" and ("confirm" in request.POST or "cancel" in request.POST):
+        token = request.session.get(session_key)
+        if token is None or token != request.POST.get("token"):
+            messages.error(request, "La vista previa expiró; vuelva a subir el archivo.")
+            return redirect("users:grade-import", subject_code=subject.code)
+        del request.session[session_key]
+        if "cancel" in request.POST:
+            discard_staged(token)
+            messages.info(request, "Importación cancelada.")
+            return redirect("users:grade-list", subject_code=subject.code)
+        try:
+            with open(staged_path(token), encoding="utf-8-sig", newline="") as lines:
+                updated = GradeImport(subject).apply(lines)
+        except FileNotFoundError:
+            messages.error(request, "La vista previa expiró; vuelva a subir el archivo.")
+            return redirect("users:grade-import", subject_code=subject.code)
+        discard_staged(token)
+        messages.success(request, f"Se actualizaron {updated} notas.")
+        return redirect("users:grade-list", subject_code=subject.code)
+
+    form = GradeImportForm(request.POST or None, request.FILES or None)
+    if request.method == "POST" and form.is_valid():
+        token = stage_upload(form.cleaned_data["file"])
+        try:
+            with open(staged_path(token), encoding="utf-8-sig", newline="") as lines:
+                preview = GradeImport(subject).preview(lines)
+        except UnicodeDecodeError:
+            discard_staged(token)
+            messages.error(request, "El archivo debe estar codificado en UTF-8.")
+        else:
+            if (previous := request.session.get(session_key)) is not None:
+                discard_staged(previous)
+            request.session[session_key] = token
+            return render(request, "users/grade_import_preview.html", {"subject": subject, "token": token, **preview})
+    return render(request, "users/grade_import.html", {"form": form, "subject": subject})
+
+
 @login_required
 @user_passes_test(is_professor)
 def grade_edit(request, pk):
@@ -818,21 +1236,18 @@ def grade_edit(request, pk):
     Returns:
         HttpResponse: Redirect to grade list on success or form page on error.
     """
-    grade = get_object_or_404(Grade, pk=pk)
-    if grade.subject not in request.user.professor.subjects.all():
+    grade = get_object_or_404(Grade.objects.select_related("subject"), pk=pk)
+    if grade.subject_id not in professor_authorization(request.user.professor).subject_codes:
         messages.error(request, "No puede editar notas de materias no asignadas.")
         return redirect("users:professor-dashboard")
-    if not SubjectInscription.objects.filter(student=grade.student, subject=grade.subject).exists():
+    if not SubjectInscription.objects.filter(student_id=grade.student_id, subject_id=grade.subject_id).exists():
         messages.error(request, "Solo puede calificar a estudiantes inscriptos en la materia.")
         return redirect("users:grade-list", subject_code=grade.subject.code)
 
     if request.method == "POST":
         form = GradeForm(request.POST, instance=grade)
         if form.is_valid():
-            status_was_changed = "status" in form.changed_data
-            saved = form.save()
-            if not status_was_changed:
-                saved.update_status()
+            form.save()
             return redirect("users:grade-list", subject_code=grade.subject.code)
     else:
         form = GradeForm(instance=grade)
@@ -851,8 +1266,9 @@ def professor_final_inscriptions(request, final_exam_id):
     Returns:
         HttpResponse: Page with inscriptions queryset.
     """
-    professor = request.user.professor
-    final_exam = get_object_or_404(FinalExam, id=final_exam_id, professors=professor)
+    if final_exam_id not in professor_authorization(request.user.professor).final_exam_ids:
+        raise Http404("Final exam not assigned.")
+    final_exam = get_object_or_404(FinalExam.objects.select_related("subject"), id=final_exam_id)
     inscriptions = (
         FinalExamInscription.objects.filter(final_exam=final_exam)
         .select_related("student__user")